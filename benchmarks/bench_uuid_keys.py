@@ -0,0 +1,122 @@
+"""Benchmark varchar(36) vs native uuid keys, and enum storage, on Postgres.
+
+Builds throwaway tables in a ``bench_uuid_keys`` schema shaped like
+``audit_logs`` (id plus action) with the old and new column types, then
+reports table and index sizes and primary key lookup latency.
+
+    python -m benchmarks.bench_uuid_keys --rows 1000000 --lookups 5000
+
+The database defaults to the app's settings; set BENCH_DATABASE_URL to use
+another one. Needs Postgres 13+ (gen_random_uuid).
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.config import get_settings
+from src.models.audit import AuditAction
+
+SCHEMA = "bench_uuid_keys"
+ACTIONS = [action.value for action in AuditAction]
+
+# name -> (id type, action type, expression producing an action value from i)
+VARIANTS = {
+    "varchar_id_varchar_action": ("varchar(36)", "varchar(32)", "actions[1 + i % {n}]"),
+    "uuid_id_native_enum": ("uuid", f"{SCHEMA}.action", "actions[1 + i % {n}]::{schema}.action"),
+    "uuid_id_smallint_action": ("uuid", "smallint", "(i % {n})::smallint"),
+}
+
+
+async def build(conn, rows: int) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    labels = ", ".join(f"'{a}'" for a in ACTIONS)
+    await conn.execute(text(f"CREATE TYPE {SCHEMA}.action AS ENUM ({labels})"))
+    for name, (id_type, action_type, action_sql) in VARIANTS.items():
+        table = f"{SCHEMA}.{name}"
+        await conn.execute(text(
+            f"CREATE TABLE {table} (id {id_type} PRIMARY KEY, action {action_type} NOT NULL, "
+            f"created_at timestamp NOT NULL)"
+        ))
+        action_expr = action_sql.format(n=len(ACTIONS), schema=SCHEMA)
+        id_expr = "gen_random_uuid()" if id_type == "uuid" else "gen_random_uuid()::text"
+        await conn.execute(text(
+            f"INSERT INTO {table} (id, action, created_at) "
+            f"SELECT {id_expr}, {action_expr}, now() - (i || ' seconds')::interval "
+            f"FROM generate_series(1, :rows) AS i, (SELECT ARRAY[{labels}] AS actions) AS a"
+        ), {"rows": rows})
+        await conn.execute(text(f"CREATE INDEX ON {table} (action, created_at)"))
+        await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def sizes(conn) -> dict[str, dict[str, int]]:
+    report = {}
+    for name in VARIANTS:
+        table = f"{SCHEMA}.{name}"
+        result = await conn.execute(text(
+            "SELECT indexrelid::regclass::text AS index, pg_relation_size(indexrelid) AS bytes "
+            "FROM pg_index WHERE indrelid = CAST(:table AS regclass)"
+        ), {"table": table})
+        indexes = {row.index: row.bytes for row in result}
+        report[name] = {
+            "table": await conn.scalar(text("SELECT pg_relation_size(CAST(:t AS regclass))"), {"t": table}),
+            "pkey": next(v for k, v in indexes.items() if k.endswith("_pkey")),
+            "action_index": next(v for k, v in indexes.items() if not k.endswith("_pkey")),
+        }
+    return report
+
+
+async def lookups(conn, count: int) -> dict[str, tuple[float, float]]:
+    report = {}
+    for name in VARIANTS:
+        table = f"{SCHEMA}.{name}"
+        result = await conn.execute(text(f"SELECT id FROM {table} TABLESAMPLE SYSTEM (1) LIMIT :n"), {"n": count})
+        ids = [str(row.id) for row in result]
+        random.shuffle(ids)
+        cast = "::uuid" if VARIANTS[name][0] == "uuid" else ""
+        statement = text(f"SELECT id, action FROM {table} WHERE id = CAST(:id AS text){cast}")
+        timings = []
+        for key in ids:
+            start = time.perf_counter()
+            (await conn.execute(statement, {"id": key})).one()
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        report[name] = (statistics.median(timings), timings[int(len(timings) * 0.95) - 1])
+    return report
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark schema")
+    args = parser.parse_args()
+
+    engine = create_async_engine(os.environ.get("BENCH_DATABASE_URL", get_settings().database_url))
+    async with engine.begin() as conn:
+        await build(conn, args.rows)
+    async with engine.connect() as conn:
+        size_report = await sizes(conn)
+        latency_report = await lookups(conn, args.lookups)
+        if not args.keep:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            await conn.commit()
+    await engine.dispose()
+
+    print(f"{args.rows} rows, {args.lookups} primary key lookups\n")
+    print("| variant | table MB | pkey MB | (action, created_at) MB | lookup p50 us | lookup p95 us |")
+    print("|---|---|---|---|---|---|")
+    for name in VARIANTS:
+        size, (p50, p95) = size_report[name], latency_report[name]
+        print(
+            f"| {name} | {size['table'] / 2**20:.1f} | {size['pkey'] / 2**20:.1f} "
+            f"| {size['action_index'] / 2**20:.1f} | {p50:.0f} | {p95:.0f} |"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,8 @@
 """Application configuration using Pydantic settings."""
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Any, Dict, List
 
 
 class Settings(BaseSettings):
@@ -27,6 +29,97 @@ class Settings(BaseSettings):
     # AI / Anthropic
     anthropic_api_key: str = ""
 
+    # RunPlan retries
+    runplan_retry_max_retries: int = 3
+    runplan_retry_base_delay_seconds: float = 30.0
+    runplan_retry_max_delay_seconds: float = 900.0
+    # Per-skill overrides, e.g. {"deploy": {"max_retries": 1, "base_delay_seconds": 300}}
+    runplan_retry_policies: Dict[str, Dict[str, float]] = {}
+
+    # MCP agent inboxes
+    mcp_inbox_backend: str = "memory"  # memory, database or redis
+    mcp_inbox_max_size: int = 1000
+    mcp_inbox_ack_timeout_seconds: float = 30.0
+    mcp_inbox_delivery_batch: int = 100
+
+    # MCP design requests
+    design_request_timeout_seconds: float = 300.0
+    design_request_ttl_seconds: float = 3600.0
+    design_request_max_entries: int = 10000
+    design_claim_lease_seconds: float = 120.0
+    design_dedupe_window_seconds: float = 600.0
+    # Design requests are only sent to agents registered with this capability
+    design_capability: str = "design"
+
+    # Build init jobs
+    gh_binary: str = "gh"  # Point at a stub script to run without GitHub
+    build_gh_timeout_seconds: float = 30.0
+    build_job_max_entries: int = 500
+
+    # Dashboard aggregate
+    dashboard_cache_ttl_seconds: float = 2.0
+
+    # Status counters are recounted from the database this often
+    status_counts_reconcile_seconds: float = 300.0
+
+    # Audit retention: whole months older than this are archived to
+    # compressed NDJSON segments and removed from the database
+    audit_retention_days: int = 90
+    audit_archive_dir: str = "audit_archive"
+    audit_archive_interval_seconds: float = 3600.0
+    audit_partition_months_ahead: int = 2
+
+    # Audit policies per action: {"mode": "keep"}, {"mode": "sample", "every": N}
+    # or {"mode": "aggregate", "window_seconds": S}. Failures and decisions
+    # are always kept.
+    audit_action_policies: Dict[str, Dict[str, Any]] = {
+        "FILE_READ": {"mode": "aggregate"},
+    }
+    audit_aggregate_window_seconds: float = 60.0
+
+    # Audit command/extra_data payloads larger than this are compressed into
+    # audit_blobs; compression is gzip or zstd (needs the zstandard package)
+    audit_payload_offload_bytes: int = 8192
+    audit_payload_compression: str = "gzip"
+
+    # /audit/stats reads the minute rollup for ranges longer than this
+    audit_stats_raw_max_minutes: float = 360.0
+
+    # Live agent state is written back to the agents table this often
+    agent_write_behind_seconds: float = 1.0
+    agent_write_behind_batch_size: int = 500
+
+    # Newest audit entries kept in memory for /audit/recent, and per agent
+    # for /audit/agent/{agent_id}; larger limits are read from the database
+    audit_recent_buffer_size: int = 200
+    audit_agent_buffer_size: int = 100
+
+    # Identical concurrent GETs under these prefixes share one response;
+    # successful ones are also reused for coalesce_ttl_seconds (0 = in-flight only)
+    coalesce_path_prefixes: List[str] = [
+        "/agents", "/tasks", "/projects", "/runplans", "/audit",
+        "/costs", "/dashboard", "/stats", "/build/status",
+    ]
+    coalesce_ttl_seconds: float = 0.0
+
+    @field_validator("audit_action_policies")
+    @classmethod
+    def check_audit_action_policies(cls, policies: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Reject policies that would make every audit write fail."""
+        for action, policy in policies.items():
+            unknown = set(policy) - {"mode", "every", "window_seconds"}
+            if unknown:
+                raise ValueError(f"{action}: unknown audit policy keys {sorted(unknown)}")
+            if policy.get("mode", "keep") not in ("keep", "sample", "aggregate"):
+                raise ValueError(f"{action}: audit policy mode must be keep, sample or aggregate")
+            every = policy.get("every", 1)
+            if not isinstance(every, int) or every < 1:
+                raise ValueError(f"{action}: audit policy every must be a positive integer")
+            window = policy.get("window_seconds")
+            if window is not None and (not isinstance(window, (int, float)) or window <= 0):
+                raise ValueError(f"{action}: audit policy window_seconds must be positive")
+        return policies
+
     @property
     def database_url(self) -> str:
         return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
@@ -1,6 +1,11 @@
 from __future__ import annotations
 """Database connection and session management."""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import uuid
+from typing import Optional
+from sqlalchemy import String, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from src.config import get_settings
 
@@ -24,6 +29,44 @@ class Base(DeclarativeBase):
     pass
 
 
+# Columns added to audit_logs after the table was first created, with the
+# definition used to add them to existing tables
+AUDIT_LOG_COLUMNS = {
+    "offloaded": "JSON",
+    "event_count": "INTEGER NOT NULL DEFAULT 1",
+}
+
+# Bound in place of strings that are not UUIDs; no row ever has this id
+_NIL_UUID = str(uuid.UUID(int=0))
+
+
+class GUID(TypeDecorator):
+    """UUID stored natively (16 bytes) on Postgres and as text elsewhere.
+
+    Values are ``str`` in Python on every database, so ids are handled the
+    same way whatever the backend.
+    """
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect) -> Optional[str]:
+        if value is None or dialect.name != "postgresql":
+            return value
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            # An id that is not a UUID matches nothing instead of failing the query
+            return _NIL_UUID
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        return None if value is None else str(value)
+
+
 async def get_db() -> AsyncSession:
     """Dependency for getting database sessions."""
     async with async_session_maker() as session:
@@ -41,3 +84,69 @@ async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await migrate_audit_log_columns(conn)
+        await migrate_uuid_columns(conn)
+
+
+async def migrate_audit_log_columns(conn: AsyncConnection) -> list[str]:
+    """Add ``AUDIT_LOG_COLUMNS`` missing from an existing audit_logs table.
+
+    ``create_all`` never alters existing tables, and every query selecting
+    ``AuditLog`` reads these columns, so this runs before anything touches
+    the table. Returns the added column names.
+    """
+    existing = await conn.run_sync(
+        lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("audit_logs")}
+    )
+    added = []
+    for name, definition in AUDIT_LOG_COLUMNS.items():
+        if name not in existing:
+            await conn.execute(text(f"ALTER TABLE audit_logs ADD COLUMN {name} {definition}"))
+            added.append(name)
+    return added
+
+
+async def migrate_uuid_columns(conn: AsyncConnection) -> list[str]:
+    """Convert id columns created as varchar to native uuid (Postgres only).
+
+    Tables created before ids became ``GUID`` columns are converted in
+    place; foreign keys between converted columns are dropped and
+    recreated around the change. Returns the converted ``table.column``
+    names. Each ALTER rewrites its table, so run the first start after the
+    upgrade in a maintenance window on large databases.
+    """
+    if conn.dialect.name != "postgresql":
+        return []
+    result = await conn.execute(text(
+        "SELECT table_name, column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND data_type = 'character varying'"
+    ))
+    varchar_columns = {(row.table_name, row.column_name) for row in result}
+    pending = [
+        (table.name, column.name)
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, GUID) and (table.name, column.name) in varchar_columns
+    ]
+    if not pending:
+        return []
+
+    tables = {table for table, _ in pending}
+    foreign_keys = await conn.run_sync(
+        lambda sync_conn: [
+            (table, fk)
+            for table in tables
+            for fk in inspect(sync_conn).get_foreign_keys(table)
+        ]
+    )
+    for table, fk in foreign_keys:
+        await conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{fk["name"]}"'))
+    for table, column in pending:
+        await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING {column}::uuid"))
+    for table, fk in foreign_keys:
+        await conn.execute(text(
+            f'ALTER TABLE {table} ADD CONSTRAINT "{fk["name"]}" '
+            f'FOREIGN KEY ({", ".join(fk["constrained_columns"])}) '
+            f'REFERENCES {fk["referred_table"]} ({", ".join(fk["referred_columns"])})'
+        ))
+    return [f"{table}.{column}" for table, column in pending]
@@ -2,13 +2,29 @@
 
 "Radical Visibility" - If an agent acts, the Frontend MUST know.
 """
+import json
 from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.config import get_settings
-from src.database import init_db
+from src.database import init_db, async_session_maker
 from src.websocket.manager import connection_manager
+from src.services.retry_scheduler import retry_scheduler
+from src.services.dependency_graph import dependency_graph
+from src.services.inbox import agent_inbox
+from src.services.build_jobs import build_jobs
+from src.services.design_artifacts import migrate_design_config
+from src.services.search_index import backfill_search_index
+from src.services.audit_stats import rebuild_audit_rollups
+from src.services.status_counters import status_counters
+from src.services.live_agents import live_agents
+from src.services.audit_archive import audit_archiver
+from src.services.audit_pipeline import audit_pipeline
+from src.services.audit_recent import recent_audit
+from src.services.singleflight import RequestCoalescingMiddleware
+from src.services.session_hooks import install_session_hooks
 from src.routes import (
     agents_router,
     tasks_router,
@@ -20,6 +36,9 @@ from src.routes import (
     mcp_router,
     design_router,
     build_router,
+    dashboard_router,
+    stats_router,
+    search_router,
 )
 
 
@@ -27,10 +46,30 @@ from src.routes import (
 async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown."""
     # Startup
+    install_session_hooks()
     await init_db()
+    async with async_session_maker() as db:
+        await migrate_design_config(db)
+        await backfill_search_index(db)
+        await rebuild_audit_rollups(db)
+        await db.commit()
+        await dependency_graph.load(db)
+        await recent_audit.load(db)
+    await retry_scheduler.start()
+    await agent_inbox.start()
+    await status_counters.start()
+    await live_agents.start()
+    await audit_archiver.start()
+    await audit_pipeline.start()
     yield
     # Shutdown
-    pass
+    await audit_pipeline.stop()
+    await audit_archiver.stop()
+    await live_agents.stop()
+    await status_counters.stop()
+    await build_jobs.stop()
+    await agent_inbox.stop()
+    await retry_scheduler.stop()
 
 
 app = FastAPI(
@@ -40,6 +79,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Coalesce identical concurrent reads; added first so CORS wraps each copy
+app.add_middleware(RequestCoalescingMiddleware)
+
 # CORS configuration for frontend
 settings = get_settings()
 app.add_middleware(
@@ -61,6 +103,9 @@ app.include_router(costs_router)
 app.include_router(mcp_router)
 app.include_router(design_router)
 app.include_router(build_router)
+app.include_router(dashboard_router)
+app.include_router(stats_router)
+app.include_router(search_router)
 
 
 @app.get("/")
@@ -76,16 +121,27 @@ async def root():
 
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, agent_id: Optional[str] = None):
     """WebSocket endpoint for real-time updates.
 
     Connect to receive:
     - AGENT_UPDATE: Agent status changes
     - TASK_UPDATE: Task state changes
     - RUNPLAN_UPDATE: RunPlan execution updates
+    - RUNPLAN_STEP: RunPlan step events with updated progress
     - AUDIT_EVENT: All logged agent actions
+    - BUILD_JOB_UPDATE: Build init job progress
+    - COUNTS_UPDATE: Changed task/agent/RunPlan counts by status
+
+    MCP agents connect with ``?agent_id=<id>`` to bind the connection to
+    their id; AGENT_MESSAGE traffic is only delivered to bound connections.
+    Queued inbox messages are delivered on connect, and agents acknowledge
+    them by sending ``{"type": "ACK", "message_ids": [...]}``.
     """
     await connection_manager.connect(websocket)
+    if agent_id:
+        connection_manager.bind_agent(agent_id, websocket)
+        await agent_inbox.deliver(agent_id)
     try:
         while True:
             # Keep connection alive, handle incoming messages if needed
@@ -93,6 +149,13 @@ async def websocket_endpoint(websocket: WebSocket):
             # Echo back for ping/pong or handle commands
             if data == "ping":
                 await connection_manager.send_personal_message("pong", websocket)
+            elif agent_id:
+                try:
+                    command = json.loads(data)
+                except ValueError:
+                    continue
+                if isinstance(command, dict) and command.get("type") == "ACK":
+                    await agent_inbox.ack(agent_id, command.get("message_ids", []))
     except WebSocketDisconnect:
         connection_manager.disconnect(websocket)
 
@@ -102,6 +165,7 @@ async def websocket_status():
     """Get WebSocket connection status."""
     return {
         "active_connections": connection_manager.connection_count,
+        "agent_connections": connection_manager.agent_connection_count,
         "endpoint": "/ws"
     }
 
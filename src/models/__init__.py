@@ -1,20 +1,37 @@
 """SQLAlchemy database models."""
 from src.models.agent import Agent, AgentStatus
 from src.models.task import Task, TaskStatus
+from src.models.task_dependency import TaskDependency
 from src.models.audit import AuditLog, AuditAction
+from src.models.audit_rollup import AuditRollup
+from src.models.audit_blob import AuditBlob
 from src.models.project import Project
+from src.models.requirement import ProjectRequirement
+from src.models.tech_decision import ProjectTechDecision
 from src.models.runplan import RunPlan, RunPlanStatus
+from src.models.runplan_step import RunPlanStep, RunPlanStepStatus
 from src.models.cost import CostRecord
+from src.models.mcp_message import MCPInboxMessage
+from src.models.search import SearchDocument
 
 __all__ = [
     "Agent",
     "AgentStatus",
     "Task",
     "TaskStatus",
+    "TaskDependency",
     "AuditLog",
     "AuditAction",
+    "AuditRollup",
+    "AuditBlob",
     "Project",
+    "ProjectRequirement",
+    "ProjectTechDecision",
     "RunPlan",
     "RunPlanStatus",
+    "RunPlanStep",
+    "RunPlanStepStatus",
     "CostRecord",
+    "MCPInboxMessage",
+    "SearchDocument",
 ]
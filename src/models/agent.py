@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import String, DateTime, Enum, Text, Integer
 from sqlalchemy.orm import Mapped, mapped_column
-from src.database import Base
+from src.database import Base, GUID
 
 
 class AgentStatus(str, enum.Enum):
@@ -31,7 +31,7 @@ class Agent(Base):
     """Agent instance tracking."""
     __tablename__ = "agents"
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     role: Mapped[AgentRole] = mapped_column(
         Enum(AgentRole),
@@ -2,9 +2,9 @@
 import enum
 from datetime import datetime
 from typing import Optional, Dict, Any
-from sqlalchemy import String, DateTime, Enum, Text, JSON, Boolean
+from sqlalchemy import DDL, String, DateTime, Enum, Text, JSON, Boolean, Integer, Index, event
 from sqlalchemy.orm import Mapped, mapped_column
-from src.database import Base
+from src.database import Base, GUID
 
 
 class AuditAction(str, enum.Enum):
@@ -49,8 +49,13 @@ class AuditAction(str, enum.Enum):
 class AuditLog(Base):
     """Audit log entry - "If an agent acts, it's logged here"."""
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_created_at", "created_at"),
+        # Monthly partitions are created ahead of time by the audit archiver
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
 
     # What happened
     action: Mapped[AuditAction] = mapped_column(Enum(AuditAction), nullable=False)
@@ -72,11 +77,27 @@ class AuditLog(Base):
     file_path: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
     command: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # Payloads moved to audit_blobs: field name -> {"hash": ..., "size": ...}
+    offloaded: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
+    # Events this entry stands for: >1 for sampled and aggregated entries
+    event_count: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+
     # Result
     success: Mapped[bool] = mapped_column(Boolean, default=True)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
-    # Timestamp
+    # Timestamp; part of the primary key because Postgres requires the
+    # partition key in it
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, primary_key=True, default=datetime.utcnow, nullable=False
     )
+
+
+# Postgres: rows outside every monthly partition land here
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT")
+    .execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,22 @@
+"""Audit blob model - compressed, content-addressed audit payloads."""
+from datetime import datetime
+from sqlalchemy import String, DateTime, Integer, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base
+
+
+class AuditBlob(Base):
+    """A large audit payload, stored once per distinct content."""
+    __tablename__ = "audit_blobs"
+
+    # SHA-256 of the uncompressed content
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    encoding: Mapped[str] = mapped_column(String(10), nullable=False)  # gzip or zstd
+    content_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)  # Uncompressed bytes
+    stored_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
@@ -0,0 +1,21 @@
+"""Audit rollup model - per-minute audit counts for long-range statistics."""
+from datetime import datetime
+from sqlalchemy import String, DateTime, Enum, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base
+from src.models.audit import AuditAction
+
+
+class AuditRollup(Base):
+    """Number of audit entries in one minute for one action, agent and project."""
+    __tablename__ = "audit_rollups"
+
+    # Start of the minute
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    action: Mapped[AuditAction] = mapped_column(Enum(AuditAction), primary_key=True)
+    # "" when the entry had no agent or project, keeping the key non-null
+    agent_id: Mapped[str] = mapped_column(String(36), primary_key=True, default="")
+    project_id: Mapped[str] = mapped_column(String(36), primary_key=True, default="")
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -3,18 +3,18 @@ from datetime import datetime, date
 from typing import Optional
 from sqlalchemy import String, DateTime, Date, Integer, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
-from src.database import Base
+from src.database import Base, GUID
 
 
 class CostRecord(Base):
     """Cost tracking record - tracks token usage and costs."""
     __tablename__ = "cost_records"
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
 
     # What incurred the cost
     project_id: Mapped[str] = mapped_column(
-        String(36), ForeignKey("projects.id"), nullable=False
+        GUID, ForeignKey("projects.id"), nullable=False
     )
     agent_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
     runplan_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
@@ -0,0 +1,35 @@
+"""MCP inbox model - durable per-agent message queue."""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime, Text, Integer, Boolean, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base
+
+
+class MCPInboxMessage(Base):
+    """A message waiting in an MCP agent's inbox until it is acknowledged."""
+    __tablename__ = "mcp_inbox_messages"
+    __table_args__ = (
+        Index("ix_mcp_inbox_delivery", "agent_id", "priority_rank", "created_at"),
+    )
+
+    # Broadcasts share one message id across recipients
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    agent_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    source_agent: Mapped[str] = mapped_column(String(100), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    priority: Mapped[str] = mapped_column(String(20), nullable=False)
+    # 0 = urgent ... 3 = low, so ascending order delivers urgent first
+    priority_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    message_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    is_broadcast: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    # Delivery state
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    # Leased until this time; NULL means ready for delivery
+    leased_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Timestamp
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
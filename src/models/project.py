@@ -3,14 +3,14 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy import String, DateTime, Text, JSON, Boolean, Integer
 from sqlalchemy.orm import Mapped, mapped_column
-from src.database import Base
+from src.database import Base, GUID
 
 
 class Project(Base):
     """Project (Product) being built by The Factory."""
     __tablename__ = "projects"
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
@@ -0,0 +1,35 @@
+"""Project requirement model - design-phase requirements, one row each."""
+from datetime import datetime
+from sqlalchemy import String, DateTime, Text, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base, GUID
+
+
+class ProjectRequirement(Base):
+    """A requirement captured during a project's design phase."""
+    __tablename__ = "project_requirements"
+    __table_args__ = (
+        UniqueConstraint("project_id", "ref", name="uq_project_requirement_ref"),
+    )
+
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
+    project_id: Mapped[str] = mapped_column(
+        GUID, ForeignKey("projects.id"), nullable=False, index=True
+    )
+    # Client-assigned id, unique within the project
+    ref: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    type: Mapped[str] = mapped_column(String(50), nullable=False)  # feature, constraint, user-story
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    priority: Mapped[str] = mapped_column(String(20), nullable=False)  # must, should, could
+    status: Mapped[str] = mapped_column(String(20), nullable=False)  # draft, confirmed
+    position: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy import String, DateTime, Enum, Text, ForeignKey, JSON, Integer
 from sqlalchemy.orm import Mapped, mapped_column
-from src.database import Base
+from src.database import Base, GUID
 
 
 class RunPlanStatus(str, enum.Enum):
@@ -22,9 +22,9 @@ class RunPlan(Base):
     """RunPlan - structured execution plan for a task."""
     __tablename__ = "runplans"
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
     task_id: Mapped[str] = mapped_column(
-        String(36), ForeignKey("tasks.id"), nullable=False
+        GUID, ForeignKey("tasks.id"), nullable=False
     )
 
     # Plan details
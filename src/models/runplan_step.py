@@ -0,0 +1,48 @@
+"""RunPlan step model - append-only log of RunPlan step progress."""
+import enum
+from datetime import datetime
+from typing import Optional, Dict, Any
+from sqlalchemy import String, DateTime, Enum, Text, ForeignKey, JSON, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base, GUID
+
+
+class RunPlanStepStatus(str, enum.Enum):
+    """Status reported for a RunPlan step."""
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    SKIPPED = "SKIPPED"
+
+
+class RunPlanStep(Base):
+    """One step event reported by a runner. Rows are only ever inserted."""
+    __tablename__ = "runplan_steps"
+    __table_args__ = (
+        Index("ix_runplan_steps_runplan_step", "runplan_id", "step_index"),
+    )
+
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
+    runplan_id: Mapped[str] = mapped_column(
+        GUID, ForeignKey("runplans.id"), nullable=False
+    )
+    step_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    status: Mapped[RunPlanStepStatus] = mapped_column(
+        Enum(RunPlanStepStatus),
+        default=RunPlanStepStatus.COMPLETED,
+        nullable=False
+    )
+
+    # Cost and timing of this step alone
+    duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    tokens_used: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Output of this step alone (not cumulative)
+    output: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Timestamp
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
@@ -0,0 +1,68 @@
+"""Search document model - one full-text index over audit logs, tasks and projects."""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DDL, String, DateTime, Text, Integer, Index, UniqueConstraint, event
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base, GUID
+
+# Text search vector of a document. Queries must use this exact expression
+# for Postgres to answer them from the GIN index.
+TSVECTOR_SQL = "to_tsvector('english'::regconfig, title || ' ' || body)"
+
+
+class SearchDocument(Base):
+    """Searchable text of one audit entry, task or project."""
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        UniqueConstraint("source_type", "source_id", name="uq_search_documents_source"),
+        Index("ix_search_documents_project_created", "project_id", "created_at"),
+        Index("ix_search_documents_agent_created", "agent_id", "created_at"),
+    )
+
+    # Integer key: SQLite FTS5 tables reference their content by rowid
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source_type: Mapped[str] = mapped_column(String(20), nullable=False)  # audit, task, project
+    # Same type as the source ids it is compared with (uuid on Postgres)
+    source_id: Mapped[str] = mapped_column(GUID, nullable=False)
+
+    # Filters
+    project_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    agent_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
+    # Indexed text
+    title: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    body: Mapped[str] = mapped_column(Text, nullable=False, default="")
+
+    # Timestamp of the source row
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+# Postgres: GIN index over the tsvector expression
+event.listen(
+    SearchDocument.__table__,
+    "after_create",
+    DDL(f"CREATE INDEX ix_search_documents_tsv ON search_documents USING GIN ({TSVECTOR_SQL})")
+    .execute_if(dialect="postgresql"),
+)
+
+# SQLite: external-content FTS5 table kept in sync by triggers
+for statement in (
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+):
+    event.listen(SearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    SearchDocument.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS search_documents_fts").execute_if(dialect="sqlite"),
+)
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy import String, DateTime, Enum, Text, ForeignKey, JSON
 from sqlalchemy.orm import Mapped, mapped_column
-from src.database import Base
+from src.database import Base, GUID
 
 
 class TaskStatus(str, enum.Enum):
@@ -30,9 +30,9 @@ class Task(Base):
     """Task work item."""
     __tablename__ = "tasks"
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
     project_id: Mapped[str] = mapped_column(
-        String(36), ForeignKey("projects.id"), nullable=False
+        GUID, ForeignKey("projects.id"), nullable=False
     )
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
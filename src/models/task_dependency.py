@@ -0,0 +1,29 @@
+"""Task dependency model - edges of the per-project task graph."""
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base, GUID
+
+
+class TaskDependency(Base):
+    """Dependency edge: ``task_id`` is blocked until ``depends_on_id`` completes."""
+    __tablename__ = "task_dependencies"
+    __table_args__ = (
+        UniqueConstraint("task_id", "depends_on_id", name="uq_task_dependency"),
+    )
+
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
+    project_id: Mapped[str] = mapped_column(
+        GUID, ForeignKey("projects.id"), nullable=False, index=True
+    )
+    task_id: Mapped[str] = mapped_column(
+        GUID, ForeignKey("tasks.id"), nullable=False, index=True
+    )
+    depends_on_id: Mapped[str] = mapped_column(
+        GUID, ForeignKey("tasks.id"), nullable=False, index=True
+    )
+
+    # Timestamp
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
@@ -0,0 +1,34 @@
+"""Project tech decision model - technology stack choices, one row each."""
+from datetime import datetime
+from sqlalchemy import String, DateTime, Text, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base, GUID
+
+
+class ProjectTechDecision(Base):
+    """A technology stack decision made during a project's design phase."""
+    __tablename__ = "project_tech_decisions"
+    __table_args__ = (
+        UniqueConstraint("project_id", "ref", name="uq_project_tech_decision_ref"),
+    )
+
+    id: Mapped[str] = mapped_column(GUID, primary_key=True)
+    project_id: Mapped[str] = mapped_column(
+        GUID, ForeignKey("projects.id"), nullable=False, index=True
+    )
+    # Client-assigned id, unique within the project
+    ref: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    category: Mapped[str] = mapped_column(String(100), nullable=False)
+    choice: Mapped[str] = mapped_column(String(255), nullable=False)
+    reasoning: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    status: Mapped[str] = mapped_column(String(20), nullable=False)  # suggested, confirmed
+    position: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
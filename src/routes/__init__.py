@@ -9,6 +9,9 @@ from src.routes.health import router as health_router
 from src.routes.mcp import router as mcp_router
 from src.routes.design import router as design_router
 from src.routes.build import router as build_router
+from src.routes.dashboard import router as dashboard_router
+from src.routes.stats import router as stats_router
+from src.routes.search import router as search_router
 
 __all__ = [
     "agents_router",
@@ -21,4 +24,7 @@ __all__ = [
     "mcp_router",
     "design_router",
     "build_router",
+    "dashboard_router",
+    "stats_router",
+    "search_router",
 ]
@@ -1,54 +1,77 @@
-"""Agent management endpoints."""
+"""Agent management endpoints.
+
+Reads and status changes go through the live agent registry, which keeps
+agent state in memory and writes it back to the database in batches.
+"""
 import uuid
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from src.database import get_db
-from src.models.agent import Agent, AgentStatus
-from src.schemas.agent import AgentCreate, AgentUpdate, AgentResponse, AgentStatusUpdate
+from src.models.agent import Agent
+from src.schemas.agent import (
+    AgentCreate,
+    AgentUpdate,
+    AgentResponse,
+    AgentStatusUpdate,
+    AgentBatchGetResponse,
+)
+from src.schemas.batch import BatchGetRequest
 from src.services.broadcaster import broadcast_agent_update
+from src.services.live_agents import live_agents
+from src.routes.etag import etag_guard
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
 
-@router.get("", response_model=list[AgentResponse])
+@router.get("", response_model=list[AgentResponse], dependencies=[Depends(etag_guard("agents"))])
 async def list_agents(db: AsyncSession = Depends(get_db)):
     """List all agents."""
-    result = await db.execute(select(Agent))
-    return result.scalars().all()
+    await live_agents.ensure_loaded(db)
+    return live_agents.all()
 
 
-@router.get("/active", response_model=list[AgentResponse])
+@router.get("/active", response_model=list[AgentResponse], dependencies=[Depends(etag_guard("agents"))])
 async def list_active_agents(db: AsyncSession = Depends(get_db)):
     """List only active (non-offline) agents."""
-    result = await db.execute(
-        select(Agent).where(Agent.status != AgentStatus.OFFLINE)
-    )
-    return result.scalars().all()
+    await live_agents.ensure_loaded(db)
+    return live_agents.active()
 
 
-@router.get("/{agent_id}", response_model=AgentResponse)
-async def get_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
-    """Get a specific agent by ID."""
-    result = await db.execute(select(Agent).where(Agent.id == agent_id))
-    agent = result.scalar_one_or_none()
+@router.post("/batch-get", response_model=AgentBatchGetResponse)
+async def batch_get_agents(request: BatchGetRequest, db: AsyncSession = Depends(get_db)):
+    """Get many agents by ID."""
+    await live_agents.ensure_loaded(db)
+    agents, missing = live_agents.fetch(request.ids)
+    return AgentBatchGetResponse(agents=agents, missing=missing)
+
+
+async def _live_agent(db: AsyncSession, agent_id: str) -> AgentResponse:
+    await live_agents.ensure_loaded(db)
+    agent = live_agents.get(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     return agent
 
 
+@router.get("/{agent_id}", response_model=AgentResponse)
+async def get_agent(agent_id: str, db: AsyncSession = Depends(get_db)):
+    """Get a specific agent by ID."""
+    return await _live_agent(db, agent_id)
+
+
 @router.post("", response_model=AgentResponse)
 async def create_agent(agent_data: AgentCreate, db: AsyncSession = Depends(get_db)):
     """Register a new agent."""
+    await live_agents.ensure_loaded(db)
     agent = Agent(
         id=str(uuid.uuid4()),
         **agent_data.model_dump()
     )
     db.add(agent)
     await db.flush()
+    live = live_agents.add(db, agent)
     await broadcast_agent_update(agent)
-    return agent
+    return live
 
 
 @router.patch("/{agent_id}", response_model=AgentResponse)
@@ -58,17 +81,8 @@ async def update_agent(
     db: AsyncSession = Depends(get_db)
 ):
     """Update an agent."""
-    result = await db.execute(select(Agent).where(Agent.id == agent_id))
-    agent = result.scalar_one_or_none()
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-
-    for field, value in agent_data.model_dump(exclude_unset=True).items():
-        setattr(agent, field, value)
-
-    await db.flush()
-    await broadcast_agent_update(agent)
-    return agent
+    await _live_agent(db, agent_id)
+    return await live_agents.update(agent_id, **agent_data.model_dump(exclude_unset=True))
 
 
 @router.patch("/{agent_id}/status", response_model=AgentResponse)
@@ -78,28 +92,15 @@ async def update_agent_status(
     db: AsyncSession = Depends(get_db)
 ):
     """Update agent status - broadcasts to all connected clients."""
-    result = await db.execute(select(Agent).where(Agent.id == agent_id))
-    agent = result.scalar_one_or_none()
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-
-    agent.status = status_data.status
+    await _live_agent(db, agent_id)
+    changes = {"status": status_data.status}
     if status_data.current_action is not None:
-        agent.current_action = status_data.current_action
-
-    await db.flush()
-    await broadcast_agent_update(agent)
-    return agent
+        changes["current_action"] = status_data.current_action
+    return await live_agents.update(agent_id, **changes)
 
 
 @router.post("/{agent_id}/heartbeat", response_model=AgentResponse)
 async def agent_heartbeat(agent_id: str, db: AsyncSession = Depends(get_db)):
     """Update agent heartbeat timestamp."""
-    result = await db.execute(select(Agent).where(Agent.id == agent_id))
-    agent = result.scalar_one_or_none()
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-
-    agent.last_heartbeat = datetime.utcnow()
-    await db.flush()
-    return agent
+    await _live_agent(db, agent_id)
+    return live_agents.heartbeat(agent_id)
@@ -1,17 +1,34 @@
 """Audit log endpoints."""
 import uuid
+from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from src.config import get_settings
 from src.database import get_db
 from src.models.audit import AuditLog, AuditAction
-from src.schemas.audit import AuditLogResponse
+from src.schemas.audit import (
+    AuditLogResponse,
+    AuditLogListItem,
+    AUDIT_SUMMARY_FIELDS,
+    AuditStatsResponse,
+    AuditArchiveSegment,
+    AuditPipelineStats,
+    StatsBucket,
+    StatsSource,
+)
+from src.routes.fields import fields_param, with_fields, pick
+from src.services.audit_archive import audit_archiver
+from src.services.audit_blobs import load_blob
+from src.services.audit_pipeline import audit_pipeline
+from src.services.audit_recent import recent_audit
+from src.services.audit_stats import audit_stats
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
 
-@router.get("", response_model=list[AuditLogResponse])
+@router.get("", response_model=list[AuditLogListItem], response_model_exclude_unset=True)
 async def list_audit_logs(
     project_id: Optional[str] = Query(None),
     agent_id: Optional[str] = Query(None),
@@ -19,10 +36,17 @@ async def list_audit_logs(
     action: Optional[AuditAction] = Query(None),
     limit: int = Query(100, le=1000),
     offset: int = Query(0),
+    fields: list[str] = Depends(fields_param(AuditLogResponse, AUDIT_SUMMARY_FIELDS)),
     db: AsyncSession = Depends(get_db)
 ):
-    """List audit logs with filtering."""
-    query = select(AuditLog)
+    """List audit logs with filtering.
+
+    Returns entries without extra_data; use ``?fields=`` to pick the fields
+    to return. Only entries within the retention window are listed; older
+    ones are served by ``/audit/archive``.
+    """
+    query = with_fields(select(AuditLog), AuditLog, fields)
+    query = query.where(AuditLog.created_at >= audit_archiver.hot_since())
 
     if project_id:
         query = query.where(AuditLog.project_id == project_id)
@@ -35,7 +59,7 @@ async def list_audit_logs(
 
     query = query.order_by(AuditLog.created_at.desc()).offset(offset).limit(limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return pick(result.scalars(), fields)
 
 
 @router.get("/recent", response_model=list[AuditLogResponse])
@@ -43,25 +67,113 @@ async def get_recent_activity(
     limit: int = Query(50, le=200),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get most recent activity across all agents."""
+    """Get most recent activity across all agents.
+
+    Served from the in-memory buffer of recent entries when ``limit`` fits.
+    """
+    await recent_audit.ensure_loaded(db)
+    entries = recent_audit.recent(limit)
+    if entries is not None:
+        return entries
     result = await db.execute(
         select(AuditLog)
+        .where(AuditLog.created_at >= audit_archiver.hot_since())
         .order_by(AuditLog.created_at.desc())
         .limit(limit)
     )
     return result.scalars().all()
 
 
+@router.get("/stats", response_model=AuditStatsResponse)
+async def get_audit_stats(
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    bucket: StatsBucket = Query(StatsBucket.MINUTE),
+    source: StatsSource = Query(StatsSource.AUTO),
+    project_id: Optional[str] = Query(None),
+    agent_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get audit aggregates for charts over [since, until), by default the last 24 hours.
+
+    Returns entries per time bucket and action, totals and error rates per
+    agent, and the most frequent commands. Long ranges are served from a
+    per-minute rollup table unless ``source=raw`` is given.
+    """
+    until = until or datetime.utcnow()
+    since = since or until - timedelta(hours=24)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return await audit_stats(db, since, until, bucket, source, project_id, agent_id)
+
+
+@router.get("/archive", response_model=list[AuditLogResponse])
+async def list_archived_audit_logs(
+    since: datetime = Query(...),
+    until: datetime = Query(...),
+    project_id: Optional[str] = Query(None),
+    agent_id: Optional[str] = Query(None),
+    action: Optional[AuditAction] = Query(None),
+    limit: int = Query(100, le=1000),
+):
+    """List archived audit logs created in [since, until), oldest first.
+
+    Reads the compressed segment files of the months in range on demand.
+    """
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return await audit_archiver.read(since, until, project_id, agent_id, action, limit)
+
+
+@router.get("/archive/segments", response_model=list[AuditArchiveSegment])
+async def list_archive_segments():
+    """List audit archive segment files."""
+    return audit_archiver.segments()
+
+
+@router.get("/pipeline", response_model=AuditPipelineStats)
+async def get_audit_pipeline_stats():
+    """Get the per-action sampling/aggregation policies and their effect since startup."""
+    return AuditPipelineStats(
+        policies=get_settings().audit_action_policies,
+        offered=dict(audit_pipeline.offered),
+        written=dict(audit_pipeline.written),
+        pending=audit_pipeline.pending,
+    )
+
+
+@router.get("/blobs/{blob_hash}")
+async def get_audit_blob(blob_hash: str, db: AsyncSession = Depends(get_db)):
+    """Fetch an offloaded audit payload by the hash in an entry's ``offloaded`` stub."""
+    blob = await load_blob(db, blob_hash)
+    if not blob:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    data, content_type = blob
+    # Content-addressed, so it never changes
+    return Response(
+        content=data,
+        media_type=content_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 @router.get("/agent/{agent_id}", response_model=list[AuditLogResponse])
 async def get_agent_activity(
     agent_id: str,
     limit: int = Query(100, le=500),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get activity for a specific agent."""
+    """Get activity for a specific agent.
+
+    Served from the agent's in-memory buffer when ``limit`` fits.
+    """
+    await recent_audit.ensure_loaded(db)
+    entries = recent_audit.for_agent(agent_id, limit)
+    if entries is not None:
+        return entries
     result = await db.execute(
         select(AuditLog)
-        .where(AuditLog.agent_id == agent_id)
+        .where(AuditLog.agent_id == agent_id, AuditLog.created_at >= audit_archiver.hot_since())
         .order_by(AuditLog.created_at.desc())
         .limit(limit)
     )
@@ -0,0 +1,18 @@
+"""Helpers for batch endpoints."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def fetch_by_ids(db: AsyncSession, model, ids: list[str]) -> tuple[list, list[str]]:
+    """Load rows with a single IN query.
+
+    Returns the rows in the order their ids were requested (duplicates
+    collapsed) and the ids that were not found.
+    """
+    ids = list(dict.fromkeys(ids))
+    result = await db.execute(select(model).where(model.id.in_(ids)))
+    found = {row.id: row for row in result.scalars()}
+    return (
+        [found[i] for i in ids if i in found],
+        [i for i in ids if i not in found],
+    )
@@ -1,13 +1,34 @@
 """Build Phase workflow endpoints."""
-import subprocess
-import os
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from src.database import get_db
 from src.models.project import Project
-from src.schemas.build import BuildInitRequest, BuildInitResponse
+from src.models.requirement import ProjectRequirement
+from src.models.tech_decision import ProjectTechDecision
+from src.schemas.build import (
+    BuildInitRequest,
+    BuildInitResponse,
+    BuildJob,
+    BuildStatusResponse,
+    Requirement,
+    RequirementUpdate,
+    TechDecision,
+    TechDecisionUpdate,
+)
+from src.services.build_jobs import build_jobs
+from src.services.design_artifacts import (
+    artifact_counts,
+    new_requirement,
+    new_tech_decision,
+    next_position,
+    replace_design_artifacts,
+    requirement_out,
+    tech_decision_out,
+)
+from src.routes.etag import etag_guard
 
 router = APIRouter(prefix="/build", tags=["build"])
 
@@ -23,6 +44,11 @@ async def initialize_build(
     1. Storing the finalized requirements and tech stack
     2. Optionally creating a GitHub repository
     3. Updating the project phase
+
+    Repository creation runs as a background job, started once the
+    transition commits, so the request returns immediately; follow it via
+    ``job_id`` at /build/jobs/{job_id} or the BUILD_JOB_UPDATE WebSocket
+    messages.
     """
     # Get the project
     result = await db.execute(select(Project).where(Project.id == request.project_id))
@@ -30,44 +56,23 @@ async def initialize_build(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Store design decisions in project config
-    config = project.config or {}
-    config["design"] = {
-        "requirements": [r.model_dump() for r in request.requirements],
-        "tech_stack": [t.model_dump() for t in request.tech_stack],
-        "notes": request.notes,
-    }
+    # Store design decisions in their own tables; only notes and phase stay in config
+    await replace_design_artifacts(db, project.id, request.requirements, request.tech_stack)
+    config = dict(project.config or {})
+    config["design"] = {"notes": request.notes}
     config["phase"] = "build"
     project.config = config
 
-    github_url = None
+    await db.flush()
+
+    job = None
     next_steps = []
 
-    # Create GitHub repo if requested
+    # Create GitHub repo in the background, once this transaction commits, if requested
     if request.create_github_repo and request.github_repo_name:
-        try:
-            repo_name = request.github_repo_name.lower().replace(" ", "-")
-
-            # Use gh CLI to create repo
-            result = subprocess.run(
-                ["gh", "repo", "create", repo_name, "--private", "--confirm"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode == 0:
-                # Extract URL from output or construct it
-                github_url = f"https://github.com/{os.environ.get('GITHUB_USER', 'user')}/{repo_name}"
-                project.github_repo_name = repo_name
-                project.github_repo_url = github_url
-                next_steps.append(f"Clone repository: git clone {github_url}")
-            else:
-                # If gh fails, continue without repo
-                next_steps.append("GitHub repo creation skipped (gh CLI not configured)")
-
-        except Exception as e:
-            next_steps.append(f"GitHub repo creation skipped: {str(e)}")
+        repo_name = request.github_repo_name.lower().replace(" ", "-")
+        job = build_jobs.submit(db, project.id, repo_name)
+        next_steps.append(f"GitHub repository '{repo_name}' is being created (job {job.job_id})")
 
     # Standard next steps
     next_steps.extend([
@@ -76,34 +81,195 @@ async def initialize_build(
         "Implement core features",
     ])
 
-    await db.flush()
-
     return BuildInitResponse(
         success=True,
         project_id=request.project_id,
         phase="build",
-        github_repo_url=github_url,
+        github_repo_url=project.github_repo_url,
         message="Project transitioned to build phase successfully",
         next_steps=next_steps,
+        requirement_count=len({r.id for r in request.requirements}),
+        tech_decision_count=len({t.id for t in request.tech_stack}),
+        job_id=job.job_id if job else None,
+        job_status=job.status if job else None,
     )
 
 
-@router.get("/status/{project_id}")
+@router.get("/jobs", response_model=list[BuildJob])
+async def list_build_jobs(project_id: Optional[str] = None):
+    """List build jobs, newest first, optionally for one project."""
+    return build_jobs.jobs(project_id)
+
+
+@router.get("/jobs/{job_id}", response_model=BuildJob)
+async def get_build_job(job_id: str):
+    """Get the status and progress of a build job."""
+    job = build_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Build job not found")
+    return job
+
+
+@router.get(
+    "/status/{project_id}",
+    response_model=BuildStatusResponse,
+    dependencies=[Depends(etag_guard(
+        "projects", "project_requirements", "project_tech_decisions", project_param="project_id",
+    ))],
+)
 async def get_build_status(project_id: str, db: AsyncSession = Depends(get_db)):
-    """Get the current build status of a project."""
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
-    if not project:
+    """Get the current build status of a project.
+
+    Only the phase is read out of the project config; artifact counts come
+    from indexed COUNTs on the requirement and tech decision tables.
+    """
+    result = await db.execute(
+        select(Project.github_repo_url, Project.config["phase"].as_string())
+        .where(Project.id == project_id)
+    )
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="Project not found")
+    github_repo_url, phase = row
+
+    requirement_count, tech_decision_count = await artifact_counts(db, project_id)
+
+    return BuildStatusResponse(
+        project_id=project_id,
+        phase=phase or "design",
+        has_requirements=requirement_count > 0,
+        has_tech_stack=tech_decision_count > 0,
+        requirement_count=requirement_count,
+        tech_decision_count=tech_decision_count,
+        github_repo_url=github_repo_url,
+    )
+
+
+async def _ensure_project(db: AsyncSession, project_id: str) -> None:
+    """Raise 404 unless the project exists."""
+    if await db.scalar(select(Project.id).where(Project.id == project_id)) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+
+async def _get_artifact(db: AsyncSession, model, project_id: str, ref: str, label: str):
+    """Load a requirement or tech decision by its client id, or raise 404."""
+    result = await db.execute(
+        select(model).where(model.project_id == project_id, model.ref == ref)
+    )
+    artifact = result.scalar_one_or_none()
+    if not artifact:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    return artifact
+
+
+async def _ensure_new_ref(db: AsyncSession, model, project_id: str, ref: str, label: str) -> None:
+    """Raise 409 if the project already has an artifact with this client id."""
+    existing = await db.scalar(
+        select(model.id).where(model.project_id == project_id, model.ref == ref)
+    )
+    if existing is not None:
+        raise HTTPException(status_code=409, detail=f"{label} '{ref}' already exists")
+
+
+@router.get("/{project_id}/requirements", response_model=list[Requirement])
+async def list_requirements(project_id: str, db: AsyncSession = Depends(get_db)):
+    """List a project's requirements in the order they were added."""
+    await _ensure_project(db, project_id)
+    result = await db.execute(
+        select(ProjectRequirement)
+        .where(ProjectRequirement.project_id == project_id)
+        .order_by(ProjectRequirement.position)
+    )
+    return [requirement_out(row) for row in result.scalars()]
 
-    config = project.config or {}
-    phase = config.get("phase", "design")
-    design = config.get("design", {})
-
-    return {
-        "project_id": project_id,
-        "phase": phase,
-        "has_requirements": len(design.get("requirements", [])) > 0,
-        "has_tech_stack": len(design.get("tech_stack", [])) > 0,
-        "github_repo_url": project.github_repo_url,
-    }
+
+@router.post("/{project_id}/requirements", response_model=Requirement)
+async def add_requirement(
+    project_id: str,
+    requirement: Requirement,
+    db: AsyncSession = Depends(get_db)
+):
+    """Add one requirement to a project."""
+    await _ensure_project(db, project_id)
+    await _ensure_new_ref(db, ProjectRequirement, project_id, requirement.id, "Requirement")
+    position = await next_position(db, ProjectRequirement, project_id)
+    row = new_requirement(project_id, requirement, position)
+    db.add(row)
+    await db.flush()
+    return requirement_out(row)
+
+
+@router.patch("/{project_id}/requirements/{requirement_id}", response_model=Requirement)
+async def update_requirement(
+    project_id: str,
+    requirement_id: str,
+    update: RequirementUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Update fields of one requirement."""
+    row = await _get_artifact(db, ProjectRequirement, project_id, requirement_id, "Requirement")
+    for field, value in update.model_dump(exclude_unset=True).items():
+        setattr(row, field, value)
+    await db.flush()
+    return requirement_out(row)
+
+
+@router.delete("/{project_id}/requirements/{requirement_id}")
+async def delete_requirement(project_id: str, requirement_id: str, db: AsyncSession = Depends(get_db)):
+    """Remove one requirement."""
+    row = await _get_artifact(db, ProjectRequirement, project_id, requirement_id, "Requirement")
+    await db.delete(row)
+    await db.flush()
+    return {"status": "deleted", "requirement_id": requirement_id}
+
+
+@router.get("/{project_id}/tech-stack", response_model=list[TechDecision])
+async def list_tech_decisions(project_id: str, db: AsyncSession = Depends(get_db)):
+    """List a project's tech stack decisions in the order they were added."""
+    await _ensure_project(db, project_id)
+    result = await db.execute(
+        select(ProjectTechDecision)
+        .where(ProjectTechDecision.project_id == project_id)
+        .order_by(ProjectTechDecision.position)
+    )
+    return [tech_decision_out(row) for row in result.scalars()]
+
+
+@router.post("/{project_id}/tech-stack", response_model=TechDecision)
+async def add_tech_decision(
+    project_id: str,
+    decision: TechDecision,
+    db: AsyncSession = Depends(get_db)
+):
+    """Add one tech stack decision to a project."""
+    await _ensure_project(db, project_id)
+    await _ensure_new_ref(db, ProjectTechDecision, project_id, decision.id, "Tech decision")
+    position = await next_position(db, ProjectTechDecision, project_id)
+    row = new_tech_decision(project_id, decision, position)
+    db.add(row)
+    await db.flush()
+    return tech_decision_out(row)
+
+
+@router.patch("/{project_id}/tech-stack/{decision_id}", response_model=TechDecision)
+async def update_tech_decision(
+    project_id: str,
+    decision_id: str,
+    update: TechDecisionUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Update fields of one tech stack decision."""
+    row = await _get_artifact(db, ProjectTechDecision, project_id, decision_id, "Tech decision")
+    for field, value in update.model_dump(exclude_unset=True).items():
+        setattr(row, field, value)
+    await db.flush()
+    return tech_decision_out(row)
+
+
+@router.delete("/{project_id}/tech-stack/{decision_id}")
+async def delete_tech_decision(project_id: str, decision_id: str, db: AsyncSession = Depends(get_db)):
+    """Remove one tech stack decision."""
+    row = await _get_artifact(db, ProjectTechDecision, project_id, decision_id, "Tech decision")
+    await db.delete(row)
+    await db.flush()
+    return {"status": "deleted", "decision_id": decision_id}
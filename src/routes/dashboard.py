@@ -0,0 +1,20 @@
+"""Dashboard aggregate endpoint."""
+from fastapi import APIRouter, Response
+from src.config import get_settings
+from src.schemas.dashboard import DashboardResponse
+from src.services.dashboard import dashboard_service
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("", response_model=DashboardResponse, response_model_exclude_unset=True)
+async def get_dashboard(response: Response):
+    """Get everything the main dashboard shows in one request.
+
+    Active agents, running RunPlans, recent audit events, per-project cost
+    summaries and task counts by status. The payload is shared by all
+    clients and rebuilt at most once per dashboard_cache_ttl_seconds.
+    """
+    ttl = get_settings().dashboard_cache_ttl_seconds
+    response.headers["Cache-Control"] = f"max-age={int(ttl)}"
+    return await dashboard_service.get()
@@ -7,7 +7,8 @@ design requests as part of their normal workflow.
 
 See: /mcp/design (POST) - Submit design request
 See: /mcp/design/respond (POST) - Agent response endpoint
-See: /mcp/design/{request_id} (GET) - Poll for response
+See: /mcp/design/{request_id} (GET) - Poll for response (?wait= to long-poll)
+See: /mcp/design/{request_id}/stream (GET) - Stream partial responses (SSE)
 """
 import os
 from fastapi import APIRouter, HTTPException
@@ -0,0 +1,32 @@
+"""Conditional GET support from version counters."""
+from typing import Callable, Optional
+from fastapi import HTTPException, Request, Response
+from src.services.versions import versions
+
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    opaque = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def etag_guard(*tables: str, project_param: Optional[str] = None) -> Callable[..., None]:
+    """Dependency tagging a response with the versions of ``tables``.
+
+    With ``project_param``, the versions of the project named by that path
+    parameter are used. A matching ``If-None-Match`` is answered with 304
+    before the route runs; list it before the route's other dependencies.
+    """
+    def dependency(request: Request, response: Response) -> None:
+        project_id = request.path_params.get(project_param) if project_param else None
+        tag = versions.etag(tables, project_id)
+        headers = {"ETag": tag, "Cache-Control": "no-cache"}
+        if _matches(request.headers.get("if-none-match"), tag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
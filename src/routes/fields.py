@@ -0,0 +1,35 @@
+"""Query helpers for sparse fieldsets on list endpoints."""
+from typing import Callable, Iterable, Optional
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.orm import load_only
+from src.schemas.fields import select_fields
+
+
+def fields_param(model: type[BaseModel], default: Iterable[str]) -> Callable[..., list[str]]:
+    """Dependency resolving ``?fields=`` to the field names to return."""
+    default = tuple(default)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to return; defaults to the summary fields",
+        ),
+    ) -> list[str]:
+        try:
+            return select_fields(fields, model, default)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return dependency
+
+
+def with_fields(query: Select, entity, fields: list[str]) -> Select:
+    """Load only the columns backing ``fields``."""
+    return query.options(load_only(*(getattr(entity, name) for name in fields)))
+
+
+def pick(rows, fields: list[str]) -> list[dict]:
+    """Serialize loaded rows to just the selected fields."""
+    return [{name: getattr(row, name) for name in fields} for row in rows]
@@ -1,90 +1,80 @@
 """MCP (Model Context Protocol) agent-to-agent messaging endpoints."""
+import asyncio
 import json
 import uuid
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from src.config import get_settings
+from src.services.design_requests import (
+    design_requests,
+    request_fingerprint,
+    ClaimConflictError,
+    PENDING,
+    COMPLETED,
+    FINISHED_STATUSES,
+)
+from src.services.agent_registry import agent_registry
+from src.services.inbox import agent_inbox, InboxFullError
 from src.websocket.manager import connection_manager
 from src.schemas.mcp import (
     AgentMessageRequest,
     BroadcastMessageRequest,
+    CapabilityMessageRequest,
     AgentRegisterRequest,
     MCPAgentInfo,
     MCPAgentResponse,
     MessageSentResponse,
+    InboxFetchResponse,
+    InboxAckRequest,
+    InboxAckResponse,
     DesignRequestPayload,
     DesignRequestSubmission,
     DesignResponsePayload,
+    DesignPartialPayload,
+    DesignClaimRequest,
+    DesignClaimResponse,
     PendingDesignRequest,
 )
 
 router = APIRouter(prefix="/mcp", tags=["MCP"])
 
-# In-memory store for registered MCP agents
-# In production, this would be stored in the database
-_registered_agents: dict[str, MCPAgentInfo] = {}
-
-# In-memory store for pending design requests
-# Key: request_id, Value: PendingDesignRequest
-_pending_design_requests: dict[str, PendingDesignRequest] = {}
-
-
-async def broadcast_agent_message(
-    message_id: str,
-    source_agent: str,
-    target_agent: Optional[str],
-    message: str,
-    priority: str,
-    message_type: str,
-) -> None:
-    """Broadcast an agent message via WebSocket."""
-    payload = {
-        "type": "AGENT_MESSAGE",
-        "payload": {
-            "message_id": message_id,
-            "source_agent": source_agent,
-            "target_agent": target_agent,
-            "message": message,
-            "priority": priority,
-            "message_type": message_type,
-        },
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await connection_manager.broadcast(json.dumps(payload))
-
-
 @router.post("/message", response_model=MessageSentResponse)
 async def send_message(request: AgentMessageRequest):
     """Send a message to a specific agent.
 
-    The message is broadcast via WebSocket with type "AGENT_MESSAGE".
+    The message is queued in the target's inbox and pushed over WebSocket
+    (type "AGENT_MESSAGE") to connections bound to the target agent
+    (``/ws?agent_id=...``). It stays in the inbox until acknowledged, so a
+    target that is not connected receives it when it reconnects.
     Target agent must be registered to receive the message.
     """
     # Verify target agent is registered
-    if request.target_agent not in _registered_agents:
+    if request.target_agent not in agent_registry:
         raise HTTPException(
             status_code=404,
             detail=f"Target agent '{request.target_agent}' is not registered"
         )
 
-    message_id = str(uuid.uuid4())
-
-    # Broadcast via WebSocket
-    await broadcast_agent_message(
-        message_id=message_id,
-        source_agent="api",  # Could be enhanced to track source
-        target_agent=request.target_agent,
+    message = agent_inbox.new_message(
+        agent_id=request.target_agent,
         message=request.message,
-        priority=request.priority.value,
+        priority=request.priority,
         message_type=request.type.value,
+        source_agent="api",  # Could be enhanced to track source
     )
+    try:
+        await agent_inbox.post(message)
+    except InboxFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
 
     # Update last_seen for target agent
-    _registered_agents[request.target_agent].last_seen = datetime.utcnow()
+    agent_registry.touch(request.target_agent)
 
     return MessageSentResponse(
         success=True,
-        message_id=message_id,
+        message_id=message.message_id,
         delivered_to=request.target_agent,
         timestamp=datetime.utcnow(),
     )
@@ -94,39 +84,114 @@ async def send_message(request: AgentMessageRequest):
 async def broadcast_message(request: BroadcastMessageRequest):
     """Broadcast a message to all registered agents.
 
-    The message is sent to all connected WebSocket clients.
+    A copy is queued in every registered agent's inbox; agents whose inbox
+    is full of more important messages are skipped.
     """
-    if not _registered_agents:
+    if not len(agent_registry):
         raise HTTPException(
             status_code=400,
             detail="No agents registered to receive broadcast"
         )
 
     message_id = str(uuid.uuid4())
-    agent_ids = list(_registered_agents.keys())
+    delivered_to = []
+    for agent_id in agent_registry.agent_ids():
+        message = agent_inbox.new_message(
+            agent_id=agent_id,
+            message=request.message,
+            priority=request.priority,
+            message_type="notification",
+            is_broadcast=True,
+            message_id=message_id,
+        )
+        try:
+            await agent_inbox.post(message)
+        except InboxFullError:
+            continue
+        delivered_to.append(agent_id)
 
-    # Broadcast via WebSocket to all
-    await broadcast_agent_message(
+    return MessageSentResponse(
+        success=True,
         message_id=message_id,
-        source_agent="api",
-        target_agent=None,  # Broadcast to all
+        delivered_to=delivered_to,
+        timestamp=datetime.utcnow(),
+    )
+
+
+@router.post("/route", response_model=MessageSentResponse)
+async def route_message(request: CapabilityMessageRequest):
+    """Send a message to one agent offering a capability.
+
+    The target is chosen among online agents registered with the capability,
+    either the one with the least in-flight work (default) or round-robin.
+    """
+    agent = agent_registry.select(request.capability, request.strategy)
+    if agent is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No online agent offers capability '{request.capability}'"
+        )
+
+    message = agent_inbox.new_message(
+        agent_id=agent.agent_id,
         message=request.message,
-        priority=request.priority.value,
-        message_type="notification",
+        priority=request.priority,
+        message_type=request.type.value,
+        source_agent="api",
     )
+    try:
+        await agent_inbox.post(message)
+    except InboxFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    agent_registry.touch(agent.agent_id)
 
     return MessageSentResponse(
         success=True,
-        message_id=message_id,
-        delivered_to=agent_ids,
+        message_id=message.message_id,
+        delivered_to=agent.agent_id,
         timestamp=datetime.utcnow(),
     )
 
 
+@router.get("/inbox/{agent_id}", response_model=InboxFetchResponse)
+async def fetch_inbox(agent_id: str, limit: int = Query(50, ge=1, le=500)):
+    """Fetch a batch of unacknowledged messages for an agent.
+
+    Messages are returned highest priority first and leased for the ack
+    timeout; anything not acknowledged by then is delivered again.
+    """
+    messages = await agent_inbox.fetch(agent_id, limit)
+    agent_registry.touch(agent_id)
+    return InboxFetchResponse(
+        agent_id=agent_id,
+        messages=messages,
+        ack_timeout_seconds=get_settings().mcp_inbox_ack_timeout_seconds,
+    )
+
+
+@router.post("/inbox/{agent_id}/ack", response_model=InboxAckResponse)
+async def ack_inbox_messages(agent_id: str, request: InboxAckRequest):
+    """Acknowledge delivered messages, removing them from the inbox."""
+    acked = await agent_inbox.ack(agent_id, request.message_ids)
+    agent_registry.touch(agent_id)
+    return InboxAckResponse(agent_id=agent_id, acked=acked)
+
+
 @router.get("/agents", response_model=list[MCPAgentInfo])
-async def list_agents():
-    """List all registered MCP agents and their status."""
-    return list(_registered_agents.values())
+async def list_agents(capability: Optional[str] = None):
+    """List registered MCP agents and their status.
+
+    Pass ``capability`` to list only the agents offering it.
+    """
+    if capability is not None:
+        return agent_registry.with_capability(capability)
+    return agent_registry.agents()
+
+
+@router.get("/capabilities", response_model=dict[str, list[str]])
+async def list_capabilities():
+    """List every registered capability and the agents offering it."""
+    return agent_registry.capabilities()
 
 
 @router.post("/register", response_model=MCPAgentResponse)
@@ -136,15 +201,7 @@ async def register_agent(request: AgentRegisterRequest):
     Agents must be registered before they can send or receive messages.
     Re-registering an existing agent updates its capabilities.
     """
-    is_update = request.agent_id in _registered_agents
-
-    _registered_agents[request.agent_id] = MCPAgentInfo(
-        agent_id=request.agent_id,
-        capabilities=request.capabilities,
-        status="online",
-        registered_at=datetime.utcnow() if not is_update else _registered_agents[request.agent_id].registered_at,
-        last_seen=datetime.utcnow(),
-    )
+    _, is_update = agent_registry.register(request.agent_id, request.capabilities)
 
     return MCPAgentResponse(
         agent_id=request.agent_id,
@@ -156,14 +213,12 @@ async def register_agent(request: AgentRegisterRequest):
 @router.delete("/agents/{agent_id}", response_model=MCPAgentResponse)
 async def unregister_agent(agent_id: str):
     """Unregister an agent from the MCP system."""
-    if agent_id not in _registered_agents:
+    if not agent_registry.unregister(agent_id):
         raise HTTPException(
             status_code=404,
             detail=f"Agent '{agent_id}' is not registered"
         )
 
-    del _registered_agents[agent_id]
-
     return MCPAgentResponse(
         agent_id=agent_id,
         registered=False,
@@ -179,10 +234,34 @@ async def unregister_agent(agent_id: str):
 async def submit_design_request(payload: DesignRequestPayload):
     """Submit a design assistance request to be handled by an agent.
 
-    The request is broadcast via WebSocket with type "DESIGN_REQUEST".
-    Agents listening can pick up the request and respond via /mcp/design/respond.
+    The request is sent via WebSocket with type "DESIGN_REQUEST" to the
+    connections of agents registered with the design capability, falling
+    back to all clients when no such agent is connected. Agents listening can pick up the request and respond via /mcp/design/respond.
     Frontend should listen on WebSocket for "DESIGN_RESPONSE" with matching request_id.
+
+    Identical requests (same project, message, context and history) are
+    deduplicated: if one is still in flight its request_id is returned, and
+    if one completed within the dedupe window its response is returned
+    directly without involving an agent.
     """
+    fingerprint = request_fingerprint(payload)
+    duplicate = design_requests.find_duplicate(fingerprint)
+    if duplicate is not None:
+        if duplicate.status == COMPLETED:
+            return DesignRequestSubmission(
+                request_id=duplicate.request_id,
+                status=duplicate.status,
+                message="Identical design request answered recently; served from cache.",
+                response=duplicate.response,
+                deduplicated=True,
+            )
+        return DesignRequestSubmission(
+            request_id=duplicate.request_id,
+            status=duplicate.status,
+            message="Identical design request already in progress. Listen on WebSocket for DESIGN_RESPONSE.",
+            deduplicated=True,
+        )
+
     request_id = str(uuid.uuid4())
 
     # Store the pending request
@@ -190,9 +269,10 @@ async def submit_design_request(payload: DesignRequestPayload):
         request_id=request_id,
         payload=payload,
         submitted_at=datetime.utcnow(),
-        status="pending",
+        status=PENDING,
+        fingerprint=fingerprint,
     )
-    _pending_design_requests[request_id] = pending
+    design_requests.add(pending)
 
     # Broadcast the design request via WebSocket
     ws_payload = {
@@ -208,15 +288,52 @@ async def submit_design_request(payload: DesignRequestPayload):
         },
         "timestamp": datetime.utcnow().isoformat(),
     }
-    await connection_manager.broadcast(json.dumps(ws_payload))
+    design_agents = agent_registry.with_capability(get_settings().design_capability)
+    delivered = 0
+    for agent in design_agents:
+        delivered += await connection_manager.send_to_agent(agent.agent_id, json.dumps(ws_payload))
+    if not delivered:
+        # Never fan out to everyone; a design agent picks it up from GET /mcp/design
+        return DesignRequestSubmission(
+            request_id=request_id,
+            status=PENDING,
+            message="No design agent is connected; the request stays pending until one picks it up.",
+        )
 
     return DesignRequestSubmission(
         request_id=request_id,
-        status="pending",
+        status=PENDING,
         message="Design request submitted. Listen on WebSocket for DESIGN_RESPONSE.",
     )
 
 
+@router.post("/design/{request_id}/claim", response_model=DesignClaimResponse)
+async def claim_design_request(request_id: str, claim: DesignClaimRequest):
+    """Agent endpoint to take exclusive ownership of a design request.
+
+    The claim is a lease that expires after design_claim_lease_seconds; the
+    holder claims again to renew it. An expired lease puts the request back
+    in the pending list. Only the holder may respond to a claimed request.
+    """
+    pending = design_requests.get(request_id)
+    if pending is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Design request '{request_id}' not found"
+        )
+    try:
+        design_requests.claim(pending, claim.agent_id)
+    except ClaimConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return DesignClaimResponse(
+        request_id=request_id,
+        agent_id=claim.agent_id,
+        status=pending.status,
+        lease_expires_at=pending.claim_expires_at,
+    )
+
+
 @router.post("/design/respond")
 async def respond_to_design_request(response: DesignResponsePayload):
     """Agent endpoint to respond to a pending design request.
@@ -224,18 +341,21 @@ async def respond_to_design_request(response: DesignResponsePayload):
     The response is broadcast via WebSocket with type "DESIGN_RESPONSE".
     Frontend receives this and displays the AI response.
     """
-    if response.request_id not in _pending_design_requests:
+    pending = design_requests.get(response.request_id)
+    if pending is None:
         raise HTTPException(
             status_code=404,
             detail=f"Design request '{response.request_id}' not found or already completed"
         )
-
-    pending = _pending_design_requests[response.request_id]
+    try:
+        design_requests.check_holder(pending, response.agent_id)
+    except ClaimConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     # Update the pending request
-    pending.status = "completed"
     pending.response = response.response
     pending.responded_by = response.agent_id
+    design_requests.set_status(pending, COMPLETED)
 
     # Broadcast the response via WebSocket
     ws_payload = {
@@ -249,9 +369,7 @@ async def respond_to_design_request(response: DesignResponsePayload):
     }
     await connection_manager.broadcast(json.dumps(ws_payload))
 
-    # Clean up completed request (keep for a bit for polling fallback)
-    # In production, would use TTL or scheduled cleanup
-
+    # Completed requests stay available for polling until their TTL expires
     return {
         "success": True,
         "request_id": response.request_id,
@@ -259,26 +377,129 @@ async def respond_to_design_request(response: DesignResponsePayload):
     }
 
 
-@router.get("/design/{request_id}")
-async def get_design_request_status(request_id: str):
-    """Get the status of a design request (polling fallback).
+def _design_request_status(pending: PendingDesignRequest) -> dict:
+    """Status payload for a design request."""
+    return {
+        "request_id": pending.request_id,
+        "status": pending.status,
+        "response": pending.response,
+        "partial_response": pending.partial_response,
+        "responded_by": pending.responded_by,
+        "claimed_by": pending.claimed_by,
+        "submitted_at": pending.submitted_at.isoformat(),
+        "completed_at": pending.completed_at.isoformat() if pending.completed_at else None,
+    }
+
+
+@router.post("/design/{request_id}/partial")
+async def stream_partial_design_response(request_id: str, partial: DesignPartialPayload):
+    """Agent endpoint to relay part of a design response while it is generated.
 
-    Use this if WebSocket is not available.
+    Chunks are appended to the request's partial response, pushed to
+    ``/mcp/design/{request_id}/stream`` listeners and broadcast via
+    WebSocket with type "DESIGN_RESPONSE_PARTIAL".
     """
-    if request_id not in _pending_design_requests:
+    pending = design_requests.get(request_id)
+    if pending is None:
         raise HTTPException(
             status_code=404,
             detail=f"Design request '{request_id}' not found"
         )
+    try:
+        design_requests.check_holder(pending, partial.agent_id)
+    except ClaimConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    pending = _pending_design_requests[request_id]
-    return {
-        "request_id": pending.request_id,
-        "status": pending.status,
-        "response": pending.response,
-        "responded_by": pending.responded_by,
-        "submitted_at": pending.submitted_at.isoformat(),
+    design_requests.publish_partial(pending, partial.chunk)
+
+    ws_payload = {
+        "type": "DESIGN_RESPONSE_PARTIAL",
+        "payload": {
+            "request_id": request_id,
+            "agent_id": partial.agent_id,
+            "chunk": partial.chunk,
+        },
+        "timestamp": datetime.utcnow().isoformat(),
     }
+    await connection_manager.broadcast(json.dumps(ws_payload))
+
+    return {"success": True, "request_id": request_id}
+
+
+@router.get("/design/{request_id}/stream")
+async def stream_design_request(
+    request_id: str,
+    timeout: float = Query(120.0, gt=0, le=600),
+):
+    """Stream a design request's progress as Server-Sent Events.
+
+    Emits the partial response so far, a "partial" event per chunk an agent
+    relays, and ends with a "completed" or "timeout" event.
+    """
+    pending = design_requests.get(request_id)
+    if pending is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Design request '{request_id}' not found"
+        )
+
+    def sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    async def events():
+        queue = design_requests.subscribe(request_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            if pending.partial_response:
+                yield sse("partial", {"chunk": pending.partial_response})
+            if pending.status in FINISHED_STATUSES:
+                yield sse(pending.status, _design_request_status(pending))
+                return
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if event == "partial":
+                    yield sse("partial", {"chunk": data})
+                else:
+                    yield sse(event, _design_request_status(data))
+                    return
+            # Stream window elapsed before the request finished
+            current = design_requests.get(request_id) or pending
+            yield sse(current.status, _design_request_status(current))
+        finally:
+            design_requests.unsubscribe(request_id, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.get("/design/{request_id}")
+async def get_design_request_status(
+    request_id: str,
+    wait: float = Query(0.0, ge=0, le=60),
+):
+    """Get the status of a design request.
+
+    Use this if WebSocket is not available. With ``?wait=<seconds>`` the
+    call holds until an agent responds (or the wait runs out) instead of
+    returning immediately, replacing tight polling loops.
+    """
+    if wait:
+        pending = await design_requests.wait(request_id, wait)
+    else:
+        pending = design_requests.get(request_id)
+    if pending is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Design request '{request_id}' not found"
+        )
+
+    return _design_request_status(pending)
 
 
 @router.get("/design")
@@ -295,7 +516,6 @@ async def list_pending_design_requests():
             "status": req.status,
             "submitted_at": req.submitted_at.isoformat(),
         }
-        for req in _pending_design_requests.values()
-        if req.status == "pending"
+        for req in design_requests.list_by_status(PENDING)
     ]
     return {"pending_requests": pending, "count": len(pending)}
@@ -5,22 +5,40 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from src.database import get_db
 from src.models.project import Project
-from src.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from src.schemas.project import (
+    ProjectCreate,
+    ProjectUpdate,
+    ProjectResponse,
+    ProjectListItem,
+    PROJECT_SUMMARY_FIELDS,
+)
+from src.routes.fields import fields_param, with_fields, pick
+from src.routes.etag import etag_guard
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
-@router.get("", response_model=list[ProjectResponse])
+@router.get(
+    "",
+    response_model=list[ProjectListItem],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(etag_guard("projects"))],
+)
 async def list_projects(
     active_only: bool = True,
+    fields: list[str] = Depends(fields_param(ProjectResponse, PROJECT_SUMMARY_FIELDS)),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all projects."""
-    query = select(Project)
+    """List all projects.
+
+    Returns project summaries (no config); use ``?fields=`` to pick the
+    fields to return, or GET /projects/{project_id} for the full project.
+    """
+    query = with_fields(select(Project), Project, fields)
     if active_only:
         query = query.where(Project.is_active == True)
     result = await db.execute(query)
-    return result.scalars().all()
+    return pick(result.scalars(), fields)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
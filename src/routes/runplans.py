@@ -4,24 +4,45 @@ from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, case
 from src.database import get_db
 from src.models.runplan import RunPlan, RunPlanStatus
-from src.schemas.runplan import RunPlanCreate, RunPlanUpdate, RunPlanResponse
-from src.services.broadcaster import broadcast_runplan_update
+from src.models.runplan_step import RunPlanStep, RunPlanStepStatus
+from src.schemas.runplan import (
+    RunPlanCreate,
+    RunPlanUpdate,
+    RunPlanResponse,
+    RunPlanRetryResponse,
+    RunPlanStepCreate,
+    RunPlanStepResponse,
+    RunPlanBatchGetResponse,
+    RunPlanListItem,
+    RUNPLAN_SUMMARY_FIELDS,
+)
+from src.schemas.batch import BatchGetRequest
+from src.routes.batch import fetch_by_ids
+from src.routes.fields import fields_param, with_fields, pick
+from src.routes.etag import etag_guard
+from src.services.broadcaster import broadcast_runplan_update, broadcast_runplan_step
+from src.services.retry_scheduler import retry_scheduler
 
 router = APIRouter(prefix="/runplans", tags=["runplans"])
 
 
-@router.get("", response_model=list[RunPlanResponse])
+@router.get("", response_model=list[RunPlanListItem], response_model_exclude_unset=True)
 async def list_runplans(
     task_id: Optional[str] = Query(None),
     status: Optional[RunPlanStatus] = Query(None),
     limit: int = Query(50, le=200),
+    fields: list[str] = Depends(fields_param(RunPlanResponse, RUNPLAN_SUMMARY_FIELDS)),
     db: AsyncSession = Depends(get_db)
 ):
-    """List RunPlans with optional filtering."""
-    query = select(RunPlan)
+    """List RunPlans with optional filtering.
+
+    Returns RunPlan summaries (no inputs/outputs); use ``?fields=`` to pick
+    the fields to return, or GET /runplans/{runplan_id} for the full plan.
+    """
+    query = with_fields(select(RunPlan), RunPlan, fields)
 
     if task_id:
         query = query.where(RunPlan.task_id == task_id)
@@ -30,10 +51,10 @@ async def list_runplans(
 
     query = query.limit(limit).order_by(RunPlan.created_at.desc())
     result = await db.execute(query)
-    return result.scalars().all()
+    return pick(result.scalars(), fields)
 
 
-@router.get("/active", response_model=list[RunPlanResponse])
+@router.get("/active", response_model=list[RunPlanResponse], dependencies=[Depends(etag_guard("runplans"))])
 async def list_active_runplans(db: AsyncSession = Depends(get_db)):
     """List currently running RunPlans."""
     result = await db.execute(
@@ -42,6 +63,22 @@ async def list_active_runplans(db: AsyncSession = Depends(get_db)):
     return result.scalars().all()
 
 
+@router.get("/retries", response_model=list[RunPlanRetryResponse])
+async def list_pending_retries():
+    """List FAILED RunPlans waiting for their next retry."""
+    return [
+        RunPlanRetryResponse(runplan_id=runplan_id, due_at=due_at)
+        for runplan_id, due_at in retry_scheduler.pending()
+    ]
+
+
+@router.post("/batch-get", response_model=RunPlanBatchGetResponse)
+async def batch_get_runplans(request: BatchGetRequest, db: AsyncSession = Depends(get_db)):
+    """Get many RunPlans by ID with one query."""
+    runplans, missing = await fetch_by_ids(db, RunPlan, request.ids)
+    return RunPlanBatchGetResponse(runplans=runplans, missing=missing)
+
+
 @router.get("/{runplan_id}", response_model=RunPlanResponse)
 async def get_runplan(runplan_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific RunPlan by ID."""
@@ -94,10 +131,84 @@ async def update_runplan(
         setattr(runplan, field, value)
 
     await db.flush()
+
+    # Failed runs are re-driven by the retry scheduler
+    if runplan.status == RunPlanStatus.FAILED:
+        retry_scheduler.schedule(runplan)
+    else:
+        retry_scheduler.cancel(runplan.id)
+
     await broadcast_runplan_update(runplan)
     return runplan
 
 
+@router.post("/{runplan_id}/steps", response_model=RunPlanStepResponse)
+async def append_runplan_step(
+    runplan_id: str,
+    step_data: RunPlanStepCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Append a step event to a RunPlan's step log.
+
+    Runners report each step here instead of PATCHing a growing ``outputs``
+    dict. The step is inserted as its own row, and the RunPlan's progress
+    counters are advanced in a single UPDATE: ``current_step`` moves up to
+    the highest completed step, ``tokens_used`` grows by the step's tokens
+    and ``total_steps`` follows the runner's value or the highest step seen.
+    The event is broadcast via WebSocket as "RUNPLAN_STEP".
+    """
+    step_index = step_data.step_index
+    values = {
+        "tokens_used": RunPlan.tokens_used + step_data.tokens_used,
+        "total_steps": step_data.total_steps if step_data.total_steps is not None else case(
+            (RunPlan.total_steps < step_index, step_index), else_=RunPlan.total_steps
+        ),
+    }
+    if step_data.status == RunPlanStepStatus.COMPLETED:
+        values["current_step"] = case(
+            (RunPlan.current_step < step_index, step_index), else_=RunPlan.current_step
+        )
+    result = await db.execute(
+        update(RunPlan)
+        .where(RunPlan.id == runplan_id)
+        .values(**values)
+        .returning(
+            RunPlan.id, RunPlan.task_id, RunPlan.skill_name, RunPlan.status,
+            RunPlan.current_step, RunPlan.total_steps, RunPlan.tokens_used, RunPlan.updated_at,
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    progress = result.one_or_none()
+    if not progress:
+        raise HTTPException(status_code=404, detail="RunPlan not found")
+
+    step = RunPlanStep(
+        id=str(uuid.uuid4()),
+        runplan_id=runplan_id,
+        **step_data.model_dump(exclude={"total_steps"}),
+    )
+    db.add(step)
+    await db.flush()
+
+    await broadcast_runplan_step(progress, step)
+    return step
+
+
+@router.get("/{runplan_id}/steps", response_model=list[RunPlanStepResponse])
+async def list_runplan_steps(
+    runplan_id: str,
+    after_index: int = Query(0, ge=0, description="Only steps with a higher step_index"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a RunPlan's step log in step order."""
+    result = await db.execute(
+        select(RunPlanStep)
+        .where(RunPlanStep.runplan_id == runplan_id, RunPlanStep.step_index > after_index)
+        .order_by(RunPlanStep.step_index, RunPlanStep.created_at)
+    )
+    return result.scalars().all()
+
+
 @router.post("/{runplan_id}/start", response_model=RunPlanResponse)
 async def start_runplan(runplan_id: str, db: AsyncSession = Depends(get_db)):
     """Start executing a RunPlan."""
@@ -0,0 +1,43 @@
+"""Full-text search endpoints."""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import get_db
+from src.schemas.search import SearchResult, SearchSourceType
+from src.services.search_index import search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=list[SearchResult])
+async def search_everything(
+    q: str = Query(..., min_length=1, max_length=500),
+    project_id: Optional[str] = Query(None),
+    agent_id: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    type: Optional[list[SearchSourceType]] = Query(None),
+    limit: int = Query(50, le=200),
+    offset: int = Query(0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search audit descriptions, commands and file paths, tasks and projects.
+
+    Results match every word of ``q`` and are ranked best first. Narrow
+    them by project, agent, time range (``since`` inclusive, ``until``
+    exclusive) and ``type`` (repeatable).
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=422, detail="q must contain at least one word")
+    return await search(
+        db, q,
+        project_id=project_id,
+        agent_id=agent_id,
+        since=since,
+        until=until,
+        types=type,
+        limit=limit,
+        offset=offset,
+    )
@@ -0,0 +1,29 @@
+"""Status count endpoints."""
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import get_db
+from src.schemas.dashboard import StatusCountsResponse
+from src.services.status_counters import status_counters
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/counts", response_model=StatusCountsResponse)
+async def get_status_counts(
+    project_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get task counts per project and status, and agent/RunPlan counts per status.
+
+    Served from in-memory counters kept current on every status change;
+    the database is only counted on first use and by the periodic
+    reconcile. Changes are also pushed via WebSocket as "COUNTS_UPDATE".
+    """
+    await status_counters.ensure_loaded(db)
+    return StatusCountsResponse(
+        tasks=status_counters.task_counts(project_id),
+        agents=status_counters.agent_counts(),
+        runplans=status_counters.runplan_counts(),
+        reconciled_at=status_counters.reconciled_at,
+    )
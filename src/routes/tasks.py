@@ -1,27 +1,96 @@
 """Task management endpoints."""
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, case
 from src.database import get_db
 from src.models.task import Task, TaskStatus
-from src.schemas.task import TaskCreate, TaskUpdate, TaskResponse
-from src.services.broadcaster import broadcast_task_update
+from src.models.task_dependency import TaskDependency
+from src.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskDependencyCreate,
+    TaskDependencyResponse,
+    TaskListItem,
+    TaskBulkCreate,
+    TaskBulkUpdate,
+    TaskBatchGetResponse,
+    TASK_SUMMARY_FIELDS,
+)
+from src.schemas.batch import BatchGetRequest
+from src.routes.batch import fetch_by_ids
+from src.routes.fields import fields_param, with_fields, pick
+from src.services.broadcaster import broadcast_task_update, broadcast_task_batch_update
+from src.services.dependency_graph import dependency_graph
+from src.services.status_counters import status_counters
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-@router.get("", response_model=list[TaskResponse])
+async def unblock_dependents(db: AsyncSession, task_ids: Iterable[str]) -> list[Task]:
+    """Release BLOCKED dependents of completed tasks.
+
+    Only the direct dependents of ``task_ids`` are re-evaluated. Those whose
+    prerequisites have all completed move back to QUEUED (if assigned) or
+    PENDING in a single UPDATE and are broadcast as one batch.
+    """
+    await dependency_graph.ensure_loaded(db)
+    candidates = set().union(*(dependency_graph.dependents_of(task_id) for task_id in task_ids))
+    if not candidates:
+        return []
+
+    prerequisites = {
+        candidate: dependency_graph.dependencies_of(candidate)
+        for candidate in candidates
+    }
+    involved = candidates.union(*prerequisites.values())
+    result = await db.execute(
+        select(Task.id, Task.status).where(Task.id.in_(involved))
+    )
+    statuses = dict(result.all())
+
+    ready = [
+        candidate for candidate in candidates
+        if statuses.get(candidate) == TaskStatus.BLOCKED
+        and all(statuses.get(dep) == TaskStatus.COMPLETED for dep in prerequisites[candidate])
+    ]
+    if not ready:
+        return []
+
+    result = await db.execute(
+        update(Task)
+        .where(Task.id.in_(ready))
+        .values(status=case(
+            (Task.assigned_agent_id.is_(None), TaskStatus.PENDING),
+            else_=TaskStatus.QUEUED,
+        ))
+        .returning(Task)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    unblocked = list(result.scalars())
+    for task in unblocked:
+        status_counters.record_task_transition(db, task.project_id, TaskStatus.BLOCKED, task.status)
+    await broadcast_task_batch_update(unblocked)
+    return unblocked
+
+
+@router.get("", response_model=list[TaskListItem], response_model_exclude_unset=True)
 async def list_tasks(
     project_id: Optional[str] = Query(None),
     status: Optional[TaskStatus] = Query(None),
     limit: int = Query(100, le=500),
+    fields: list[str] = Depends(fields_param(TaskResponse, TASK_SUMMARY_FIELDS)),
     db: AsyncSession = Depends(get_db)
 ):
-    """List tasks with optional filtering."""
-    query = select(Task)
+    """List tasks with optional filtering.
+
+    Returns task summaries (no task_metadata); use ``?fields=`` to pick the
+    fields to return, or GET /tasks/{task_id} for the full task.
+    """
+    query = with_fields(select(Task), Task, fields)
 
     if project_id:
         query = query.where(Task.project_id == project_id)
@@ -30,7 +99,30 @@ async def list_tasks(
 
     query = query.limit(limit).order_by(Task.created_at.desc())
     result = await db.execute(query)
-    return result.scalars().all()
+    return pick(result.scalars(), fields)
+
+
+@router.get("/order/{project_id}", response_model=list[TaskResponse])
+async def list_tasks_in_dependency_order(
+    project_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """List a project's tasks in topological (dependency) order."""
+    await dependency_graph.ensure_loaded(db)
+    result = await db.execute(
+        select(Task)
+        .where(Task.project_id == project_id)
+        .order_by(Task.created_at)
+    )
+    tasks = {task.id: task for task in result.scalars()}
+    return [tasks[task_id] for task_id in dependency_graph.topological_order(tasks)]
+
+
+@router.post("/batch-get", response_model=TaskBatchGetResponse)
+async def batch_get_tasks(request: BatchGetRequest, db: AsyncSession = Depends(get_db)):
+    """Get many tasks by ID with one query."""
+    tasks, missing = await fetch_by_ids(db, Task, request.ids)
+    return TaskBatchGetResponse(tasks=tasks, missing=missing)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
@@ -56,6 +148,61 @@ async def create_task(task_data: TaskCreate, db: AsyncSession = Depends(get_db))
     return task
 
 
+def _track_status_transition(task: Task, new_status: TaskStatus) -> None:
+    """Stamp started_at/completed_at for a status change."""
+    if new_status == TaskStatus.IN_PROGRESS and not task.started_at:
+        task.started_at = datetime.utcnow()
+    elif new_status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
+        task.completed_at = datetime.utcnow()
+
+
+@router.post("/bulk", response_model=list[TaskResponse])
+async def create_tasks_bulk(bulk_data: TaskBulkCreate, db: AsyncSession = Depends(get_db)):
+    """Create many tasks with one INSERT and one TASK_BATCH_UPDATE broadcast."""
+    tasks = [
+        Task(id=str(uuid.uuid4()), **task_data.model_dump())
+        for task_data in bulk_data.tasks
+    ]
+    db.add_all(tasks)
+    await db.flush()
+    await broadcast_task_batch_update(tasks)
+    return tasks
+
+
+@router.patch("/bulk", response_model=list[TaskResponse])
+async def update_tasks_bulk(bulk_data: TaskBulkUpdate, db: AsyncSession = Depends(get_db)):
+    """Update many tasks at once, e.g. to re-prioritise a plan.
+
+    The tasks are loaded with one IN query and written back together, so
+    rows receiving the same set of fields share one batched UPDATE. Changes
+    go out as a single TASK_BATCH_UPDATE broadcast. Nothing is written if
+    any task is missing.
+    """
+    ids = [item.id for item in bulk_data.tasks]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Each task may appear only once")
+    tasks, missing = await fetch_by_ids(db, Task, ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Tasks not found: {', '.join(missing)}")
+
+    completed = []
+    for task, item in zip(tasks, bulk_data.tasks):
+        update_data = item.model_dump(exclude_unset=True, exclude={"id"})
+        if "status" in update_data:
+            _track_status_transition(task, update_data["status"])
+            if update_data["status"] == TaskStatus.COMPLETED:
+                completed.append(task.id)
+        for field, value in update_data.items():
+            setattr(task, field, value)
+
+    await db.flush()
+    await broadcast_task_batch_update(tasks)
+
+    if completed:
+        await unblock_dependents(db, completed)
+    return tasks
+
+
 @router.patch("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: str,
@@ -72,17 +219,16 @@ async def update_task(
 
     # Track status transitions
     if "status" in update_data:
-        new_status = update_data["status"]
-        if new_status == TaskStatus.IN_PROGRESS and not task.started_at:
-            task.started_at = datetime.utcnow()
-        elif new_status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
-            task.completed_at = datetime.utcnow()
+        _track_status_transition(task, update_data["status"])
 
     for field, value in update_data.items():
         setattr(task, field, value)
 
     await db.flush()
     await broadcast_task_update(task)
+
+    if update_data.get("status") == TaskStatus.COMPLETED:
+        await unblock_dependents(db, [task.id])
     return task
 
 
@@ -103,3 +249,106 @@ async def assign_task(
     await db.flush()
     await broadcast_task_update(task)
     return task
+
+
+@router.get("/{task_id}/dependencies", response_model=list[TaskDependencyResponse])
+async def list_task_dependencies(task_id: str, db: AsyncSession = Depends(get_db)):
+    """List the tasks a task depends on."""
+    result = await db.execute(
+        select(TaskDependency).where(TaskDependency.task_id == task_id)
+    )
+    return result.scalars().all()
+
+
+@router.post("/{task_id}/dependencies", response_model=TaskDependencyResponse)
+async def add_task_dependency(
+    task_id: str,
+    dependency_data: TaskDependencyCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Make a task depend on another task in the same project.
+
+    Rejects edges that would create a cycle. A task that is still waiting
+    to start is moved to BLOCKED if the new prerequisite is not complete.
+    """
+    depends_on_id = dependency_data.depends_on_id
+    result = await db.execute(select(Task).where(Task.id.in_([task_id, depends_on_id])))
+    tasks = {task.id: task for task in result.scalars()}
+    if task_id not in tasks or depends_on_id not in tasks:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    task = tasks[task_id]
+    prerequisite = tasks[depends_on_id]
+    if task.project_id != prerequisite.project_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Tasks can only depend on tasks in the same project"
+        )
+
+    await dependency_graph.ensure_loaded(db)
+    if dependency_graph.has_edge(task_id, depends_on_id):
+        raise HTTPException(status_code=409, detail="Dependency already exists")
+    if dependency_graph.would_create_cycle(task_id, depends_on_id):
+        raise HTTPException(
+            status_code=400,
+            detail="Dependency would create a cycle"
+        )
+    # Reserved before any await so concurrent requests see it in their cycle check
+    dependency_graph.reserve(db, task_id, depends_on_id)
+
+    dependency = TaskDependency(
+        id=str(uuid.uuid4()),
+        project_id=task.project_id,
+        task_id=task_id,
+        depends_on_id=depends_on_id,
+    )
+    db.add(dependency)
+
+    if (
+        prerequisite.status != TaskStatus.COMPLETED
+        and task.status in [TaskStatus.PENDING, TaskStatus.QUEUED]
+    ):
+        task.status = TaskStatus.BLOCKED
+
+    await db.flush()
+    await broadcast_task_update(task)
+    return dependency
+
+
+@router.delete("/{task_id}/dependencies/{depends_on_id}")
+async def remove_task_dependency(
+    task_id: str,
+    depends_on_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Remove a dependency, unblocking the task if nothing else blocks it."""
+    result = await db.execute(
+        select(TaskDependency)
+        .where(TaskDependency.task_id == task_id)
+        .where(TaskDependency.depends_on_id == depends_on_id)
+    )
+    dependency = result.scalar_one_or_none()
+    if not dependency:
+        raise HTTPException(status_code=404, detail="Dependency not found")
+
+    await db.delete(dependency)
+    await db.flush()
+    await dependency_graph.ensure_loaded(db)
+    dependency_graph.discard(db, task_id, depends_on_id)
+
+    # Re-evaluate the task as if its removed prerequisite had completed
+    remaining_ids = dependency_graph.dependencies_of(task_id) - {depends_on_id}
+    result = await db.execute(select(Task.status).where(Task.id.in_(remaining_ids)))
+    remaining = result.scalars().all()
+    result = await db.execute(select(Task).where(Task.id == task_id))
+    task = result.scalar_one_or_none()
+    if (
+        task
+        and task.status == TaskStatus.BLOCKED
+        and all(status == TaskStatus.COMPLETED for status in remaining)
+    ):
+        task.status = TaskStatus.QUEUED if task.assigned_agent_id else TaskStatus.PENDING
+        await db.flush()
+        await broadcast_task_update(task)
+
+    return {"status": "removed", "task_id": task_id, "depends_on_id": depends_on_id}
@@ -45,3 +45,9 @@ class AgentResponse(AgentBase):
 
     class Config:
         from_attributes = True
+
+
+class AgentBatchGetResponse(BaseModel):
+    """Agents found by a batch get, in request order, plus ids not found."""
+    agents: list[AgentResponse]
+    missing: list[str]
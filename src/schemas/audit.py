@@ -1,8 +1,16 @@
 """Pydantic schemas for Audit Log."""
+import enum
 from datetime import datetime
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
 from src.models.audit import AuditAction
+from src.schemas.fields import partial_model, summary_fields
+
+
+class PayloadStub(BaseModel):
+    """Reference to an offloaded payload; fetch it from /audit/blobs/{hash}."""
+    hash: str
+    size: int  # Uncompressed bytes
 
 
 class AuditLogResponse(BaseModel):
@@ -15,12 +23,81 @@ class AuditLogResponse(BaseModel):
     project_id: Optional[str]
     task_id: Optional[str]
     runplan_id: Optional[str]
-    extra_data: Optional[Dict[str, Any]]
+    extra_data: Optional[Dict[str, Any]]  # None when offloaded
     file_path: Optional[str]
-    command: Optional[str]
+    command: Optional[str]  # Truncated when offloaded
+    offloaded: Optional[Dict[str, PayloadStub]] = None  # Field name -> stub
+    event_count: int = 1  # Events a sampled or aggregated entry stands for
     success: bool
     error_message: Optional[str]
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+# List responses omit extra_data unless requested via ?fields=
+AUDIT_SUMMARY_FIELDS = summary_fields(AuditLogResponse, heavy=["extra_data"])
+AuditLogListItem = partial_model(AuditLogResponse, "AuditLogListItem")
+
+
+class AuditArchiveSegment(BaseModel):
+    """A compressed NDJSON file of archived audit entries from one month."""
+    name: str
+    month: str  # YYYY-MM
+    size_bytes: int
+    rows: Optional[int] = None  # Only known when the segment is written
+
+
+class StatsBucket(str, enum.Enum):
+    """Width of the time buckets of audit statistics."""
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+
+class StatsSource(str, enum.Enum):
+    """Where audit statistics are computed from."""
+    AUTO = "auto"  # The rollup table for long ranges, raw rows otherwise
+    RAW = "raw"
+    ROLLUP = "rollup"
+
+
+class AuditActionCount(BaseModel):
+    """Entries of one action in one time bucket."""
+    bucket: datetime
+    action: AuditAction
+    count: int
+
+
+class AgentErrorRate(BaseModel):
+    """Entries and failed entries (success=False) of one agent."""
+    agent_id: Optional[str]
+    total: int
+    errors: int
+    error_rate: float
+
+
+class CommandCount(BaseModel):
+    """How often a command was run."""
+    command: str
+    count: int
+
+
+class AuditStatsResponse(BaseModel):
+    """Time-bucketed audit aggregates over [since, until)."""
+    since: datetime
+    until: datetime
+    bucket: StatsBucket
+    source: StatsSource  # raw or rollup
+    actions: list[AuditActionCount]
+    agents: list[AgentErrorRate]
+    commands: list[CommandCount]  # Most frequent first
+
+
+class AuditPipelineStats(BaseModel):
+    """Audit policies in effect and what they let through."""
+    policies: Dict[str, Dict[str, Any]]  # action -> configured policy
+    offered: Dict[str, int]  # action -> events logged
+    written: Dict[str, int]  # action -> entries written, aggregates included
+    pending: int  # Events waiting in open aggregate windows
@@ -0,0 +1,11 @@
+"""Pydantic schemas shared by batch endpoints."""
+from pydantic import BaseModel, Field
+
+# Upper bound on ids or items per batch request, keeping IN lists and
+# executemany batches at a size every database handles comfortably
+MAX_BATCH_SIZE = 500
+
+
+class BatchGetRequest(BaseModel):
+    """Ids of entities to fetch in one request."""
+    ids: list[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
@@ -1,4 +1,5 @@
 """Pydantic schemas for Build Phase workflow."""
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 
@@ -22,6 +23,23 @@ class TechDecision(BaseModel):
     status: str  # suggested, confirmed
 
 
+class RequirementUpdate(BaseModel):
+    """Partial update of a stored requirement."""
+    type: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    priority: Optional[str] = None
+    status: Optional[str] = None
+
+
+class TechDecisionUpdate(BaseModel):
+    """Partial update of a stored tech decision."""
+    category: Optional[str] = None
+    choice: Optional[str] = None
+    reasoning: Optional[str] = None
+    status: Optional[str] = None
+
+
 class BuildInitRequest(BaseModel):
     """Request to initialize build phase for a project."""
     project_id: str
@@ -40,3 +58,32 @@ class BuildInitResponse(BaseModel):
     github_repo_url: Optional[str] = None
     message: str
     next_steps: list[str]
+    requirement_count: int = 0
+    tech_decision_count: int = 0
+    job_id: Optional[str] = None  # Poll /build/jobs/{job_id} for repo creation progress
+    job_status: Optional[str] = None
+
+
+class BuildStatusResponse(BaseModel):
+    """Build status of a project, with design artifact counts."""
+    project_id: str
+    phase: str
+    has_requirements: bool
+    has_tech_stack: bool
+    requirement_count: int
+    tech_decision_count: int
+    github_repo_url: Optional[str] = None
+
+
+class BuildJob(BaseModel):
+    """A background build-init job (GitHub repo creation)."""
+    job_id: str
+    project_id: str
+    status: str  # queued, running, completed, failed
+    repo_name: Optional[str] = None
+    github_repo_url: Optional[str] = None
+    progress: list[str] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
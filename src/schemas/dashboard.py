@@ -0,0 +1,26 @@
+"""Pydantic schemas for the dashboard aggregate."""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from src.schemas.agent import AgentResponse
+from src.schemas.audit import AuditLogListItem
+from src.schemas.cost import CostSummary
+from src.schemas.runplan import RunPlanListItem
+
+
+class StatusCountsResponse(BaseModel):
+    """Task, agent and RunPlan counts by status."""
+    tasks: dict[str, dict[str, int]]  # project_id -> status -> count
+    agents: dict[str, int]
+    runplans: dict[str, int]
+    reconciled_at: Optional[datetime] = None  # Last full recount from the database
+
+
+class DashboardResponse(BaseModel):
+    """Everything the main dashboard renders, in one payload."""
+    active_agents: list[AgentResponse]
+    running_runplans: list[RunPlanListItem]  # Summary fields only
+    recent_audit: list[AuditLogListItem]  # Summary fields only
+    cost_summaries: list[CostSummary]  # One per active project
+    task_counts: dict[str, dict[str, int]]  # project_id -> status -> count
+    generated_at: datetime
@@ -0,0 +1,46 @@
+"""Sparse fieldset support for list responses.
+
+List endpoints return a summary of each row by default and accept
+``?fields=a,b,c`` to choose exactly which fields come back. Heavy JSON
+columns are left out of summaries, so they are only read from the database
+on detail endpoints or when asked for explicitly.
+"""
+from typing import Iterable, Optional
+from pydantic import BaseModel, create_model
+
+
+def partial_model(model: type[BaseModel], name: str) -> type[BaseModel]:
+    """Copy of ``model`` with every field optional, for sparse responses.
+
+    Serialize with ``response_model_exclude_unset=True`` so fields that were
+    not selected are omitted rather than returned as null.
+    """
+    fields = {
+        field_name: (Optional[field.annotation], None)
+        for field_name, field in model.model_fields.items()
+    }
+    return create_model(name, __doc__=f"{model.__name__} with only the selected fields.", **fields)
+
+
+def summary_fields(model: type[BaseModel], heavy: Iterable[str]) -> tuple[str, ...]:
+    """Fields of ``model`` that make up its summary shape."""
+    heavy = set(heavy)
+    return tuple(name for name in model.model_fields if name not in heavy)
+
+
+def select_fields(
+    fields: Optional[str],
+    model: type[BaseModel],
+    default: Iterable[str],
+) -> list[str]:
+    """Resolve a ``fields`` query value against a response model.
+
+    ``id`` is always included. Raises ValueError naming unknown fields.
+    """
+    if not fields:
+        return list(default)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in model.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id", *requested]))
@@ -21,6 +21,12 @@ class MessageType(str, Enum):
     COMMAND = "command"
 
 
+class RoutingStrategy(str, Enum):
+    """How to pick one agent among several offering a capability."""
+    LEAST_LOADED = "least_loaded"
+    ROUND_ROBIN = "round_robin"
+
+
 class AgentMessageRequest(BaseModel):
     """Schema for sending a message to a specific agent."""
     target_agent: str
@@ -29,6 +35,15 @@ class AgentMessageRequest(BaseModel):
     type: MessageType = MessageType.NOTIFICATION
 
 
+class CapabilityMessageRequest(BaseModel):
+    """Schema for sending a message to any agent offering a capability."""
+    capability: str
+    message: str
+    priority: MessagePriority = MessagePriority.NORMAL
+    type: MessageType = MessageType.REQUEST
+    strategy: RoutingStrategy = RoutingStrategy.LEAST_LOADED
+
+
 class BroadcastMessageRequest(BaseModel):
     """Schema for broadcasting a message to all agents."""
     message: str
@@ -48,6 +63,7 @@ class MCPAgentInfo(BaseModel):
     status: str
     registered_at: datetime
     last_seen: Optional[datetime] = None
+    in_flight: int = 0  # Unacked inbox messages plus claimed design requests
 
 
 class MCPAgentResponse(BaseModel):
@@ -65,6 +81,38 @@ class MessageSentResponse(BaseModel):
     timestamp: datetime
 
 
+class InboxMessage(BaseModel):
+    """A message queued in an agent's inbox until it is acknowledged."""
+    message_id: str
+    agent_id: str
+    source_agent: str
+    message: str
+    priority: MessagePriority
+    message_type: str
+    is_broadcast: bool = False
+    attempts: int = 0
+    leased_until: Optional[datetime] = None
+    created_at: datetime
+
+
+class InboxFetchResponse(BaseModel):
+    """Response schema for a batched inbox fetch."""
+    agent_id: str
+    messages: list[InboxMessage]
+    ack_timeout_seconds: float
+
+
+class InboxAckRequest(BaseModel):
+    """Schema for acknowledging delivered inbox messages."""
+    message_ids: list[str]
+
+
+class InboxAckResponse(BaseModel):
+    """Response schema for inbox acknowledgements."""
+    agent_id: str
+    acked: int
+
+
 # Design Chat via MCP
 class DesignChatMessage(BaseModel):
     """A single message in a design chat conversation."""
@@ -87,6 +135,21 @@ class DesignRequestSubmission(BaseModel):
     request_id: str
     status: str  # 'pending', 'processing', 'completed', 'timeout'
     message: str
+    response: Optional[str] = None  # Set when served from the response cache
+    deduplicated: bool = False
+
+
+class DesignClaimRequest(BaseModel):
+    """Payload for an agent claiming a design request."""
+    agent_id: str
+
+
+class DesignClaimResponse(BaseModel):
+    """Response schema for a design request claim."""
+    request_id: str
+    agent_id: str
+    status: str
+    lease_expires_at: datetime
 
 
 class DesignResponsePayload(BaseModel):
@@ -96,6 +159,12 @@ class DesignResponsePayload(BaseModel):
     response: str
 
 
+class DesignPartialPayload(BaseModel):
+    """Payload for an agent streaming part of a design response."""
+    agent_id: str
+    chunk: str
+
+
 class PendingDesignRequest(BaseModel):
     """Internal model for tracking pending design requests."""
     request_id: str
@@ -104,3 +173,9 @@ class PendingDesignRequest(BaseModel):
     status: str = "pending"
     response: Optional[str] = None
     responded_by: Optional[str] = None
+    partial_response: Optional[str] = None
+    completed_at: Optional[datetime] = None
+    claimed_by: Optional[str] = None
+    claim_expires_at: Optional[datetime] = None
+    # Hash of project, message, context and history for deduplication
+    fingerprint: Optional[str] = None
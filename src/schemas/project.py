@@ -2,6 +2,7 @@
 from datetime import datetime
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
+from src.schemas.fields import partial_model, summary_fields
 
 
 class ProjectBase(BaseModel):
@@ -45,3 +46,8 @@ class ProjectResponse(ProjectBase):
 
     class Config:
         from_attributes = True
+
+
+# List responses omit config unless requested via ?fields=
+PROJECT_SUMMARY_FIELDS = summary_fields(ProjectResponse, heavy=["config"])
+ProjectListItem = partial_model(ProjectResponse, "ProjectListItem")
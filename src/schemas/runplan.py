@@ -1,8 +1,10 @@
 """Pydantic schemas for RunPlan."""
 from datetime import datetime
 from typing import Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from src.models.runplan import RunPlanStatus
+from src.models.runplan_step import RunPlanStepStatus
+from src.schemas.fields import partial_model, summary_fields
 
 
 class RunPlanBase(BaseModel):
@@ -46,3 +48,49 @@ class RunPlanResponse(RunPlanBase):
 
     class Config:
         from_attributes = True
+
+
+# List responses omit inputs/outputs unless requested via ?fields=
+RUNPLAN_SUMMARY_FIELDS = summary_fields(RunPlanResponse, heavy=["inputs", "outputs"])
+RunPlanListItem = partial_model(RunPlanResponse, "RunPlanListItem")
+
+
+class RunPlanBatchGetResponse(BaseModel):
+    """RunPlans found by a batch get, in request order, plus ids not found."""
+    runplans: list[RunPlanResponse]
+    missing: list[str]
+
+
+class RunPlanStepCreate(BaseModel):
+    """Schema for appending a step event to a RunPlan."""
+    step_index: int = Field(ge=1)
+    status: RunPlanStepStatus = RunPlanStepStatus.COMPLETED
+    name: Optional[str] = None
+    duration_ms: Optional[int] = Field(None, ge=0)
+    tokens_used: int = Field(0, ge=0)
+    output: Optional[Dict[str, Any]] = None  # This step's output only, not cumulative
+    error_message: Optional[str] = None
+    total_steps: Optional[int] = Field(None, ge=0)  # Set when the runner knows the plan length
+
+
+class RunPlanStepResponse(BaseModel):
+    """Schema for RunPlan step response."""
+    id: str
+    runplan_id: str
+    step_index: int
+    name: Optional[str]
+    status: RunPlanStepStatus
+    duration_ms: Optional[int]
+    tokens_used: int
+    output: Optional[Dict[str, Any]]
+    error_message: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RunPlanRetryResponse(BaseModel):
+    """Schema for a pending RunPlan retry."""
+    runplan_id: str
+    due_at: datetime
@@ -0,0 +1,24 @@
+"""Pydantic schemas for full-text search."""
+import enum
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class SearchSourceType(str, enum.Enum):
+    """Kinds of rows covered by the search index."""
+    AUDIT = "audit"
+    TASK = "task"
+    PROJECT = "project"
+
+
+class SearchResult(BaseModel):
+    """One matching audit entry, task or project."""
+    type: SearchSourceType
+    id: str
+    project_id: Optional[str]
+    agent_id: Optional[str]
+    title: str
+    snippet: Optional[str]
+    rank: float  # Higher is a better match
+    created_at: datetime
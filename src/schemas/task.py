@@ -3,6 +3,8 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
 from src.models.task import TaskStatus, TaskPriority
+from src.schemas.batch import MAX_BATCH_SIZE
+from src.schemas.fields import partial_model, summary_fields
 
 
 class TaskBase(BaseModel):
@@ -48,3 +50,46 @@ class TaskResponse(TaskBase):
 
     class Config:
         from_attributes = True
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    """One task's changes within a bulk update."""
+    id: str
+
+
+class TaskBulkCreate(BaseModel):
+    """Schema for creating many tasks at once."""
+    tasks: list[TaskCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBulkUpdate(BaseModel):
+    """Schema for updating many tasks at once."""
+    tasks: list[TaskBulkUpdateItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchGetResponse(BaseModel):
+    """Tasks found by a batch get, in request order, plus ids not found."""
+    tasks: list[TaskResponse]
+    missing: list[str]
+
+
+# List responses omit task_metadata unless requested via ?fields=
+TASK_SUMMARY_FIELDS = summary_fields(TaskResponse, heavy=["task_metadata"])
+TaskListItem = partial_model(TaskResponse, "TaskListItem")
+
+
+class TaskDependencyCreate(BaseModel):
+    """Schema for adding a dependency to a task."""
+    depends_on_id: str
+
+
+class TaskDependencyResponse(BaseModel):
+    """Schema for task dependency response."""
+    id: str
+    project_id: str
+    task_id: str
+    depends_on_id: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
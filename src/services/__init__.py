@@ -1,10 +1,42 @@
 """Service modules."""
-from src.services.broadcaster import broadcast_agent_update, broadcast_task_update, broadcast_runplan_update
+from src.services.broadcaster import (
+    broadcast_agent_update,
+    broadcast_task_update,
+    broadcast_task_batch_update,
+    broadcast_runplan_update,
+)
 from src.services.audit_service import log_audit_event
+from src.services.retry_scheduler import retry_scheduler
+from src.services.dependency_graph import dependency_graph
+from src.services.inbox import agent_inbox
+from src.services.agent_registry import agent_registry
+from src.services.build_jobs import build_jobs
+from src.services.dashboard import dashboard_service
+from src.services.status_counters import status_counters
+from src.services.live_agents import live_agents
+from src.services.audit_archive import audit_archiver
+from src.services.audit_pipeline import audit_pipeline
+from src.services.audit_recent import recent_audit
+from src.services.singleflight import request_singleflight
+from src.services.versions import versions
 
 __all__ = [
     "broadcast_agent_update",
     "broadcast_task_update",
+    "broadcast_task_batch_update",
     "broadcast_runplan_update",
     "log_audit_event",
+    "retry_scheduler",
+    "dependency_graph",
+    "agent_inbox",
+    "agent_registry",
+    "build_jobs",
+    "dashboard_service",
+    "status_counters",
+    "live_agents",
+    "audit_archiver",
+    "audit_pipeline",
+    "recent_audit",
+    "request_singleflight",
+    "versions",
 ]
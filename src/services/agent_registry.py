@@ -0,0 +1,148 @@
+"""Registry of MCP agents with a capability index.
+
+Keeps an inverted index from capability to agent ids so "who can do X"
+is a dict lookup rather than a scan, and tracks per-agent in-flight work
+(unacknowledged inbox messages plus claimed design requests) so work can
+be routed to the least loaded capable agent.
+"""
+from datetime import datetime
+from typing import Optional
+from src.schemas.mcp import MCPAgentInfo, RoutingStrategy
+
+
+class MCPAgentRegistry:
+    """Registered MCP agents indexed by capability."""
+
+    def __init__(self):
+        self._agents: dict[str, MCPAgentInfo] = {}
+        self._by_capability: dict[str, set[str]] = {}
+        # capability -> position of the next round-robin pick
+        self._round_robin: dict[str, int] = {}
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._agents
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def clear(self) -> None:
+        """Unregister every agent."""
+        self._agents.clear()
+        self._by_capability.clear()
+        self._round_robin.clear()
+
+    def get(self, agent_id: str) -> Optional[MCPAgentInfo]:
+        """Look up a registered agent."""
+        return self._agents.get(agent_id)
+
+    def agents(self) -> list[MCPAgentInfo]:
+        """All registered agents."""
+        return list(self._agents.values())
+
+    def agent_ids(self) -> list[str]:
+        """Ids of all registered agents."""
+        return list(self._agents)
+
+    def register(self, agent_id: str, capabilities: list[str]) -> tuple[MCPAgentInfo, bool]:
+        """Register an agent or replace its capabilities.
+
+        Returns the agent info and whether the agent was already registered.
+        """
+        now = datetime.utcnow()
+        existing = self._agents.get(agent_id)
+        if existing:
+            self._unindex(existing)
+
+        info = MCPAgentInfo(
+            agent_id=agent_id,
+            capabilities=capabilities,
+            status="online",
+            registered_at=existing.registered_at if existing else now,
+            last_seen=now,
+            in_flight=existing.in_flight if existing else 0,
+        )
+        self._agents[agent_id] = info
+        for capability in set(capabilities):
+            self._by_capability.setdefault(capability, set()).add(agent_id)
+        return info, existing is not None
+
+    def unregister(self, agent_id: str) -> bool:
+        """Remove an agent. Returns False if it was not registered."""
+        info = self._agents.pop(agent_id, None)
+        if info is None:
+            return False
+        self._unindex(info)
+        return True
+
+    def _unindex(self, info: MCPAgentInfo) -> None:
+        for capability in set(info.capabilities):
+            agent_ids = self._by_capability.get(capability)
+            if agent_ids is not None:
+                agent_ids.discard(info.agent_id)
+                if not agent_ids:
+                    del self._by_capability[capability]
+                    self._round_robin.pop(capability, None)
+
+    def touch(self, agent_id: str) -> None:
+        """Record activity from or towards an agent."""
+        info = self._agents.get(agent_id)
+        if info:
+            info.last_seen = datetime.utcnow()
+
+    def capabilities(self) -> dict[str, list[str]]:
+        """Capability -> ids of agents offering it."""
+        return {
+            capability: sorted(agent_ids)
+            for capability, agent_ids in self._by_capability.items()
+        }
+
+    def with_capability(self, capability: str) -> list[MCPAgentInfo]:
+        """Agents offering ``capability``, ordered by id."""
+        return [
+            self._agents[agent_id]
+            for agent_id in sorted(self._by_capability.get(capability, ()))
+        ]
+
+    def select(
+        self,
+        capability: str,
+        strategy: RoutingStrategy = RoutingStrategy.LEAST_LOADED,
+    ) -> Optional[MCPAgentInfo]:
+        """Pick one registered agent offering ``capability``.
+
+        Least-loaded picks the fewest in-flight items, preferring the most
+        recently seen agent on ties. Round-robin rotates through the capable
+        agents in id order.
+        """
+        candidates = self.with_capability(capability)
+        if not candidates:
+            return None
+
+        if strategy == RoutingStrategy.ROUND_ROBIN:
+            position = self._round_robin.get(capability, 0)
+            self._round_robin[capability] = position + 1
+            return candidates[position % len(candidates)]
+
+        return min(
+            candidates,
+            key=lambda info: (
+                info.in_flight,
+                -(info.last_seen or info.registered_at).timestamp(),
+            ),
+        )
+
+    def begin_work(self, agent_id: str, count: int = 1) -> None:
+        """Count work handed to an agent."""
+        info = self._agents.get(agent_id)
+        if info:
+            info.in_flight += count
+
+    def end_work(self, agent_id: str, count: int = 1) -> None:
+        """Count work an agent finished or gave up."""
+        info = self._agents.get(agent_id)
+        if info:
+            info.in_flight = max(info.in_flight - count, 0)
+
+
+# Global MCP agent registry instance
+agent_registry = MCPAgentRegistry()
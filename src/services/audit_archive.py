@@ -0,0 +1,264 @@
+"""Audit log retention and archival.
+
+``audit_logs`` only keeps ``audit_retention_days`` of hot data. On Postgres
+the table is partitioned by month on ``created_at``; the archiver creates
+partitions ahead of time and, once a whole month is past retention, writes
+its rows to a gzip-compressed NDJSON segment file under
+``audit_archive_dir`` and drops the partition. Other databases get the same
+segments, with the rows deleted instead.
+
+Archived entries stay readable: ``read`` scans the segments overlapping a
+time range on demand, off the event loop. Hot queries look at entries from
+``hot_since()``, the start of the oldest month not archived yet, so every
+entry is either hot or in a segment.
+"""
+import asyncio
+import gzip
+import heapq
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import get_settings
+from src.database import async_session_maker
+from src.models.audit import AuditLog, AuditAction
+from src.models.search import SearchDocument
+from src.schemas.audit import AuditLogResponse, AuditArchiveSegment
+from src.schemas.search import SearchSourceType
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched and written per batch while archiving
+ARCHIVE_BATCH_SIZE = 5000
+
+# audit-2026-01-1767225600123.ndjson.gz: month, then write time in ms
+_SEGMENT_NAME = re.compile(r"^audit-(\d{4})-(\d{2})-\d+\.ndjson\.gz$")
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant of the month containing ``moment``."""
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(moment: datetime) -> datetime:
+    """First instant of the month after the one containing ``moment``."""
+    start = month_start(moment)
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"audit_logs_{month:%Y_%m}"
+
+
+class AuditArchiver:
+    """Creates monthly partitions and archives expired audit months."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def archive_dir(self) -> Path:
+        return Path(get_settings().audit_archive_dir)
+
+    def retention_cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Entries older than this are past retention."""
+        return (now or datetime.utcnow()) - timedelta(days=get_settings().audit_retention_days)
+
+    def hot_since(self, now: Optional[datetime] = None) -> datetime:
+        """Oldest creation time hot queries look at.
+
+        Only whole months past retention are archived, so this is the start
+        of the month containing the retention cutoff.
+        """
+        return month_start(self.retention_cutoff(now))
+
+    async def ensure_partitions(self, db: AsyncSession, now: Optional[datetime] = None) -> list[str]:
+        """Create this month's and upcoming monthly partitions (Postgres only)."""
+        if db.get_bind().dialect.name != "postgresql":
+            return []
+        month = month_start(now or datetime.utcnow())
+        created = []
+        for _ in range(get_settings().audit_partition_months_ahead + 1):
+            name = partition_name(month)
+            exists = await db.scalar(text("SELECT to_regclass(:name)"), {"name": name})
+            if exists is None:
+                await db.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF audit_logs "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+                ))
+                created.append(name)
+            month = next_month(month)
+        return created
+
+    async def archive_expired(self, db: AsyncSession, now: Optional[datetime] = None) -> list[AuditArchiveSegment]:
+        """Archive every whole month older than the retention window and commit.
+
+        Each month is committed separately after its segment is on disk, so
+        an interrupted run at worst writes a month twice; readers skip the
+        duplicates.
+        """
+        cutoff = self.retention_cutoff(now)
+        oldest = await db.scalar(select(func.min(AuditLog.created_at)).where(AuditLog.created_at < cutoff))
+        segments = []
+        month = month_start(oldest) if oldest else None
+        while month and next_month(month) <= cutoff:
+            segment = await self._archive_month(db, month)
+            if segment:
+                segments.append(segment)
+            await db.commit()
+            month = next_month(month)
+        return segments
+
+    async def _archive_month(self, db: AsyncSession, month: datetime) -> Optional[AuditArchiveSegment]:
+        end = next_month(month)
+        in_month = (AuditLog.created_at >= month, AuditLog.created_at < end)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        name = f"audit-{month:%Y-%m}-{int(time.time() * 1000)}.ndjson.gz"
+        path = self.archive_dir / name
+        partial = path.with_suffix(".tmp")
+
+        rows = 0
+        result = await db.stream(
+            select(AuditLog).where(*in_month).order_by(AuditLog.created_at, AuditLog.id)
+            .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+        )
+        with gzip.open(partial, "wt", encoding="utf-8") as segment:
+            async for batch in result.scalars().partitions():
+                lines = "".join(AuditLogResponse.model_validate(row).model_dump_json() + "\n" for row in batch)
+                await asyncio.to_thread(segment.write, lines)
+                rows += len(batch)
+        if not rows:
+            partial.unlink()
+            return None
+        os.replace(partial, path)
+
+        if db.get_bind().dialect.name == "postgresql":
+            name_in_db = partition_name(month)
+            if await db.scalar(text("SELECT to_regclass(:name)"), {"name": name_in_db}) is not None:
+                await db.execute(text(f"DROP TABLE {name_in_db}"))
+        await db.execute(delete(AuditLog).where(*in_month))
+        await db.execute(
+            delete(SearchDocument).where(
+                SearchDocument.source_type == SearchSourceType.AUDIT.value,
+                SearchDocument.created_at >= month,
+                SearchDocument.created_at < end,
+            )
+        )
+        logger.info("Archived %d audit entries from %s to %s", rows, f"{month:%Y-%m}", path)
+        return AuditArchiveSegment(name=name, month=f"{month:%Y-%m}", rows=rows, size_bytes=path.stat().st_size)
+
+    def segments(self) -> list[AuditArchiveSegment]:
+        """Archive segments on disk, oldest month first."""
+        if not self.archive_dir.is_dir():
+            return []
+        found = []
+        for path in sorted(self.archive_dir.iterdir()):
+            match = _SEGMENT_NAME.match(path.name)
+            if match:
+                found.append(AuditArchiveSegment(
+                    name=path.name, month=f"{match[1]}-{match[2]}", size_bytes=path.stat().st_size,
+                ))
+        return found
+
+    async def read(
+        self,
+        since: datetime,
+        until: datetime,
+        project_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        action: Optional[AuditAction] = None,
+        limit: int = 100,
+    ) -> list[AuditLogResponse]:
+        """Archived entries in [since, until), oldest first."""
+        months = set()
+        month = month_start(since)
+        while month < until:
+            months.add(f"{month:%Y-%m}")
+            month = next_month(month)
+        # Segments of one month, in month order; a month archived twice has several
+        paths_by_month: dict[str, list[Path]] = {}
+        for segment in self.segments():
+            if segment.month in months:
+                paths_by_month.setdefault(segment.month, []).append(self.archive_dir / segment.name)
+        return await asyncio.to_thread(
+            self._scan, list(paths_by_month.values()), since, until, project_id, agent_id, action, limit
+        )
+
+    @staticmethod
+    def _rows(path: Path) -> Iterator[tuple[tuple[datetime, str], dict]]:
+        with gzip.open(path, "rt", encoding="utf-8") as segment:
+            for line in segment:
+                data = json.loads(line)
+                yield (datetime.fromisoformat(data["created_at"]), data["id"]), data
+
+    @classmethod
+    def _scan(cls, paths_by_month, since, until, project_id, agent_id, action, limit) -> list[AuditLogResponse]:
+        """Read segments lazily and stop once ``limit`` entries are found.
+
+        Segments are written in (created_at, id) order, so the segments of
+        a month are merged in that order and duplicates from a month
+        archived twice are adjacent.
+        """
+        entries: list[AuditLogResponse] = []
+        for paths in paths_by_month:
+            rows = heapq.merge(*(cls._rows(path) for path in paths), key=lambda row: row[0])
+            previous = None
+            try:
+                for key, data in rows:
+                    if key[0] >= until:
+                        return entries
+                    if key == previous or key[0] < since:
+                        continue
+                    previous = key
+                    if project_id and data["project_id"] != project_id:
+                        continue
+                    if agent_id and data["agent_id"] != agent_id:
+                        continue
+                    if action and data["action"] != action.value:
+                        continue
+                    entries.append(AuditLogResponse.model_validate(data))
+                    if len(entries) == limit:
+                        return entries
+            finally:
+                rows.close()
+        return entries
+
+    async def run_once(self) -> None:
+        """Create upcoming partitions and archive expired months."""
+        async with self._session_factory() as db:
+            await self.ensure_partitions(db)
+            await db.commit()
+            await self.archive_expired(db)
+
+    async def start(self) -> None:
+        """Start the hourly partition/archive loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Audit archiving failed")
+            await asyncio.sleep(get_settings().audit_archive_interval_seconds)
+
+
+# Global audit archiver instance
+audit_archiver = AuditArchiver()
@@ -0,0 +1,98 @@
+"""Offloading of large audit payloads.
+
+Full command outputs and diffs in ``command`` and ``extra_data`` bloat
+audit rows, their indexes and every list response. Payloads larger than
+``audit_payload_offload_bytes`` are compressed and stored once in
+``audit_blobs``, keyed by the SHA-256 of their content so identical
+payloads are shared. The audit row keeps a stub with the hash and size in
+``offloaded``, plus the start of an offloaded command, and the payload is
+fetched on demand from ``/audit/blobs/{hash}``.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import get_settings
+from src.models.audit_blob import AuditBlob
+
+# Characters of an offloaded command kept on the row
+COMMAND_PREVIEW_CHARS = 200
+
+JSON_CONTENT_TYPE = "application/json"
+TEXT_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress with gzip or zstd (zstd needs the zstandard package)."""
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data)
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+async def store_blob(db: AsyncSession, data: bytes, content_type: str) -> Dict[str, Any]:
+    """Store a payload unless its content is already stored; returns its stub."""
+    digest = hashlib.sha256(data).hexdigest()
+    stub = {"hash": digest, "size": len(data)}
+    if await db.scalar(select(AuditBlob.hash).where(AuditBlob.hash == digest)):
+        return stub
+
+    encoding = get_settings().audit_payload_compression
+    compressed = await asyncio.to_thread(compress, data, encoding)
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    await db.execute(
+        # A concurrent writer may store the same content first
+        dialect_insert(AuditBlob).values(
+            hash=digest,
+            encoding=encoding,
+            content_type=content_type,
+            size=len(data),
+            stored_size=len(compressed),
+            data=compressed,
+        ).on_conflict_do_nothing(index_elements=["hash"])
+    )
+    return stub
+
+
+async def load_blob(db: AsyncSession, digest: str) -> Optional[tuple[bytes, str]]:
+    """Uncompressed content and content type of a stored payload."""
+    blob = await db.get(AuditBlob, digest)
+    if not blob:
+        return None
+    return await asyncio.to_thread(decompress, blob.data, blob.encoding), blob.content_type
+
+
+async def offload_payloads(db: AsyncSession, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Audit entry fields with oversized payloads moved to blobs."""
+    threshold = get_settings().audit_payload_offload_bytes
+    offloaded = {}
+    fields = dict(fields)
+
+    command = fields.get("command")
+    if command:
+        data = command.encode()
+        if len(data) > threshold:
+            offloaded["command"] = await store_blob(db, data, TEXT_CONTENT_TYPE)
+            fields["command"] = command[:COMMAND_PREVIEW_CHARS]
+
+    extra_data = fields.get("extra_data")
+    if extra_data:
+        data = json.dumps(extra_data, default=str).encode()
+        if len(data) > threshold:
+            offloaded["extra_data"] = await store_blob(db, data, JSON_CONTENT_TYPE)
+            fields["extra_data"] = None
+
+    if offloaded:
+        fields["offloaded"] = offloaded
+    return fields
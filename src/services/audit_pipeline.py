@@ -0,0 +1,209 @@
+"""Audit sampling and aggregation policies.
+
+High-volume actions such as FILE_READ would otherwise dominate
+``audit_logs``. Each action has a policy, applied in ``log_audit_event``
+before anything is written or broadcast:
+
+- ``keep``: every entry is written (the default)
+- ``sample``: one entry in ``every`` per action and agent is written
+- ``aggregate``: entries are counted per action, agent, project and file
+  over ``window_seconds`` and written as one summary entry per window
+
+Failures (``success=False``) and decision and user-input actions are
+always written in full. Written entries record how many events they stand
+for in ``event_count``, which audit statistics add up.
+"""
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+from src.config import get_settings
+from src.database import async_session_maker
+from src.models.audit import AuditLog, AuditAction
+from src.services.broadcaster import broadcast_audit_event
+
+logger = logging.getLogger(__name__)
+
+KEEP = "keep"
+SAMPLE = "sample"
+AGGREGATE = "aggregate"
+
+# Never sampled or aggregated, whatever the configured policy
+ALWAYS_KEPT_ACTIONS = frozenset({
+    AuditAction.DECISION_MADE,
+    AuditAction.USER_INPUT_REQUESTED,
+    AuditAction.USER_INPUT_RECEIVED,
+    AuditAction.ERROR_OCCURRED,
+})
+
+# How often closed aggregate windows are looked for
+AGGREGATE_CHECK_SECONDS = 5.0
+
+@dataclass
+class AuditPolicy:
+    """How entries of one action are recorded."""
+    mode: str = KEEP
+    every: int = 1  # sample: keep one in this many
+    window_seconds: Optional[float] = None  # aggregate: defaults to audit_aggregate_window_seconds
+
+
+@dataclass
+class _Aggregate:
+    """Events folded into one summary entry."""
+    count: int
+    first_at: datetime
+    last_at: datetime
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+def policy_for(action: AuditAction, success: bool = True) -> AuditPolicy:
+    """The policy applying to an entry."""
+    if not success or action in ALWAYS_KEPT_ACTIONS:
+        return AuditPolicy()
+    config = get_settings().audit_action_policies.get(action.value)
+    return AuditPolicy(**config) if config else AuditPolicy()
+
+
+class AuditPipeline:
+    """Applies audit policies and writes aggregate summaries per window."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+        self._sample_counts: Counter = Counter()
+        self._aggregates: dict[tuple, _Aggregate] = {}
+        # Events offered and entries written, per action
+        self.offered: Counter = Counter()
+        self.written: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+    def clear(self) -> None:
+        """Drop pending aggregates and counters."""
+        self._sample_counts.clear()
+        self._aggregates.clear()
+        self.offered.clear()
+        self.written.clear()
+
+    def admit(self, action: AuditAction, success: bool, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The entry fields to write now, or None if the entry is not written now.
+
+        Sampled-out entries are dropped; aggregated ones are counted and
+        written later by ``flush_aggregates``.
+        """
+        self.offered[action.value] += 1
+        policy = policy_for(action, success)
+        if policy.mode == SAMPLE and policy.every > 1:
+            key = (action, fields.get("agent_id"))
+            self._sample_counts[key] += 1
+            if self._sample_counts[key] % policy.every != 1:
+                return None
+            fields = {**fields, "event_count": policy.every}
+        elif policy.mode == AGGREGATE:
+            self._aggregate(action, fields)
+            return None
+        self.written[action.value] += 1
+        return fields
+
+    def _aggregate(self, action: AuditAction, fields: Dict[str, Any]) -> None:
+        now = datetime.utcnow()
+        key = (action, fields.get("agent_id"), fields.get("project_id"), fields.get("file_path"))
+        aggregate = self._aggregates.get(key)
+        if aggregate:
+            aggregate.count += 1
+            aggregate.last_at = now
+        else:
+            self._aggregates[key] = _Aggregate(
+                count=1, first_at=now, last_at=now,
+                fields={name: fields.get(name) for name in ("agent_role", "task_id", "runplan_id")},
+            )
+
+    @property
+    def pending(self) -> int:
+        """Events waiting in unwritten aggregates."""
+        return sum(a.count for a in self._aggregates.values())
+
+    async def flush_aggregates(self, db, closed_only: bool = False) -> int:
+        """Write one summary entry per aggregate; returns entries written.
+
+        With ``closed_only``, aggregates whose window is still open are
+        left to collect more events.
+        """
+        now = datetime.utcnow()
+        default_window = get_settings().audit_aggregate_window_seconds
+        due = []
+        for key, aggregate in list(self._aggregates.items()):
+            window = policy_for(key[0]).window_seconds or default_window
+            if not closed_only or (now - aggregate.first_at).total_seconds() >= window:
+                due.append((key, self._aggregates.pop(key)))
+
+        entries = []
+        for (action, agent_id, project_id, file_path), aggregate in due:
+            target = f" of {file_path}" if file_path else ""
+            entries.append(AuditLog(
+                id=str(uuid.uuid4()),
+                action=action,
+                description=f"{action.value} x{aggregate.count}{target}",
+                agent_id=agent_id,
+                project_id=project_id,
+                file_path=file_path,
+                event_count=aggregate.count,
+                extra_data={
+                    "aggregated": True,
+                    "first_at": aggregate.first_at.isoformat(),
+                    "last_at": aggregate.last_at.isoformat(),
+                },
+                created_at=aggregate.first_at,
+                **aggregate.fields,
+            ))
+        if not entries:
+            return 0
+        db.add_all(entries)
+        try:
+            await db.flush()
+        except Exception:
+            # Keep the counts for the next attempt
+            for key, aggregate in due:
+                self._aggregates.setdefault(key, aggregate)
+            raise
+        for entry in entries:
+            self.written[entry.action.value] += 1
+            await broadcast_audit_event(entry)
+        return len(entries)
+
+    async def start(self) -> None:
+        """Start writing aggregates as their windows close."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the loop and write every pending aggregate."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            async with self._session_factory() as db:
+                await self.flush_aggregates(db)
+                await db.commit()
+        except Exception:
+            logger.exception("Writing pending audit aggregates failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(AGGREGATE_CHECK_SECONDS)
+            if not self._aggregates:
+                continue
+            try:
+                async with self._session_factory() as db:
+                    await self.flush_aggregates(db, closed_only=True)
+                    await db.commit()
+            except Exception:
+                logger.exception("Writing audit aggregates failed")
+
+
+# Global audit pipeline instance
+audit_pipeline = AuditPipeline()
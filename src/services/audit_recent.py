@@ -0,0 +1,154 @@
+"""In-memory buffers of the most recent audit entries.
+
+``/audit/recent`` is polled by every dashboard and used to run
+``ORDER BY created_at DESC LIMIT n`` against the whole audit table. The
+buffer keeps the newest ``audit_recent_buffer_size`` entries, plus the
+newest ``audit_agent_buffer_size`` entries of each agent for
+``/audit/agent/{agent_id}``, and serves those reads from memory.
+
+It is warmed from the database at startup (or on first use) and then fed
+from a session ``after_flush`` hook, applied on commit, so it holds exactly
+what the table holds: sampled-out events never appear, aggregate entries
+appear when they are written, and payloads are the offloaded ones. Entries
+stay in ``created_at`` order even when they commit out of order, and ones
+already picked up by the warm-up are not added twice. Reads beyond a
+buffer's size fall back to the database, and entries older than the
+retention window are never returned.
+"""
+import bisect
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from src.config import get_settings
+from src.models.audit import AuditLog
+from src.schemas.audit import AuditLogResponse
+from src.services.audit_archive import audit_archiver
+
+# Key in Session.info holding entries waiting for commit
+_PENDING_KEY = "recent_audit_entries"
+
+
+def _order(entry: AuditLogResponse) -> tuple:
+    return entry.created_at, entry.id
+
+
+class _Buffer:
+    """The newest ``size`` entries, oldest first."""
+
+    def __init__(self, size: int, entries: list[AuditLogResponse] = ()):
+        self.size = size
+        self.entries = sorted(entries, key=_order)[-size:]
+
+    def add(self, entry: AuditLogResponse) -> None:
+        position = bisect.bisect_left(self.entries, _order(entry), key=_order)
+        if position < len(self.entries) and self.entries[position].id == entry.id:
+            return
+        self.entries.insert(position, entry)
+        if len(self.entries) > self.size:
+            del self.entries[0]
+
+    def newest(self, limit: int) -> Optional[list[AuditLogResponse]]:
+        """Up to ``limit`` hot entries, newest first; None if ``limit`` exceeds the buffer."""
+        if limit > self.size:
+            return None
+        hot_since = audit_archiver.hot_since()
+        newest = []
+        for entry in reversed(self.entries):
+            if entry.created_at < hot_since or len(newest) == limit:
+                break
+            newest.append(entry)
+        return newest
+
+
+class RecentAuditBuffer:
+    """Most recent audit entries overall and per agent."""
+
+    def __init__(self):
+        self._recent: Optional[_Buffer] = None
+        self._agents: dict[str, _Buffer] = {}
+        self._loaded = False
+
+    def clear(self) -> None:
+        """Drop all entries and mark the buffer as unloaded."""
+        self._recent = None
+        self._agents.clear()
+        self._loaded = False
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)fill the buffers with the newest hot entries in the database."""
+        settings = get_settings()
+        hot = AuditLog.created_at >= audit_archiver.hot_since()
+        result = await db.execute(
+            select(AuditLog).where(hot)
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .limit(settings.audit_recent_buffer_size)
+        )
+        recent = [AuditLogResponse.model_validate(row) for row in result.scalars()]
+
+        ranked = select(
+            AuditLog,
+            func.row_number().over(
+                partition_by=AuditLog.agent_id,
+                order_by=(AuditLog.created_at.desc(), AuditLog.id.desc()),
+            ).label("position"),
+        ).where(hot, AuditLog.agent_id.is_not(None)).subquery()
+        result = await db.execute(
+            select(aliased(AuditLog, ranked)).where(ranked.c.position <= settings.audit_agent_buffer_size)
+        )
+        per_agent: dict[str, list[AuditLogResponse]] = {}
+        for row in result.scalars():
+            per_agent.setdefault(row.agent_id, []).append(AuditLogResponse.model_validate(row))
+
+        self._recent = _Buffer(settings.audit_recent_buffer_size, recent)
+        self._agents = {
+            agent_id: _Buffer(settings.audit_agent_buffer_size, entries)
+            for agent_id, entries in per_agent.items()
+        }
+        self._loaded = True
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load from the database on first use."""
+        if not self._loaded:
+            await self.load(db)
+
+    def recent(self, limit: int) -> Optional[list[AuditLogResponse]]:
+        """Newest hot entries, or None if they must be read from the database."""
+        if not self._loaded:
+            return None
+        return self._recent.newest(limit)
+
+    def for_agent(self, agent_id: str, limit: int) -> Optional[list[AuditLogResponse]]:
+        """Newest hot entries of one agent, or None if they must be read from the database."""
+        if not self._loaded:
+            return None
+        if limit > get_settings().audit_agent_buffer_size:
+            return None
+        buffer = self._agents.get(agent_id)
+        return buffer.newest(limit) if buffer else []
+
+    def _add(self, entry: AuditLogResponse) -> None:
+        self._recent.add(entry)
+        if entry.agent_id:
+            buffer = self._agents.get(entry.agent_id)
+            if buffer is None:
+                buffer = self._agents[entry.agent_id] = _Buffer(get_settings().audit_agent_buffer_size)
+            buffer.add(entry)
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        entries = [AuditLogResponse.model_validate(obj) for obj in session.new if isinstance(obj, AuditLog)]
+        if entries:
+            session.info.setdefault(_PENDING_KEY, []).extend(entries)
+
+    def _after_commit(self, session: Session) -> None:
+        entries = session.info.pop(_PENDING_KEY, None)
+        if entries and self._loaded:
+            for entry in entries:
+                self._add(entry)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+# Global recent audit buffer instance
+recent_audit = RecentAuditBuffer()
@@ -1,11 +1,15 @@
 """Audit logging service.
 
-"Audit Everything" - Every agent action must be logged.
+"Audit Everything" - Every agent action must be logged. High-volume actions
+pass through the sampling and aggregation policies of the audit pipeline
+first, and oversized payloads are moved to compressed blobs.
 """
 import uuid
 from typing import Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.models.audit import AuditLog, AuditAction
+from src.services.audit_blobs import offload_payloads
+from src.services.audit_pipeline import audit_pipeline
 from src.services.broadcaster import broadcast_audit_event
 
 
@@ -23,22 +27,32 @@ async def log_audit_event(
     command: Optional[str] = None,
     success: bool = True,
     error_message: Optional[str] = None,
-) -> AuditLog:
-    """Log an audit event and broadcast to connected clients."""
+) -> Optional[AuditLog]:
+    """Log an audit event and broadcast to connected clients.
+
+    Returns None when the action's policy samples the event out or folds it
+    into an aggregate entry written later.
+    """
+    fields = audit_pipeline.admit(action, success, {
+        "agent_id": agent_id,
+        "agent_role": agent_role,
+        "project_id": project_id,
+        "task_id": task_id,
+        "runplan_id": runplan_id,
+        "extra_data": extra_data,
+        "file_path": file_path,
+        "command": command,
+        "error_message": error_message,
+    })
+    if fields is None:
+        return None
+    fields = await offload_payloads(db, fields)
     audit_log = AuditLog(
         id=str(uuid.uuid4()),
         action=action,
         description=description,
-        agent_id=agent_id,
-        agent_role=agent_role,
-        project_id=project_id,
-        task_id=task_id,
-        runplan_id=runplan_id,
-        extra_data=extra_data,
-        file_path=file_path,
-        command=command,
         success=success,
-        error_message=error_message,
+        **fields,
     )
     db.add(audit_log)
     await db.flush()
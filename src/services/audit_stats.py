@@ -0,0 +1,222 @@
+"""Time-bucketed audit statistics.
+
+Charts of actions per minute, error rates per agent and command frequency
+are computed with GROUP BY in the database (``date_trunc`` on Postgres,
+``strftime`` on SQLite) instead of shipping raw rows to the client.
+
+For long ranges the per-minute ``audit_rollups`` table is read instead of
+``audit_logs``. It is maintained from a session ``after_flush`` hook that
+upserts the counts of every audit entry written, in the same transaction
+as the entry. Both sources count events: sampled and aggregated entries
+add their ``event_count``, so raw and rollup statistics agree.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, func, case, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.config import get_settings
+from src.models.audit import AuditLog, AuditAction
+from src.models.audit_rollup import AuditRollup
+from src.schemas.audit import (
+    AuditStatsResponse,
+    AuditActionCount,
+    AgentErrorRate,
+    CommandCount,
+    StatsBucket,
+    StatsSource,
+)
+
+TOP_COMMANDS = 20
+
+_SQLITE_BUCKET_FORMATS = {
+    StatsBucket.MINUTE: "%Y-%m-%d %H:%M:00",
+    StatsBucket.HOUR: "%Y-%m-%d %H:00:00",
+    StatsBucket.DAY: "%Y-%m-%d 00:00:00",
+}
+
+
+def minute_of(moment: datetime) -> datetime:
+    """Start of the minute containing ``moment``."""
+    return moment.replace(second=0, microsecond=0)
+
+
+def _dialect(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+def _upsert(dialect_name: str):
+    """INSERT ... ON CONFLICT that adds to the existing counts."""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(AuditRollup)
+    return statement.on_conflict_do_update(
+        index_elements=["bucket", "action", "agent_id", "project_id"],
+        set_={
+            "count": AuditRollup.count + statement.excluded.count,
+            "error_count": AuditRollup.error_count + statement.excluded.error_count,
+        },
+    )
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    """Add newly written audit entries to their rollup minutes."""
+    counts: Counter = Counter()
+    errors: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, AuditLog):
+            key = (minute_of(obj.created_at), obj.action, obj.agent_id or "", obj.project_id or "")
+            # Sampled and aggregated entries count every event they stand for
+            counts[key] += obj.event_count
+            if obj.success is False:
+                errors[key] += obj.event_count
+    if not counts:
+        return
+    connection = session.connection()
+    connection.execute(_upsert(connection.dialect.name), [
+        {
+            "bucket": bucket, "action": action, "agent_id": agent_id, "project_id": project_id,
+            "count": count, "error_count": errors[(bucket, action, agent_id, project_id)],
+        }
+        for (bucket, action, agent_id, project_id), count in counts.items()
+    ])
+
+
+async def rebuild_audit_rollups(db: AsyncSession) -> int:
+    """Recount the rollup table from audit_logs if it is empty; returns rows written.
+
+    Covers audit entries written before the rollup existed.
+    """
+    if await db.scalar(select(func.count()).select_from(AuditRollup)):
+        return 0
+    bucket = _bucket_expression(_dialect(db), AuditLog.created_at, StatsBucket.MINUTE)
+    result = await db.execute(
+        select(
+            bucket.label("bucket"),
+            AuditLog.action,
+            func.coalesce(AuditLog.agent_id, "").label("agent_id"),
+            func.coalesce(AuditLog.project_id, "").label("project_id"),
+            func.sum(AuditLog.event_count).label("count"),
+            func.sum(case((AuditLog.success == False, AuditLog.event_count), else_=0)).label("error_count"),
+        ).group_by(bucket, AuditLog.action, AuditLog.agent_id, AuditLog.project_id)
+    )
+    rows = [
+        {**row._mapping, "bucket": _as_datetime(row.bucket)}
+        for row in result
+    ]
+    if rows:
+        await db.execute(_upsert(_dialect(db)), rows)
+    return len(rows)
+
+
+def _bucket_expression(dialect_name: str, column, bucket: StatsBucket):
+    if dialect_name == "postgresql":
+        return func.date_trunc(literal_column(f"'{bucket.value}'"), column)
+    return func.strftime(_SQLITE_BUCKET_FORMATS[bucket], column)
+
+
+def _as_datetime(value) -> datetime:
+    # SQLite's strftime returns text
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def choose_source(since: datetime, until: datetime, source: StatsSource) -> StatsSource:
+    """Resolve AUTO to the rollup for ranges longer than the configured limit."""
+    if source != StatsSource.AUTO:
+        return source
+    limit = timedelta(minutes=get_settings().audit_stats_raw_max_minutes)
+    return StatsSource.ROLLUP if until - since > limit else StatsSource.RAW
+
+
+async def audit_stats(
+    db: AsyncSession,
+    since: datetime,
+    until: datetime,
+    bucket: StatsBucket = StatsBucket.MINUTE,
+    source: StatsSource = StatsSource.AUTO,
+    project_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+) -> AuditStatsResponse:
+    """Aggregate audit entries in [since, until).
+
+    The rollup has minute resolution, so it counts whole minutes: the
+    range is widened to the minutes containing ``since`` and ``until``.
+    """
+    source = choose_source(since, until, source)
+    dialect_name = _dialect(db)
+
+    if source == StatsSource.ROLLUP:
+        table = AuditRollup
+        filters = [AuditRollup.bucket >= minute_of(since), AuditRollup.bucket < until]
+        if project_id:
+            filters.append(AuditRollup.project_id == project_id)
+        if agent_id:
+            filters.append(AuditRollup.agent_id == agent_id)
+        time_column, agent_column = AuditRollup.bucket, func.nullif(AuditRollup.agent_id, literal_column("''"))
+        total, errors = func.sum(AuditRollup.count), func.sum(AuditRollup.error_count)
+    else:
+        table = AuditLog
+        filters = [AuditLog.created_at >= since, AuditLog.created_at < until]
+        if project_id:
+            filters.append(AuditLog.project_id == project_id)
+        if agent_id:
+            filters.append(AuditLog.agent_id == agent_id)
+        time_column, agent_column = AuditLog.created_at, AuditLog.agent_id
+        total = func.sum(AuditLog.event_count)
+        errors = func.sum(case((AuditLog.success == False, AuditLog.event_count), else_=0))
+
+    bucket_column = _bucket_expression(dialect_name, time_column, bucket).label("bucket")
+    result = await db.execute(
+        select(bucket_column, table.action, total.label("count"))
+        .where(*filters)
+        .group_by(bucket_column, table.action)
+        .order_by(bucket_column, table.action)
+    )
+    actions = [
+        AuditActionCount(bucket=_as_datetime(row.bucket), action=row.action, count=row.count)
+        for row in result
+    ]
+
+    agent_column = agent_column.label("agent_id")
+    result = await db.execute(
+        select(agent_column, total.label("total"), errors.label("errors"))
+        .where(*filters)
+        .group_by(agent_column)
+        .order_by(errors.desc(), total.desc())
+    )
+    agents = [
+        AgentErrorRate(
+            agent_id=row.agent_id,
+            total=row.total,
+            errors=row.errors or 0,
+            error_rate=(row.errors or 0) / row.total if row.total else 0.0,
+        )
+        for row in result
+    ]
+
+    # Commands are not rolled up; their cardinality is unbounded
+    command_filters = [AuditLog.command.is_not(None), AuditLog.created_at >= since, AuditLog.created_at < until]
+    if project_id:
+        command_filters.append(AuditLog.project_id == project_id)
+    if agent_id:
+        command_filters.append(AuditLog.agent_id == agent_id)
+    runs = func.sum(AuditLog.event_count)
+    result = await db.execute(
+        select(AuditLog.command, runs.label("count"))
+        .where(AuditLog.action == AuditAction.COMMAND_RUN, *command_filters)
+        .group_by(AuditLog.command)
+        .order_by(runs.desc(), AuditLog.command)
+        .limit(TOP_COMMANDS)
+    )
+    commands = [CommandCount(command=row.command, count=row.count) for row in result]
+
+    return AuditStatsResponse(
+        since=since,
+        until=until,
+        bucket=bucket,
+        source=source,
+        actions=actions,
+        agents=agents,
+        commands=commands,
+    )
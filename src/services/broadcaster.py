@@ -34,18 +34,35 @@ async def broadcast_agent_update(agent) -> None:
     await connection_manager.broadcast(json.dumps(message))
 
 
+def _task_payload(task) -> dict:
+    """Compact task state shared by single and batch task updates."""
+    return {
+        "id": task.id,
+        "project_id": task.project_id,
+        "title": task.title,
+        "status": task.status.value if hasattr(task.status, 'value') else task.status,
+        "assigned_agent_id": task.assigned_agent_id,
+        "priority": task.priority.value if hasattr(task.priority, 'value') else task.priority,
+        "updated_at": serialize_for_json(task.updated_at),
+    }
+
+
 async def broadcast_task_update(task) -> None:
     """Broadcast task state change to all connected clients."""
     message = {
         "type": "TASK_UPDATE",
+        "payload": _task_payload(task),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    await connection_manager.broadcast(json.dumps(message))
+
+
+async def broadcast_task_batch_update(tasks) -> None:
+    """Broadcast several task state changes as a single message."""
+    message = {
+        "type": "TASK_BATCH_UPDATE",
         "payload": {
-            "id": task.id,
-            "project_id": task.project_id,
-            "title": task.title,
-            "status": task.status.value if hasattr(task.status, 'value') else task.status,
-            "assigned_agent_id": task.assigned_agent_id,
-            "priority": task.priority.value if hasattr(task.priority, 'value') else task.priority,
-            "updated_at": serialize_for_json(task.updated_at),
+            "tasks": [_task_payload(task) for task in tasks],
         },
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -71,6 +88,40 @@ async def broadcast_runplan_update(runplan) -> None:
     await connection_manager.broadcast(json.dumps(message))
 
 
+async def broadcast_build_job_update(job) -> None:
+    """Broadcast build job progress to all connected clients."""
+    message = {
+        "type": "BUILD_JOB_UPDATE",
+        "payload": job.model_dump(mode="json"),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    await connection_manager.broadcast(json.dumps(message))
+
+
+async def broadcast_runplan_step(runplan, step) -> None:
+    """Broadcast a RunPlan step event with the plan's updated progress."""
+    message = {
+        "type": "RUNPLAN_STEP",
+        "payload": {
+            "id": step.id,
+            "runplan_id": step.runplan_id,
+            "step_index": step.step_index,
+            "name": step.name,
+            "status": step.status.value if hasattr(step.status, 'value') else step.status,
+            "duration_ms": step.duration_ms,
+            "tokens_used": step.tokens_used,
+            "output": step.output,
+            "error_message": step.error_message,
+            "current_step": runplan.current_step,
+            "total_steps": runplan.total_steps,
+            "runplan_tokens_used": runplan.tokens_used,
+            "created_at": serialize_for_json(step.created_at),
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    await connection_manager.broadcast(json.dumps(message))
+
+
 async def broadcast_audit_event(audit_log) -> None:
     """Broadcast audit event to all connected clients."""
     message = {
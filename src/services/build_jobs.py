@@ -0,0 +1,192 @@
+"""Background jobs for build initialization.
+
+Creating the GitHub repository shells out to the ``gh`` CLI, which can take
+tens of seconds. Running it inside a request handler stalls the event loop -
+every other request and WebSocket with it - so ``/build/init`` only queues a
+job. The job runs ``gh`` through ``asyncio.create_subprocess_exec``, records
+progress that can be polled at ``/build/jobs/{id}`` and broadcasts each
+change as BUILD_JOB_UPDATE.
+
+Jobs start only once the request's transaction commits, so a request that
+fails never leaves a repository behind; if it does not commit, the job is
+marked failed without running.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+from src.config import get_settings
+from src.database import async_session_maker
+from src.models.project import Project
+from src.schemas.build import BuildJob
+from src.services.broadcaster import broadcast_build_job_update
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+FINISHED_STATUSES = (COMPLETED, FAILED)
+
+# Key in Session.info holding jobs to start once the session commits
+_PENDING_KEY = "build_jobs_pending"
+
+
+class BuildJobManager:
+    """Runs build-init jobs as asyncio tasks and keeps their state."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+        self._jobs: OrderedDict[str, BuildJob] = OrderedDict()
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def get(self, job_id: str) -> Optional[BuildJob]:
+        """Look up a job."""
+        return self._jobs.get(job_id)
+
+    def jobs(self, project_id: Optional[str] = None) -> list[BuildJob]:
+        """Jobs, newest first, optionally for one project."""
+        return [
+            job for job in reversed(self._jobs.values())
+            if project_id is None or job.project_id == project_id
+        ]
+
+    def clear(self) -> None:
+        """Forget every job (running tasks are left alone)."""
+        self._jobs.clear()
+        self._tasks.clear()
+
+    def submit(self, db: AsyncSession, project_id: str, repo_name: str) -> BuildJob:
+        """Queue creation of a GitHub repository, started when ``db`` commits."""
+        job = BuildJob(
+            job_id=str(uuid.uuid4()),
+            project_id=project_id,
+            status=QUEUED,
+            repo_name=repo_name,
+            progress=[f"Queued creation of GitHub repository '{repo_name}'"],
+            created_at=datetime.utcnow(),
+        )
+        self._jobs[job.job_id] = job
+        self._enforce_bound(get_settings().build_job_max_entries)
+        db.sync_session.info.setdefault(_PENDING_KEY, []).append(job)
+        return job
+
+    def _start(self, job: BuildJob) -> None:
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+
+    def _after_commit(self, session: Session) -> None:
+        for job in session.info.pop(_PENDING_KEY, ()):
+            self._start(job)
+
+    def _after_transaction_end(self, session: Session, transaction: SessionTransaction) -> None:
+        # Jobs still listed here were submitted in a transaction that did not commit
+        if transaction.parent is None:
+            for job in session.info.pop(_PENDING_KEY, ()):
+                job.error = "Build initialization was not committed"
+                job.status = FAILED
+                job.finished_at = datetime.utcnow()
+                job.progress.append("GitHub repo creation skipped: build initialization was not committed")
+
+    async def wait(self, job_id: str) -> Optional[BuildJob]:
+        """Wait for a job to finish."""
+        task = self._tasks.get(job_id)
+        if task:
+            await asyncio.shield(task)
+        return self._jobs.get(job_id)
+
+    async def stop(self) -> None:
+        """Cancel jobs still running at shutdown."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _update(self, job: BuildJob, status: Optional[str] = None, progress: Optional[str] = None) -> None:
+        if status:
+            job.status = status
+            if status == RUNNING:
+                job.started_at = datetime.utcnow()
+            elif status in FINISHED_STATUSES:
+                job.finished_at = datetime.utcnow()
+        if progress:
+            job.progress.append(progress)
+        await broadcast_build_job_update(job)
+
+    async def _run(self, job: BuildJob) -> None:
+        try:
+            await self._update(job, RUNNING, "Creating GitHub repository")
+            returncode, stdout, stderr = await self._run_gh(
+                "repo", "create", job.repo_name, "--private", "--confirm"
+            )
+            if returncode != 0:
+                job.error = stderr.strip() or f"gh exited with status {returncode}"
+                await self._update(job, FAILED, "GitHub repo creation skipped (gh CLI not configured)")
+                return
+
+            job.github_repo_url = self._repo_url(job.repo_name, stdout)
+            async with self._session_factory() as db:
+                await db.execute(
+                    update(Project)
+                    .where(Project.id == job.project_id)
+                    .values(github_repo_name=job.repo_name, github_repo_url=job.github_repo_url)
+                )
+                await db.commit()
+            await self._update(job, COMPLETED, f"Clone repository: git clone {job.github_repo_url}")
+        except asyncio.CancelledError:
+            job.error = "Cancelled"
+            job.status = FAILED
+            job.finished_at = datetime.utcnow()
+            raise
+        except Exception as e:
+            logger.exception("Build job %s failed", job.job_id)
+            job.error = str(e)
+            await self._update(job, FAILED, f"GitHub repo creation skipped: {e}")
+
+    @staticmethod
+    async def _run_gh(*args: str) -> tuple[int, str, str]:
+        """Run the gh CLI without blocking the event loop."""
+        settings = get_settings()
+        process = await asyncio.create_subprocess_exec(
+            settings.gh_binary, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), settings.build_gh_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise TimeoutError(f"gh timed out after {settings.build_gh_timeout_seconds:g}s")
+        return process.returncode, stdout.decode(), stderr.decode()
+
+    @staticmethod
+    def _repo_url(repo_name: str, stdout: str) -> str:
+        """Take the repo URL gh printed, or construct it."""
+        for line in reversed(stdout.splitlines()):
+            line = line.strip()
+            if line.startswith("https://"):
+                return line
+        return f"https://github.com/{os.environ.get('GITHUB_USER', 'user')}/{repo_name}"
+
+    def _enforce_bound(self, max_entries: int) -> None:
+        """Forget the oldest finished jobs beyond ``max_entries``."""
+        excess = len(self._jobs) - max_entries
+        for job_id in [j for j, job in self._jobs.items() if job.status in FINISHED_STATUSES][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+
+# Global build job manager instance
+build_jobs = BuildJobManager()
@@ -0,0 +1,169 @@
+"""Dashboard aggregate.
+
+The main dashboard used to make one HTTP request per panel, each checking
+out its own pooled connection. The aggregate runs every panel's query
+concurrently, each on its own session, and caches the combined payload for
+a short TTL shared by all clients. Concurrent requests for an expired
+snapshot wait for a single rebuild rather than each querying the database.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import load_only
+from src.config import get_settings
+from src.database import async_session_maker
+from src.models.audit import AuditLog
+from src.models.cost import CostRecord
+from src.models.project import Project
+from src.models.runplan import RunPlan, RunPlanStatus
+from src.schemas.agent import AgentResponse
+from src.schemas.audit import AUDIT_SUMMARY_FIELDS
+from src.schemas.cost import CostSummary
+from src.schemas.dashboard import DashboardResponse
+from src.schemas.runplan import RUNPLAN_SUMMARY_FIELDS
+from src.services.audit_archive import audit_archiver
+from src.services.live_agents import live_agents
+from src.services.status_counters import status_counters
+
+RUNNING_RUNPLAN_LIMIT = 50
+RECENT_AUDIT_LIMIT = 20
+
+
+def _summaries(rows, fields) -> list[dict]:
+    return [{name: getattr(row, name) for name in fields} for row in rows]
+
+
+async def _active_agents(db) -> list[AgentResponse]:
+    # Served from the live registry; only the first call reads the table
+    await live_agents.ensure_loaded(db)
+    return live_agents.active()
+
+
+async def _running_runplans(db) -> list[dict]:
+    result = await db.execute(
+        select(RunPlan)
+        .options(load_only(*(getattr(RunPlan, f) for f in RUNPLAN_SUMMARY_FIELDS)))
+        .where(RunPlan.status == RunPlanStatus.RUNNING)
+        .order_by(RunPlan.started_at.desc())
+        .limit(RUNNING_RUNPLAN_LIMIT)
+    )
+    return _summaries(result.scalars(), RUNPLAN_SUMMARY_FIELDS)
+
+
+async def _recent_audit(db) -> list[dict]:
+    result = await db.execute(
+        select(AuditLog)
+        .options(load_only(*(getattr(AuditLog, f) for f in AUDIT_SUMMARY_FIELDS)))
+        .where(AuditLog.created_at >= audit_archiver.hot_since())
+        .order_by(AuditLog.created_at.desc())
+        .limit(RECENT_AUDIT_LIMIT)
+    )
+    return _summaries(result.scalars(), AUDIT_SUMMARY_FIELDS)
+
+
+async def _cost_summaries(db) -> list[CostSummary]:
+    """Today's and all-time costs of every active project, in one query."""
+    today = date.today()
+    costs = (
+        select(
+            CostRecord.project_id,
+            func.sum(CostRecord.total_tokens).label("tokens_total"),
+            func.sum(CostRecord.estimated_cost_cents).label("cost_total"),
+            func.sum(case((CostRecord.record_date == today, CostRecord.total_tokens), else_=0))
+            .label("tokens_today"),
+            func.sum(case((CostRecord.record_date == today, CostRecord.estimated_cost_cents), else_=0))
+            .label("cost_today"),
+        )
+        .group_by(CostRecord.project_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            Project.id,
+            Project.daily_token_budget,
+            costs.c.tokens_total,
+            costs.c.cost_total,
+            costs.c.tokens_today,
+            costs.c.cost_today,
+        )
+        .outerjoin(costs, costs.c.project_id == Project.id)
+        .where(Project.is_active == True)
+    )
+
+    summaries = []
+    for row in result:
+        tokens_today = row.tokens_today or 0
+        budget = row.daily_token_budget
+        summaries.append(CostSummary(
+            project_id=row.id,
+            total_tokens_today=tokens_today,
+            total_tokens_all_time=row.tokens_total or 0,
+            estimated_cost_today_cents=row.cost_today or 0,
+            estimated_cost_all_time_cents=row.cost_total or 0,
+            daily_token_budget=budget,
+            budget_remaining_today=budget - tokens_today if budget else None,
+            budget_percentage_used=(tokens_today / budget) * 100 if budget else None,
+        ))
+    return summaries
+
+
+async def _task_counts(db) -> dict[str, dict[str, int]]:
+    # Served from the in-memory counters; only the first call counts rows
+    await status_counters.ensure_loaded(db)
+    return status_counters.task_counts()
+
+
+class DashboardService:
+    """Builds the dashboard payload and caches it for a short TTL."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+        self._snapshot: Optional[DashboardResponse] = None
+        self._expires_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot."""
+        self._snapshot = None
+        self._expires_at = None
+
+    async def get(self) -> DashboardResponse:
+        """Return the cached snapshot, rebuilding it once it has expired."""
+        if self._fresh():
+            return self._snapshot
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if not self._fresh():
+                self._snapshot = await self._build()
+                ttl = timedelta(seconds=get_settings().dashboard_cache_ttl_seconds)
+                self._expires_at = datetime.utcnow() + ttl
+        return self._snapshot
+
+    def _fresh(self) -> bool:
+        return self._snapshot is not None and datetime.utcnow() < self._expires_at
+
+    async def _query(self, section):
+        async with self._session_factory() as db:
+            return await section(db)
+
+    async def _build(self) -> DashboardResponse:
+        agents, runplans, audit, costs, task_counts = await asyncio.gather(
+            self._query(_active_agents),
+            self._query(_running_runplans),
+            self._query(_recent_audit),
+            self._query(_cost_summaries),
+            self._query(_task_counts),
+        )
+        return DashboardResponse(
+            active_agents=agents,
+            running_runplans=runplans,
+            recent_audit=audit,
+            cost_summaries=costs,
+            task_counts=task_counts,
+            generated_at=datetime.utcnow(),
+        )
+
+
+# Global dashboard service instance
+dashboard_service = DashboardService()
@@ -0,0 +1,157 @@
+"""In-memory task dependency index.
+
+Mirrors the task_dependencies table as adjacency sets in both directions so
+that completing a task only touches its direct dependents, and so cycle
+checks never have to go back to the database.
+
+The index holds committed edges only: changes made through a session are
+applied when it commits. Edges being added are reserved as soon as their
+cycle check passes, so concurrent requests cannot both add one half of a
+cycle; the reservation is released if the transaction does not commit.
+"""
+import heapq
+from collections import defaultdict
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+from src.models.task_dependency import TaskDependency
+
+# Key in Session.info holding edge changes waiting for commit
+_PENDING_KEY = "dependency_graph_changes"
+
+
+class DependencyGraph:
+    """Adjacency index over task dependency edges."""
+
+    def __init__(self):
+        # task -> tasks it waits on
+        self._dependencies: dict[str, set[str]] = defaultdict(set)
+        # task -> tasks waiting on it
+        self._dependents: dict[str, set[str]] = defaultdict(set)
+        # task -> tasks it will wait on once open transactions commit
+        self._reserved: dict[str, set[str]] = defaultdict(set)
+        self._loaded = False
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build the index from the database, keeping open reservations."""
+        self._dependencies.clear()
+        self._dependents.clear()
+        result = await db.execute(select(TaskDependency))
+        for dependency in result.scalars():
+            self.add(dependency.task_id, dependency.depends_on_id)
+        self._loaded = True
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load the index on first use."""
+        if not self._loaded:
+            await self.load(db)
+
+    def clear(self) -> None:
+        """Drop all edges and mark the index as unloaded."""
+        self._dependencies.clear()
+        self._dependents.clear()
+        self._reserved.clear()
+        self._loaded = False
+
+    def add(self, task_id: str, depends_on_id: str) -> None:
+        """Record that ``task_id`` depends on ``depends_on_id``."""
+        self._dependencies[task_id].add(depends_on_id)
+        self._dependents[depends_on_id].add(task_id)
+
+    def remove(self, task_id: str, depends_on_id: str) -> None:
+        """Remove a dependency edge."""
+        self._dependencies.get(task_id, set()).discard(depends_on_id)
+        self._dependents.get(depends_on_id, set()).discard(task_id)
+
+    def has_edge(self, task_id: str, depends_on_id: str) -> bool:
+        """Whether the edge is committed or being added by an open transaction."""
+        return depends_on_id in self._dependencies.get(task_id, ()) or depends_on_id in self._reserved.get(task_id, ())
+
+    def reserve(self, db: AsyncSession, task_id: str, depends_on_id: str) -> None:
+        """Add an edge when ``db`` commits; cycle checks see it right away.
+
+        Call it right after ``would_create_cycle``, with no await in between.
+        """
+        self._reserved[task_id].add(depends_on_id)
+        db.sync_session.info.setdefault(_PENDING_KEY, []).append((True, task_id, depends_on_id))
+
+    def discard(self, db: AsyncSession, task_id: str, depends_on_id: str) -> None:
+        """Remove an edge when ``db`` commits."""
+        db.sync_session.info.setdefault(_PENDING_KEY, []).append((False, task_id, depends_on_id))
+
+    def _release(self, task_id: str, depends_on_id: str) -> None:
+        self._reserved.get(task_id, set()).discard(depends_on_id)
+
+    def _after_commit(self, session: Session) -> None:
+        for adding, task_id, depends_on_id in session.info.pop(_PENDING_KEY, ()):
+            if adding:
+                self._release(task_id, depends_on_id)
+                self.add(task_id, depends_on_id)
+            else:
+                self.remove(task_id, depends_on_id)
+
+    def _after_transaction_end(self, session: Session, transaction: SessionTransaction) -> None:
+        # Changes still listed here belong to a transaction that did not commit
+        if transaction.parent is None:
+            for adding, task_id, depends_on_id in session.info.pop(_PENDING_KEY, ()):
+                if adding:
+                    self._release(task_id, depends_on_id)
+
+    def dependencies_of(self, task_id: str) -> set[str]:
+        """Tasks that ``task_id`` waits on."""
+        return set(self._dependencies.get(task_id, ()))
+
+    def dependents_of(self, task_id: str) -> set[str]:
+        """Tasks directly waiting on ``task_id``."""
+        return set(self._dependents.get(task_id, ()))
+
+    def would_create_cycle(self, task_id: str, depends_on_id: str) -> bool:
+        """Check whether adding ``task_id -> depends_on_id`` closes a cycle.
+
+        It does if ``task_id`` is already reachable from ``depends_on_id``,
+        counting edges reserved by open transactions.
+        """
+        stack = [depends_on_id]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node == task_id:
+                return True
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend(self._dependencies.get(node, ()))
+            stack.extend(self._reserved.get(node, ()))
+        return False
+
+    def topological_order(self, task_ids: Iterable[str]) -> list[str]:
+        """Order ``task_ids`` so every task follows the tasks it depends on.
+
+        Edges to tasks outside ``task_ids`` are ignored. Ties keep the
+        incoming order, so callers can pass tasks pre-sorted by creation time.
+        """
+        task_ids = list(task_ids)
+        members = set(task_ids)
+        position = {task_id: index for index, task_id in enumerate(task_ids)}
+        remaining = {
+            task_id: len(self._dependencies.get(task_id, set()) & members)
+            for task_id in task_ids
+        }
+
+        ready = [(position[task_id], task_id) for task_id in task_ids if remaining[task_id] == 0]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            _, task_id = heapq.heappop(ready)
+            ordered.append(task_id)
+            for dependent in self._dependents.get(task_id, ()):
+                if dependent in members:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        heapq.heappush(ready, (position[dependent], dependent))
+        return ordered
+
+
+# Global dependency index instance
+dependency_graph = DependencyGraph()
@@ -0,0 +1,117 @@
+"""Design artifacts: project requirements and tech stack decisions.
+
+Each requirement and tech decision is its own row keyed by project, so
+artifacts can be added and edited one at a time and counted with an
+indexed COUNT instead of loading and parsing a JSON blob. Projects created
+before this stored them in ``Project.config["design"]``; those blobs are
+moved into the tables once at startup.
+"""
+import uuid
+from typing import Iterable
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.project import Project
+from src.models.requirement import ProjectRequirement
+from src.models.tech_decision import ProjectTechDecision
+from src.schemas.build import Requirement, TechDecision
+
+REQUIREMENT_FIELDS = ("type", "title", "description", "priority", "status")
+TECH_DECISION_FIELDS = ("category", "choice", "reasoning", "status")
+
+
+def requirement_out(row: ProjectRequirement) -> Requirement:
+    """API shape of a stored requirement."""
+    return Requirement(id=row.ref, **{f: getattr(row, f) for f in REQUIREMENT_FIELDS})
+
+
+def tech_decision_out(row: ProjectTechDecision) -> TechDecision:
+    """API shape of a stored tech decision."""
+    return TechDecision(id=row.ref, **{f: getattr(row, f) for f in TECH_DECISION_FIELDS})
+
+
+def new_requirement(project_id: str, requirement: Requirement, position: int) -> ProjectRequirement:
+    """Row for a requirement submitted by a client."""
+    return ProjectRequirement(
+        id=str(uuid.uuid4()),
+        project_id=project_id,
+        ref=requirement.id,
+        position=position,
+        **requirement.model_dump(include=set(REQUIREMENT_FIELDS)),
+    )
+
+
+def new_tech_decision(project_id: str, decision: TechDecision, position: int) -> ProjectTechDecision:
+    """Row for a tech decision submitted by a client."""
+    return ProjectTechDecision(
+        id=str(uuid.uuid4()),
+        project_id=project_id,
+        ref=decision.id,
+        position=position,
+        **decision.model_dump(include=set(TECH_DECISION_FIELDS)),
+    )
+
+
+async def next_position(db: AsyncSession, model, project_id: str) -> int:
+    """Position after the last artifact of ``model`` in a project."""
+    last = await db.scalar(
+        select(func.max(model.position)).where(model.project_id == project_id)
+    )
+    return 0 if last is None else last + 1
+
+
+async def replace_design_artifacts(
+    db: AsyncSession,
+    project_id: str,
+    requirements: Iterable[Requirement],
+    tech_stack: Iterable[TechDecision],
+) -> None:
+    """Replace a project's requirements and tech decisions wholesale."""
+    await db.execute(delete(ProjectRequirement).where(ProjectRequirement.project_id == project_id))
+    await db.execute(delete(ProjectTechDecision).where(ProjectTechDecision.project_id == project_id))
+    # Later duplicates of a ref win, matching how the old blob was read
+    by_ref = {r.id: r for r in requirements}
+    db.add_all(new_requirement(project_id, r, i) for i, r in enumerate(by_ref.values()))
+    by_ref = {t.id: t for t in tech_stack}
+    db.add_all(new_tech_decision(project_id, t, i) for i, t in enumerate(by_ref.values()))
+
+
+async def artifact_counts(db: AsyncSession, project_id: str) -> tuple[int, int]:
+    """Number of requirements and tech decisions of a project, in one query."""
+    requirement_count = (
+        select(func.count()).select_from(ProjectRequirement)
+        .where(ProjectRequirement.project_id == project_id)
+        .scalar_subquery()
+    )
+    tech_decision_count = (
+        select(func.count()).select_from(ProjectTechDecision)
+        .where(ProjectTechDecision.project_id == project_id)
+        .scalar_subquery()
+    )
+    row = (await db.execute(select(requirement_count, tech_decision_count))).one()
+    return row[0], row[1]
+
+
+async def migrate_design_config(db: AsyncSession) -> int:
+    """Move legacy ``config["design"]`` artifacts into their tables.
+
+    Returns the number of projects migrated. The design notes stay in the
+    config; only the requirement and tech stack lists are moved out.
+    """
+    result = await db.execute(select(Project).where(Project.config.is_not(None)))
+    migrated = 0
+    for project in result.scalars():
+        design = (project.config or {}).get("design") or {}
+        if "requirements" not in design and "tech_stack" not in design:
+            continue
+        await replace_design_artifacts(
+            db,
+            project.id,
+            [Requirement(**r) for r in design.get("requirements", [])],
+            [TechDecision(**t) for t in design.get("tech_stack", [])],
+        )
+        config = dict(project.config)
+        config["design"] = {k: v for k, v in design.items() if k not in ("requirements", "tech_stack")}
+        project.config = config
+        migrated += 1
+    await db.flush()
+    return migrated
@@ -0,0 +1,283 @@
+"""Store for MCP design requests.
+
+Requests are indexed by status so listing pending work only touches pending
+requests. Pending requests time out automatically, and finished ones
+(completed or timed out) are evicted after a TTL, so the store stays bounded
+no matter how long the process runs. Deadlines live in a heap and are
+processed lazily whenever the store is accessed.
+
+Clients can also subscribe to a request instead of polling it: partial
+agent output and the final status are pushed to per-request listener
+queues.
+
+An agent claims a request before working on it, holding an expiring lease
+so no two agents answer the same request. Requests are fingerprinted so
+identical submissions can be coalesced onto an in-flight request or served
+from a recent response.
+"""
+import asyncio
+import hashlib
+import heapq
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from src.config import get_settings
+from src.schemas.mcp import PendingDesignRequest, DesignRequestPayload
+from src.services.agent_registry import agent_registry
+
+PENDING = "pending"
+PROCESSING = "processing"
+COMPLETED = "completed"
+TIMEOUT = "timeout"
+
+ACTIVE_STATUSES = (PENDING, PROCESSING)
+FINISHED_STATUSES = (COMPLETED, TIMEOUT)
+
+# Deadline kinds
+_TIMEOUT = "timeout"
+_LEASE = "lease"
+_EVICT = "evict"
+
+
+class ClaimConflictError(Exception):
+    """Raised when a request is claimed by another agent or no longer claimable."""
+
+
+def request_fingerprint(payload: DesignRequestPayload) -> str:
+    """Hash the parts of a design request that determine its answer."""
+    key = {
+        "project_id": payload.project_id,
+        "message": payload.message,
+        "context": payload.context,
+        "history": [[m.role, m.content] for m in payload.history],
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class DesignRequestStore:
+    """Design requests keyed by id, with a status index and TTL eviction."""
+
+    def __init__(self):
+        self._requests: dict[str, PendingDesignRequest] = {}
+        # status -> request ids, in the order they entered that status
+        self._by_status: dict[str, dict[str, None]] = {}
+        # (deadline, request_id, kind)
+        self._deadlines: list[tuple[datetime, str, str]] = []
+        # fingerprint -> most recent request with that fingerprint
+        self._by_fingerprint: dict[str, str] = {}
+        # request_id -> queues receiving (event, data) tuples
+        self._listeners: dict[str, list[asyncio.Queue]] = {}
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def clear(self) -> None:
+        """Drop every request."""
+        self._requests.clear()
+        self._by_status.clear()
+        self._deadlines.clear()
+        self._listeners.clear()
+        self._by_fingerprint.clear()
+
+    def add(self, request: PendingDesignRequest) -> None:
+        """Store a new request and start its timeout clock."""
+        settings = get_settings()
+        self.sweep()
+        self._requests[request.request_id] = request
+        self._by_status.setdefault(request.status, {})[request.request_id] = None
+        if request.fingerprint:
+            self._by_fingerprint[request.fingerprint] = request.request_id
+        timeout = timedelta(seconds=settings.design_request_timeout_seconds)
+        self._schedule(request.submitted_at + timeout, request.request_id, _TIMEOUT)
+        self._enforce_bound(settings.design_request_max_entries)
+
+    def find_duplicate(
+        self,
+        fingerprint: str,
+        now: Optional[datetime] = None,
+    ) -> Optional[PendingDesignRequest]:
+        """Find a request that can answer a submission with this fingerprint.
+
+        That is an identical request still in flight, or one completed within
+        the dedupe window. Timed-out requests are never reused.
+        """
+        now = now or datetime.utcnow()
+        self.sweep(now)
+        request = self._requests.get(self._by_fingerprint.get(fingerprint, ""))
+        if request is None:
+            return None
+        if request.status in ACTIVE_STATUSES:
+            return request
+        window = timedelta(seconds=get_settings().design_dedupe_window_seconds)
+        if request.status == COMPLETED and request.completed_at + window > now:
+            return request
+        return None
+
+    def claim(
+        self,
+        request: PendingDesignRequest,
+        agent_id: str,
+        now: Optional[datetime] = None,
+    ) -> None:
+        """Give ``agent_id`` an exclusive, expiring lease on a request.
+
+        The holder may claim again to renew its lease. Raises
+        ClaimConflictError if another agent holds the lease or the request
+        is already finished.
+        """
+        now = now or datetime.utcnow()
+        if request.status in FINISHED_STATUSES:
+            raise ClaimConflictError(f"Design request '{request.request_id}' is already {request.status}")
+        if request.status == PROCESSING and request.claimed_by != agent_id:
+            raise ClaimConflictError(
+                f"Design request '{request.request_id}' is claimed by '{request.claimed_by}'"
+            )
+
+        lease = timedelta(seconds=get_settings().design_claim_lease_seconds)
+        if request.claimed_by != agent_id:
+            agent_registry.begin_work(agent_id)
+        request.claimed_by = agent_id
+        request.claim_expires_at = now + lease
+        if request.status != PROCESSING:
+            self.set_status(request, PROCESSING, now=now)
+        self._schedule(request.claim_expires_at, request.request_id, _LEASE)
+
+    def check_holder(self, request: PendingDesignRequest, agent_id: str) -> None:
+        """Ensure ``agent_id`` may answer a request.
+
+        Unclaimed pending requests may be answered by anyone; claimed ones
+        only by the lease holder.
+        """
+        if request.status in FINISHED_STATUSES:
+            raise ClaimConflictError(f"Design request '{request.request_id}' is already {request.status}")
+        if request.status == PROCESSING and request.claimed_by != agent_id:
+            raise ClaimConflictError(
+                f"Design request '{request.request_id}' is claimed by '{request.claimed_by}'"
+            )
+
+    def get(self, request_id: str) -> Optional[PendingDesignRequest]:
+        """Look up a request, applying any due timeouts and evictions first."""
+        self.sweep()
+        return self._requests.get(request_id)
+
+    def list_by_status(self, status: str) -> list[PendingDesignRequest]:
+        """Requests currently in ``status``, oldest transition first."""
+        self.sweep()
+        return [self._requests[request_id] for request_id in self._by_status.get(status, ())]
+
+    def set_status(
+        self,
+        request: PendingDesignRequest,
+        status: str,
+        now: Optional[datetime] = None,
+    ) -> None:
+        """Move a request to a new status, keeping the index current."""
+        now = now or datetime.utcnow()
+        self._by_status.get(request.status, {}).pop(request.request_id, None)
+        request.status = status
+        self._by_status.setdefault(status, {})[request.request_id] = None
+
+        if status in FINISHED_STATUSES:
+            self._release(request)
+            request.completed_at = now
+            ttl = timedelta(seconds=get_settings().design_request_ttl_seconds)
+            self._schedule(now + ttl, request.request_id, _EVICT)
+            for queue in self._listeners.pop(request.request_id, ()):
+                queue.put_nowait((status, request))
+
+    def publish_partial(self, request: PendingDesignRequest, chunk: str) -> None:
+        """Append partial agent output and relay it to listeners."""
+        request.partial_response = (request.partial_response or "") + chunk
+        for queue in self._listeners.get(request.request_id, ()):
+            queue.put_nowait(("partial", chunk))
+
+    def subscribe(self, request_id: str) -> asyncio.Queue:
+        """Register a listener queue for a request's events."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.setdefault(request_id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, request_id: str, queue: asyncio.Queue) -> None:
+        """Remove a listener queue."""
+        listeners = self._listeners.get(request_id)
+        if listeners and queue in listeners:
+            listeners.remove(queue)
+            if not listeners:
+                del self._listeners[request_id]
+
+    async def wait(self, request_id: str, timeout: float) -> Optional[PendingDesignRequest]:
+        """Wait up to ``timeout`` seconds for a request to finish.
+
+        Returns the request in whatever state it is in when it finishes or
+        the wait runs out, or None if it does not exist.
+        """
+        request = self.get(request_id)
+        if request is None or request.status in FINISHED_STATUSES:
+            return request
+
+        queue = self.subscribe(request_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                event, _ = await asyncio.wait_for(queue.get(), remaining)
+                if event in FINISHED_STATUSES:
+                    break
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.unsubscribe(request_id, queue)
+        return self.get(request_id)
+
+    def sweep(self, now: Optional[datetime] = None) -> None:
+        """Time out overdue pending requests and evict expired finished ones."""
+        now = now or datetime.utcnow()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, request_id, kind = heapq.heappop(self._deadlines)
+            request = self._requests.get(request_id)
+            if request is None:
+                continue
+            # Deadlines are never removed; skip those the request has moved past
+            if kind == _TIMEOUT and request.status in ACTIVE_STATUSES:
+                self.set_status(request, TIMEOUT, now=deadline)
+            elif kind == _LEASE and request.status == PROCESSING \
+                    and request.claim_expires_at == deadline:
+                self._release(request)
+                self.set_status(request, PENDING, now=deadline)
+            elif kind == _EVICT and request.status in FINISHED_STATUSES:
+                self._evict(request_id)
+
+    def _schedule(self, deadline: datetime, request_id: str, kind: str) -> None:
+        heapq.heappush(self._deadlines, (deadline, request_id, kind))
+
+    @staticmethod
+    def _release(request: PendingDesignRequest) -> None:
+        if request.claimed_by:
+            agent_registry.end_work(request.claimed_by)
+        request.claimed_by = None
+        request.claim_expires_at = None
+
+    def _evict(self, request_id: str) -> None:
+        request = self._requests.pop(request_id)
+        self._by_status.get(request.status, {}).pop(request_id, None)
+        if request.fingerprint and self._by_fingerprint.get(request.fingerprint) == request_id:
+            del self._by_fingerprint[request.fingerprint]
+
+    def _enforce_bound(self, max_entries: int) -> None:
+        """Evict the oldest finished requests beyond ``max_entries``."""
+        while len(self._requests) > max_entries:
+            oldest = [
+                next(iter(self._by_status[status]))
+                for status in FINISHED_STATUSES
+                if self._by_status.get(status)
+            ]
+            if not oldest:
+                return
+            self._evict(min(oldest, key=lambda rid: self._requests[rid].completed_at))
+
+
+# Global design request store instance
+design_requests = DesignRequestStore()
@@ -0,0 +1,450 @@
+"""Per-agent MCP inboxes.
+
+Messages for an agent are queued until the agent acknowledges them, so an
+agent that was offline - or reconnects after a pause - picks up where it
+left off instead of senders resending. Each inbox is bounded and delivered
+in priority order (URGENT first, FIFO within a priority). Delivered but
+unacknowledged messages are leased for the ack timeout and handed out
+again once the lease expires.
+
+Storage is pluggable: in-process memory, the database or Redis.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, delete, func, or_
+from src.config import get_settings
+from src.services.agent_registry import agent_registry
+from src.database import async_session_maker
+from src.models.mcp_message import MCPInboxMessage
+from src.schemas.mcp import InboxMessage, MessagePriority
+from src.websocket.manager import connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Lower rank is delivered first
+PRIORITY_RANK = {
+    MessagePriority.URGENT: 0,
+    MessagePriority.HIGH: 1,
+    MessagePriority.NORMAL: 2,
+    MessagePriority.LOW: 3,
+}
+
+
+class InboxFullError(Exception):
+    """Raised when an inbox is full of messages at least as important."""
+
+
+def agent_message_payload(message: InboxMessage) -> dict:
+    """Build the AGENT_MESSAGE WebSocket frame for an inbox message."""
+    return {
+        "type": "AGENT_MESSAGE",
+        "payload": {
+            "message_id": message.message_id,
+            "source_agent": message.source_agent,
+            "target_agent": None if message.is_broadcast else message.agent_id,
+            "message": message.message,
+            "priority": message.priority.value,
+            "message_type": message.message_type,
+            "attempt": message.attempts,
+        },
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+class InboxStore(ABC):
+    """Storage backend interface for agent inboxes."""
+
+    @abstractmethod
+    async def push(self, message: InboxMessage, max_size: int) -> Optional[str]:
+        """Queue a message.
+
+        If the inbox is full, the oldest message of the lowest priority below
+        the new one is evicted and its id returned. Raises InboxFullError if
+        no such message exists.
+        """
+
+    @abstractmethod
+    async def lease(
+        self,
+        agent_id: str,
+        limit: int,
+        now: datetime,
+        lease_until: datetime,
+    ) -> list[InboxMessage]:
+        """Hand out up to ``limit`` ready messages in priority order.
+
+        Messages whose lease expired before ``now`` are ready again.
+        """
+
+    @abstractmethod
+    async def ack(self, agent_id: str, message_ids: list[str]) -> int:
+        """Remove acknowledged messages, returning how many were removed."""
+
+    @abstractmethod
+    async def size(self, agent_id: str) -> int:
+        """Number of unacknowledged messages in an inbox."""
+
+
+class MemoryInboxStore(InboxStore):
+    """In-process inboxes; lost on restart."""
+
+    def __init__(self):
+        # agent_id -> one FIFO per priority rank
+        self._queues: dict[str, list[OrderedDict[str, InboxMessage]]] = {}
+
+    def _agent_queues(self, agent_id: str) -> list[OrderedDict[str, InboxMessage]]:
+        return self._queues.setdefault(agent_id, [OrderedDict() for _ in PRIORITY_RANK])
+
+    async def push(self, message: InboxMessage, max_size: int) -> Optional[str]:
+        queues = self._agent_queues(message.agent_id)
+        rank = PRIORITY_RANK[message.priority]
+        evicted = None
+        if sum(len(queue) for queue in queues) >= max_size:
+            for lower in range(len(queues) - 1, rank, -1):
+                if queues[lower]:
+                    evicted, _ = queues[lower].popitem(last=False)
+                    break
+            else:
+                raise InboxFullError(f"Inbox for '{message.agent_id}' is full")
+        queues[rank][message.message_id] = message
+        return evicted
+
+    async def lease(self, agent_id, limit, now, lease_until):
+        leased = []
+        for queue in self._queues.get(agent_id, ()):
+            for message in queue.values():
+                if len(leased) >= limit:
+                    return leased
+                if message.leased_until and message.leased_until > now:
+                    continue
+                message.attempts += 1
+                message.leased_until = lease_until
+                leased.append(message.model_copy())
+        return leased
+
+    async def ack(self, agent_id, message_ids):
+        acked = 0
+        for queue in self._queues.get(agent_id, ()):
+            for message_id in message_ids:
+                if queue.pop(message_id, None) is not None:
+                    acked += 1
+        return acked
+
+    async def size(self, agent_id):
+        return sum(len(queue) for queue in self._queues.get(agent_id, ()))
+
+
+class DatabaseInboxStore(InboxStore):
+    """Inboxes persisted in the mcp_inbox_messages table."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+
+    @staticmethod
+    def _to_message(row: MCPInboxMessage) -> InboxMessage:
+        return InboxMessage(
+            message_id=row.id,
+            agent_id=row.agent_id,
+            source_agent=row.source_agent,
+            message=row.message,
+            priority=MessagePriority(row.priority),
+            message_type=row.message_type,
+            is_broadcast=row.is_broadcast,
+            attempts=row.attempts,
+            leased_until=row.leased_until,
+            created_at=row.created_at,
+        )
+
+    async def push(self, message, max_size):
+        rank = PRIORITY_RANK[message.priority]
+        async with self._session_factory() as db:
+            evicted = None
+            count = await db.scalar(
+                select(func.count())
+                .select_from(MCPInboxMessage)
+                .where(MCPInboxMessage.agent_id == message.agent_id)
+            )
+            if count >= max_size:
+                evicted = await db.scalar(
+                    select(MCPInboxMessage.id)
+                    .where(MCPInboxMessage.agent_id == message.agent_id)
+                    .where(MCPInboxMessage.priority_rank > rank)
+                    .order_by(MCPInboxMessage.priority_rank.desc(), MCPInboxMessage.created_at)
+                    .limit(1)
+                )
+                if evicted is None:
+                    raise InboxFullError(f"Inbox for '{message.agent_id}' is full")
+                await db.execute(
+                    delete(MCPInboxMessage)
+                    .where(MCPInboxMessage.agent_id == message.agent_id)
+                    .where(MCPInboxMessage.id == evicted)
+                )
+
+            db.add(MCPInboxMessage(
+                id=message.message_id,
+                agent_id=message.agent_id,
+                source_agent=message.source_agent,
+                message=message.message,
+                priority=message.priority.value,
+                priority_rank=rank,
+                message_type=message.message_type,
+                is_broadcast=message.is_broadcast,
+                attempts=0,
+                created_at=message.created_at,
+            ))
+            await db.commit()
+            return evicted
+
+    async def lease(self, agent_id, limit, now, lease_until):
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(MCPInboxMessage)
+                .where(MCPInboxMessage.agent_id == agent_id)
+                .where(or_(
+                    MCPInboxMessage.leased_until.is_(None),
+                    MCPInboxMessage.leased_until <= now,
+                ))
+                .order_by(MCPInboxMessage.priority_rank, MCPInboxMessage.created_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.scalars().all()
+            for row in rows:
+                row.attempts += 1
+                row.leased_until = lease_until
+            leased = [self._to_message(row) for row in rows]
+            await db.commit()
+            return leased
+
+    async def ack(self, agent_id, message_ids):
+        if not message_ids:
+            return 0
+        async with self._session_factory() as db:
+            result = await db.execute(
+                delete(MCPInboxMessage)
+                .where(MCPInboxMessage.agent_id == agent_id)
+                .where(MCPInboxMessage.id.in_(message_ids))
+            )
+            await db.commit()
+            return result.rowcount
+
+    async def size(self, agent_id):
+        async with self._session_factory() as db:
+            return await db.scalar(
+                select(func.count())
+                .select_from(MCPInboxMessage)
+                .where(MCPInboxMessage.agent_id == agent_id)
+            )
+
+
+class RedisInboxStore(InboxStore):
+    """Inboxes kept in Redis, shared by every API process.
+
+    Per agent: a hash of message bodies, a ``ready`` sorted set scored by
+    priority then age, and a ``leased`` sorted set scored by lease deadline.
+    Delivery is at-least-once; concurrent leases from several processes may
+    occasionally hand out the same message twice.
+    """
+
+    # Scores are rank * _RANK_SPAN + created_at in ms
+    _RANK_SPAN = 10 ** 13
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _keys(agent_id: str) -> tuple[str, str, str]:
+        prefix = f"mcp:inbox:{agent_id}"
+        return f"{prefix}:messages", f"{prefix}:ready", f"{prefix}:leased"
+
+    def _score(self, message: InboxMessage) -> float:
+        created_ms = int(message.created_at.timestamp() * 1000)
+        return PRIORITY_RANK[message.priority] * self._RANK_SPAN + created_ms
+
+    async def push(self, message, max_size):
+        messages_key, ready_key, leased_key = self._keys(message.agent_id)
+        evicted = None
+        size = await self._redis.zcard(ready_key) + await self._redis.zcard(leased_key)
+        if size >= max_size:
+            rank = PRIORITY_RANK[message.priority]
+            for lower in range(len(PRIORITY_RANK) - 1, rank, -1):
+                candidates = await self._redis.zrangebyscore(
+                    ready_key,
+                    lower * self._RANK_SPAN,
+                    (lower + 1) * self._RANK_SPAN - 1,
+                    start=0,
+                    num=1,
+                )
+                if candidates:
+                    evicted = candidates[0]
+                    break
+            if evicted is None:
+                raise InboxFullError(f"Inbox for '{message.agent_id}' is full")
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            if evicted:
+                pipe.zrem(ready_key, evicted)
+                pipe.hdel(messages_key, evicted)
+            pipe.hset(messages_key, message.message_id, message.model_dump_json())
+            pipe.zadd(ready_key, {message.message_id: self._score(message)})
+            await pipe.execute()
+        return evicted
+
+    async def lease(self, agent_id, limit, now, lease_until):
+        messages_key, ready_key, leased_key = self._keys(agent_id)
+
+        # Expired leases go back to the ready queue at their original position
+        expired = await self._redis.zrangebyscore(leased_key, 0, now.timestamp())
+        if expired:
+            bodies = await self._redis.hmget(messages_key, expired)
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(leased_key, *expired)
+                for body in bodies:
+                    if body:
+                        message = InboxMessage.model_validate_json(body)
+                        pipe.zadd(ready_key, {message.message_id: self._score(message)})
+                await pipe.execute()
+
+        message_ids = await self._redis.zrange(ready_key, 0, limit - 1)
+        if not message_ids:
+            return []
+
+        leased = []
+        bodies = await self._redis.hmget(messages_key, message_ids)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(ready_key, *message_ids)
+            for body in bodies:
+                if not body:
+                    continue
+                message = InboxMessage.model_validate_json(body)
+                message.attempts += 1
+                message.leased_until = lease_until
+                pipe.hset(messages_key, message.message_id, message.model_dump_json())
+                pipe.zadd(leased_key, {message.message_id: lease_until.timestamp()})
+                leased.append(message)
+            await pipe.execute()
+        return leased
+
+    async def ack(self, agent_id, message_ids):
+        if not message_ids:
+            return 0
+        messages_key, ready_key, leased_key = self._keys(agent_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(ready_key, *message_ids)
+            pipe.zrem(leased_key, *message_ids)
+            pipe.hdel(messages_key, *message_ids)
+            results = await pipe.execute()
+        return results[-1]
+
+    async def size(self, agent_id):
+        messages_key, _, _ = self._keys(agent_id)
+        return await self._redis.hlen(messages_key)
+
+
+def create_inbox_store() -> InboxStore:
+    """Build the inbox store selected by ``mcp_inbox_backend``."""
+    settings = get_settings()
+    if settings.mcp_inbox_backend == "database":
+        return DatabaseInboxStore()
+    if settings.mcp_inbox_backend == "redis":
+        return RedisInboxStore(settings.redis_url)
+    return MemoryInboxStore()
+
+
+class AgentInbox:
+    """Queues MCP messages per agent and pushes them to connected agents."""
+
+    def __init__(self, store: InboxStore):
+        self.store = store
+        self._task: Optional[asyncio.Task] = None
+
+    def new_message(
+        self,
+        agent_id: str,
+        message: str,
+        priority: MessagePriority,
+        message_type: str,
+        source_agent: str = "api",
+        is_broadcast: bool = False,
+        message_id: Optional[str] = None,
+    ) -> InboxMessage:
+        """Build an inbox message addressed to ``agent_id``."""
+        return InboxMessage(
+            message_id=message_id or str(uuid.uuid4()),
+            agent_id=agent_id,
+            source_agent=source_agent,
+            message=message,
+            priority=priority,
+            message_type=message_type,
+            is_broadcast=is_broadcast,
+            created_at=datetime.utcnow(),
+        )
+
+    async def post(self, message: InboxMessage) -> Optional[str]:
+        """Queue a message and deliver it right away if the agent is connected.
+
+        Returns the id of a lower-priority message evicted to make room.
+        """
+        evicted = await self.store.push(message, get_settings().mcp_inbox_max_size)
+        if evicted is None:
+            agent_registry.begin_work(message.agent_id)
+        await self.deliver(message.agent_id)
+        return evicted
+
+    async def fetch(self, agent_id: str, limit: int) -> list[InboxMessage]:
+        """Lease up to ``limit`` ready messages for an agent."""
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=get_settings().mcp_inbox_ack_timeout_seconds)
+        return await self.store.lease(agent_id, limit, now, lease_until)
+
+    async def deliver(self, agent_id: str) -> int:
+        """Push ready messages to an agent's bound connections."""
+        if not connection_manager.is_agent_connected(agent_id):
+            return 0
+        messages = await self.fetch(agent_id, get_settings().mcp_inbox_delivery_batch)
+        for message in messages:
+            await connection_manager.send_to_agent(
+                agent_id, json.dumps(agent_message_payload(message))
+            )
+        return len(messages)
+
+    async def ack(self, agent_id: str, message_ids: list[str]) -> int:
+        """Acknowledge messages and push the next batch, if any."""
+        acked = await self.store.ack(agent_id, message_ids)
+        agent_registry.end_work(agent_id, acked)
+        await self.deliver(agent_id)
+        return acked
+
+    async def start(self) -> None:
+        """Start the redelivery loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the redelivery loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(get_settings().mcp_inbox_ack_timeout_seconds)
+            for agent_id in list(connection_manager.agent_connections):
+                try:
+                    await self.deliver(agent_id)
+                except Exception:
+                    logger.exception("Inbox redelivery failed for agent %s", agent_id)
+
+
+# Global agent inbox instance
+agent_inbox = AgentInbox(create_inbox_store())
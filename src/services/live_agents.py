@@ -0,0 +1,216 @@
+"""Live agent registry.
+
+Agents report status changes and heartbeats every few seconds, and every
+one of those used to be a SELECT plus an UPDATE of the ``agents`` row. The
+registry keeps the live state of every agent in memory and is authoritative
+for it: reads are served from memory, changes are applied and broadcast
+immediately, and changed agents are written back to the ``agents`` table in
+batches every ``agent_write_behind_seconds``.
+
+The table remains the recovery source. The registry is loaded from it at
+startup (or on first use), dirty agents are flushed on shutdown, and a crash
+loses at most one write-behind interval of status changes, which agents
+re-report with their next heartbeat anyway.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+from src.config import get_settings
+from src.database import async_session_maker
+from src.models.agent import Agent, AgentStatus
+from src.schemas.agent import AgentResponse
+from src.services.broadcaster import broadcast_agent_update
+from src.services.status_counters import status_counters
+from src.services.versions import versions
+
+logger = logging.getLogger(__name__)
+
+# Key in Session.info holding agents added in the open transaction
+_CREATED_KEY = "live_agents_created"
+
+# Columns the registry changes and writes back
+WRITE_BEHIND_FIELDS = (
+    "name", "role", "status", "current_task", "current_action", "updated_at", "last_heartbeat",
+)
+
+
+class LiveAgentRegistry:
+    """In-memory agent state with batched write-behind to the database."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+        self._agents: dict[str, AgentResponse] = {}
+        self._loaded = False
+        # Agents changed since the last write-behind, and the status the
+        # database holds for each, so status counters move on persist
+        self._dirty: set[str] = set()
+        self._persisted_status: dict[str, AgentStatus] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def clear(self) -> None:
+        """Forget all agents and pending writes and mark the registry unloaded."""
+        self._agents.clear()
+        self._dirty.clear()
+        self._persisted_status.clear()
+        self._loaded = False
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)load every agent from the database, dropping unwritten changes."""
+        result = await db.execute(select(Agent).order_by(Agent.created_at))
+        self._agents = {agent.id: AgentResponse.model_validate(agent) for agent in result.scalars()}
+        self._persisted_status = {agent_id: agent.status for agent_id, agent in self._agents.items()}
+        self._dirty.clear()
+        self._loaded = True
+        versions.bump("agents")
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load from the database on first use."""
+        if not self._loaded:
+            await self.load(db)
+
+    def get(self, agent_id: str) -> Optional[AgentResponse]:
+        """Live state of one agent."""
+        return self._agents.get(agent_id)
+
+    def all(self) -> list[AgentResponse]:
+        """Every agent, oldest first."""
+        return list(self._agents.values())
+
+    def active(self) -> list[AgentResponse]:
+        """Agents that are not offline."""
+        return [agent for agent in self._agents.values() if agent.status != AgentStatus.OFFLINE]
+
+    def fetch(self, agent_ids: Iterable[str]) -> tuple[list[AgentResponse], list[str]]:
+        """Agents in the order requested, without repeats, plus ids not found."""
+        found, missing = [], []
+        for agent_id in dict.fromkeys(agent_ids):
+            agent = self._agents.get(agent_id)
+            if agent:
+                found.append(agent)
+            else:
+                missing.append(agent_id)
+        return found, missing
+
+    def add(self, db: AsyncSession, agent: Agent) -> AgentResponse:
+        """Track an agent that was just inserted through ``db``.
+
+        The agent is dropped again if that transaction does not commit.
+        """
+        live = AgentResponse.model_validate(agent)
+        if self._loaded:
+            self._agents[live.id] = live
+            self._persisted_status[live.id] = live.status
+            db.sync_session.info.setdefault(_CREATED_KEY, []).append(live.id)
+            versions.bump("agents")
+        return live
+
+    def _forget(self, agent_id: str) -> None:
+        self._agents.pop(agent_id, None)
+        self._persisted_status.pop(agent_id, None)
+        self._dirty.discard(agent_id)
+        versions.bump("agents")
+
+    def _after_commit(self, session: Session) -> None:
+        session.info.pop(_CREATED_KEY, None)
+
+    def _after_transaction_end(self, session: Session, transaction: SessionTransaction) -> None:
+        # Agents still listed here were added in a transaction that did not commit
+        if transaction.parent is None:
+            for agent_id in session.info.pop(_CREATED_KEY, ()):
+                self._forget(agent_id)
+
+    async def update(self, agent_id: str, **changes) -> Optional[AgentResponse]:
+        """Apply changes to an agent and broadcast it; None if unknown."""
+        agent = self._agents.get(agent_id)
+        if not agent:
+            return None
+        for field, value in changes.items():
+            setattr(agent, field, value)
+        agent.updated_at = datetime.utcnow()
+        self._dirty.add(agent_id)
+        versions.bump("agents")
+        await broadcast_agent_update(agent)
+        return agent
+
+    def heartbeat(self, agent_id: str) -> Optional[AgentResponse]:
+        """Record a heartbeat; None if the agent is unknown."""
+        agent = self._agents.get(agent_id)
+        if agent:
+            agent.last_heartbeat = datetime.utcnow()
+            self._dirty.add(agent_id)
+            versions.bump("agents")
+        return agent
+
+    @property
+    def pending(self) -> int:
+        """Number of agents with changes not yet written back."""
+        return len(self._dirty)
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Write dirty agents back in batches and commit; returns the count.
+
+        Agents stay dirty if the write fails, so the next flush retries them.
+        """
+        if not self._dirty:
+            return 0
+        agent_ids = [agent_id for agent_id in self._dirty if agent_id in self._agents]
+        self._dirty.clear()
+        batch_size = get_settings().agent_write_behind_batch_size
+        written: dict[str, AgentStatus] = {}
+        try:
+            for start in range(0, len(agent_ids), batch_size):
+                rows = []
+                for agent_id in agent_ids[start:start + batch_size]:
+                    agent = self._agents[agent_id]
+                    rows.append({"id": agent_id, **{f: getattr(agent, f) for f in WRITE_BEHIND_FIELDS}})
+                    old = self._persisted_status.get(agent_id)
+                    if old != agent.status:
+                        # Bulk UPDATEs bypass the unit of work the counters watch
+                        status_counters.record_transition(db, "agent", None, old, agent.status)
+                    written[agent_id] = agent.status
+                await db.execute(update(Agent), rows)
+            await db.commit()
+        except Exception:
+            self._dirty.update(agent_ids)
+            raise
+        self._persisted_status.update(written)
+        return len(agent_ids)
+
+    async def start(self) -> None:
+        """Load the registry and start the write-behind loop."""
+        async with self._session_factory() as db:
+            await self.load(db)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the write-behind loop and write back what is left."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            async with self._session_factory() as db:
+                await self.flush(db)
+        except Exception:
+            logger.exception("Final agent write-behind failed")
+
+    async def _run(self) -> None:
+        interval = get_settings().agent_write_behind_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._session_factory() as db:
+                    await self.flush(db)
+            except Exception:
+                logger.exception("Agent write-behind failed")
+
+
+# Global live agent registry instance
+live_agents = LiveAgentRegistry()
@@ -0,0 +1,173 @@
+"""RunPlan retry scheduler.
+
+FAILED RunPlans are re-driven in-process. Each failure is pushed onto a
+min-heap keyed by the time its retry is due, and a single timer task sleeps
+until the earliest entry fires - nothing polls the runplans table. The heap
+is rebuilt from the database at startup so pending retries survive restarts.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import get_settings
+from src.database import async_session_maker
+from src.models.runplan import RunPlan, RunPlanStatus
+from src.services.broadcaster import broadcast_runplan_update
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy(BaseModel):
+    """Exponential backoff policy for a skill."""
+    max_retries: int
+    base_delay_seconds: float
+    max_delay_seconds: float
+
+    def delay_for(self, retry_count: int) -> timedelta:
+        """Backoff to wait before the retry following ``retry_count`` retries."""
+        seconds = min(self.base_delay_seconds * (2 ** retry_count), self.max_delay_seconds)
+        return timedelta(seconds=seconds)
+
+
+def get_retry_policy(skill_name: str) -> RetryPolicy:
+    """Resolve the retry policy for a skill, applying per-skill overrides."""
+    settings = get_settings()
+    policy = {
+        "max_retries": settings.runplan_retry_max_retries,
+        "base_delay_seconds": settings.runplan_retry_base_delay_seconds,
+        "max_delay_seconds": settings.runplan_retry_max_delay_seconds,
+    }
+    policy.update(settings.runplan_retry_policies.get(skill_name, {}))
+    return RetryPolicy(**policy)
+
+
+class RetryScheduler:
+    """Holds pending RunPlan retries in a heap and fires them when due."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+        self._heap: list[tuple[datetime, str]] = []
+        # Authoritative due time per RunPlan; heap entries that disagree are stale
+        self._due: dict[str, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, runplan: RunPlan) -> Optional[datetime]:
+        """Queue a FAILED RunPlan for retry.
+
+        Returns the time the retry is due, or None if the skill's retry
+        budget is exhausted.
+        """
+        policy = get_retry_policy(runplan.skill_name)
+        if runplan.retry_count >= policy.max_retries:
+            self._due.pop(runplan.id, None)
+            return None
+
+        failed_at = runplan.completed_at or datetime.utcnow()
+        due_at = failed_at + policy.delay_for(runplan.retry_count)
+        self._due[runplan.id] = due_at
+        heapq.heappush(self._heap, (due_at, runplan.id))
+        self._wakeup.set()
+        return due_at
+
+    def cancel(self, runplan_id: str) -> None:
+        """Drop a pending retry (its heap entry is discarded lazily)."""
+        self._due.pop(runplan_id, None)
+
+    def clear(self) -> None:
+        """Drop all pending retries."""
+        self._heap.clear()
+        self._due.clear()
+
+    def pending(self) -> list[tuple[str, datetime]]:
+        """Pending retries ordered by due time."""
+        return sorted(self._due.items(), key=lambda item: item[1])
+
+    def _pop_due(self, now: datetime) -> list[str]:
+        """Pop every RunPlan whose retry is due at ``now``."""
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, runplan_id = heapq.heappop(self._heap)
+            if self._due.get(runplan_id) == due_at:
+                del self._due[runplan_id]
+                due_ids.append(runplan_id)
+        return due_ids
+
+    async def retry_due(
+        self,
+        db: AsyncSession,
+        now: Optional[datetime] = None
+    ) -> list[RunPlan]:
+        """Move due RunPlans back to PENDING and bump their retry_count."""
+        due_ids = self._pop_due(now or datetime.utcnow())
+        if not due_ids:
+            return []
+
+        result = await db.execute(select(RunPlan).where(RunPlan.id.in_(due_ids)))
+        retried = []
+        for runplan in result.scalars():
+            # Someone may have re-driven or cancelled it since it failed
+            if runplan.status != RunPlanStatus.FAILED:
+                continue
+            runplan.retry_count += 1
+            runplan.status = RunPlanStatus.PENDING
+            runplan.completed_at = None
+            retried.append(runplan)
+
+        await db.flush()
+        for runplan in retried:
+            await broadcast_runplan_update(runplan)
+        return retried
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Rebuild the heap from FAILED RunPlans in the database."""
+        self.clear()
+        result = await db.execute(
+            select(RunPlan).where(RunPlan.status == RunPlanStatus.FAILED)
+        )
+        for runplan in result.scalars():
+            self.schedule(runplan)
+
+    async def start(self) -> None:
+        """Rebuild pending retries and start the timer task."""
+        async with self._session_factory() as db:
+            await self.rebuild(db)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the timer task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            timeout = None
+            if self._heap:
+                timeout = max((self._heap[0][0] - datetime.utcnow()).total_seconds(), 0)
+            try:
+                # A newly scheduled retry may be due before the current head
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                async with self._session_factory() as db:
+                    await self.retry_due(db)
+                    await db.commit()
+            except Exception:
+                logger.exception("RunPlan retry pass failed")
+
+
+# Global retry scheduler instance
+retry_scheduler = RetryScheduler()
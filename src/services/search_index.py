@@ -0,0 +1,211 @@
+"""Full-text search over audit logs, tasks and projects.
+
+Each searchable row has a ``search_documents`` entry holding its text and
+the project, agent and time it can be filtered by. Entries are written in
+the same transaction as their source, from a session ``after_flush`` hook,
+so the index is current as soon as the source row is committed.
+
+Postgres answers queries from a GIN index over the documents' tsvector and
+ranks them with ``ts_rank``; SQLite (tests and local mode) uses an FTS5
+table kept in sync by triggers and ranks with ``bm25``.
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import Select, select, insert, delete, func, literal_column, table, column, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes
+from src.models.audit import AuditLog
+from src.models.project import Project
+from src.models.search import SearchDocument, TSVECTOR_SQL
+from src.models.task import Task
+from src.schemas.search import SearchResult, SearchSourceType
+
+# Source attributes that feed each document; changing any re-indexes it
+INDEXED_ATTRIBUTES = {
+    AuditLog: ("description", "command", "file_path", "error_message", "agent_id", "project_id"),
+    Task: ("title", "description", "assigned_agent_id", "project_id"),
+    Project: ("name", "description"),
+}
+
+# Document type of each source model
+SOURCE_TYPES = {
+    AuditLog: SearchSourceType.AUDIT,
+    Task: SearchSourceType.TASK,
+    Project: SearchSourceType.PROJECT,
+}
+
+# Source rows fetched and indexed per batch by the startup backfill
+BACKFILL_BATCH_SIZE = 1000
+
+SNIPPET_WORDS = 16
+
+
+def _join(*parts: Optional[str]) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def document_for(obj) -> Optional[dict]:
+    """Search document values for a source row, or None if it is not searchable."""
+    if isinstance(obj, AuditLog):
+        return {
+            "source_type": SearchSourceType.AUDIT.value,
+            "source_id": obj.id,
+            "project_id": obj.project_id,
+            "agent_id": obj.agent_id,
+            "title": obj.description[:255],
+            "body": _join(obj.description, obj.command, obj.file_path, obj.error_message),
+            "created_at": obj.created_at,
+        }
+    if isinstance(obj, Task):
+        return {
+            "source_type": SearchSourceType.TASK.value,
+            "source_id": obj.id,
+            "project_id": obj.project_id,
+            "agent_id": obj.assigned_agent_id,
+            "title": obj.title,
+            "body": obj.description or "",
+            "created_at": obj.created_at,
+        }
+    if isinstance(obj, Project):
+        return {
+            "source_type": SearchSourceType.PROJECT.value,
+            "source_id": obj.id,
+            "project_id": obj.id,
+            "agent_id": None,
+            "title": obj.name,
+            "body": obj.description or "",
+            "created_at": obj.created_at,
+        }
+    return None
+
+
+def _changed(obj) -> bool:
+    return any(
+        attributes.get_history(obj, name).has_changes()
+        for name in INDEXED_ATTRIBUTES.get(type(obj), ())
+    )
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    """Index new and re-index edited sources in the flushing transaction."""
+    documents = [document_for(obj) for obj in session.new]
+    documents += [document_for(obj) for obj in session.dirty if type(obj) in INDEXED_ATTRIBUTES and _changed(obj)]
+    stale = [document_for(obj) for obj in session.deleted]
+    documents = [doc for doc in documents if doc]
+    stale = [doc for doc in stale if doc]
+    if not (documents or stale):
+        return
+    connection = session.connection()
+    _delete_documents(connection, documents + stale)
+    if documents:
+        connection.execute(insert(SearchDocument), documents)
+
+
+def _delete_documents(connection, documents: Iterable[dict]) -> None:
+    by_type: dict[str, list[str]] = {}
+    for doc in documents:
+        by_type.setdefault(doc["source_type"], []).append(doc["source_id"])
+    for source_type, source_ids in by_type.items():
+        connection.execute(
+            delete(SearchDocument).where(
+                SearchDocument.source_type == source_type,
+                SearchDocument.source_id.in_(source_ids),
+            )
+        )
+
+
+def unindexed_rows(model, source_type: SearchSourceType) -> Select:
+    """Rows of ``model`` that have no search document."""
+    existing = select(SearchDocument.source_id).where(SearchDocument.source_type == source_type.value)
+    return select(model).where(model.id.not_in(existing))
+
+
+async def backfill_search_index(db: AsyncSession) -> int:
+    """Index source rows that have no search document yet; returns the count.
+
+    Rows written before the index existed are picked up at startup; they
+    are read and indexed ``BACKFILL_BATCH_SIZE`` at a time.
+    """
+    indexed = 0
+    for model, source_type in SOURCE_TYPES.items():
+        result = await db.stream(
+            unindexed_rows(model, source_type).execution_options(yield_per=BACKFILL_BATCH_SIZE)
+        )
+        async for batch in result.scalars().partitions():
+            await db.execute(insert(SearchDocument), [document_for(obj) for obj in batch])
+            indexed += len(batch)
+    return indexed
+
+
+def _fts_query(q: str) -> str:
+    """FTS5 query matching all words of ``q``, each taken literally."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in q.split())
+
+
+async def search(
+    db: AsyncSession,
+    q: str,
+    project_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    types: Optional[list[SearchSourceType]] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[SearchResult]:
+    """Documents matching every word of ``q``, best match first."""
+    if db.get_bind().dialect.name == "postgresql":
+        query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), q)
+        vector = literal_column(TSVECTOR_SQL)
+        rank = func.ts_rank(vector, query)
+        snippet = func.ts_headline(
+            literal_column("'english'::regconfig"),
+            SearchDocument.body,
+            query,
+            f"MaxWords={SNIPPET_WORDS}, MinWords=5, StartSel=[, StopSel=]",
+        )
+        statement = (
+            select(SearchDocument, rank.label("rank"), snippet.label("snippet"))
+            .where(vector.op("@@")(query))
+            .order_by(rank.desc())
+        )
+    else:
+        fts = table("search_documents_fts", column("rowid"))
+        fts_table = literal_column("search_documents_fts")
+        bm25 = func.bm25(fts_table)
+        snippet = func.snippet(fts_table, -1, "[", "]", "...", SNIPPET_WORDS)
+        statement = (
+            select(SearchDocument, (-bm25).label("rank"), snippet.label("snippet"))
+            .join(fts, fts.c.rowid == SearchDocument.id)
+            .where(fts_table.op("MATCH")(_fts_query(q)))
+            .order_by(bm25)
+        )
+
+    filters = []
+    if project_id:
+        filters.append(SearchDocument.project_id == project_id)
+    if agent_id:
+        filters.append(SearchDocument.agent_id == agent_id)
+    if since:
+        filters.append(SearchDocument.created_at >= since)
+    if until:
+        filters.append(SearchDocument.created_at < until)
+    if types:
+        filters.append(SearchDocument.source_type.in_([t.value for t in types]))
+    if filters:
+        statement = statement.where(and_(*filters))
+
+    result = await db.execute(statement.offset(offset).limit(limit))
+    return [
+        SearchResult(
+            type=doc.source_type,
+            id=doc.source_id,
+            project_id=doc.project_id,
+            agent_id=doc.agent_id,
+            title=doc.title,
+            snippet=snippet_text,
+            rank=rank_value,
+            created_at=doc.created_at,
+        )
+        for doc, rank_value, snippet_text in result
+    ]
@@ -0,0 +1,54 @@
+"""Session event hooks keeping derived state in step with ORM writes.
+
+Status counters, version counters, the live agent registry, the task
+dependency graph, the recent audit buffer, the search index and the audit
+rollup all follow writes through SQLAlchemy session events, and build jobs
+start on commit. They are registered here, explicitly, rather than as a
+side effect of importing whichever module happens to be imported: every
+process writing through the ORM (the API, workers, scripts) calls
+``install_session_hooks()`` once at startup.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.services import audit_stats, search_index
+from src.services.audit_recent import recent_audit
+from src.services.build_jobs import build_jobs
+from src.services.dependency_graph import dependency_graph
+from src.services.live_agents import live_agents
+from src.services.status_counters import status_counters
+from src.services.versions import versions
+
+_installed = False
+
+
+def _hooks() -> list[tuple[str, object]]:
+    return [
+        ("after_flush", status_counters._after_flush),
+        ("after_commit", status_counters._after_commit),
+        ("after_rollback", status_counters._after_rollback),
+        ("after_flush", search_index._after_flush),
+        ("after_flush", audit_stats._after_flush),
+        ("after_flush", versions._after_flush),
+        ("do_orm_execute", versions._do_orm_execute),
+        ("after_commit", versions._after_commit),
+        ("after_rollback", versions._after_rollback),
+        ("after_flush", recent_audit._after_flush),
+        ("after_commit", recent_audit._after_commit),
+        ("after_rollback", recent_audit._after_rollback),
+        ("after_commit", live_agents._after_commit),
+        ("after_transaction_end", live_agents._after_transaction_end),
+        ("after_commit", dependency_graph._after_commit),
+        ("after_transaction_end", dependency_graph._after_transaction_end),
+        ("after_commit", build_jobs._after_commit),
+        ("after_transaction_end", build_jobs._after_transaction_end),
+    ]
+
+
+def install_session_hooks() -> None:
+    """Register every session event hook; calling it again is a no-op."""
+    global _installed
+    if _installed:
+        return
+    for name, hook in _hooks():
+        event.listen(Session, name, hook)
+    _installed = True
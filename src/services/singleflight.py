@@ -0,0 +1,144 @@
+"""Coalescing of identical concurrent reads.
+
+A broadcast makes every open dashboard refresh at once, firing the same
+``GET /costs/summary/{project_id}`` or ``/audit/recent?limit=50`` within
+milliseconds. ``RequestCoalescingMiddleware`` sends identical GET requests
+(same path, query string and conditional headers) for the configured path
+prefixes through one ``SingleFlight`` call: the first request runs the
+route, later ones wait for it and get a copy of its response. With
+``coalesce_ttl_seconds`` set, successful responses are also reused for that
+long after they complete.
+
+Only idempotent routes belong in ``coalesce_path_prefixes``; routes with
+side effects (MCP inbox fetches) or streamed responses must stay out.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from src.config import get_settings
+
+# Request headers that change the response, so they are part of the key
+KEY_HEADERS = (b"if-none-match", b"if-modified-since")
+
+# Completed results kept for the micro-TTL, at most
+MAX_CACHED_RESULTS = 1000
+
+
+class SingleFlight:
+    """Shares one in-flight call per key among concurrent callers."""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+        # Calls actually run, and callers served by another caller's call
+        self.executed = 0
+        self.shared = 0
+
+    def clear(self) -> None:
+        """Forget cached results and counters."""
+        self._results.clear()
+        self.executed = 0
+        self.shared = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        ttl: float = 0.0,
+        cacheable: Callable[[Any], bool] = lambda result: True,
+    ) -> Any:
+        """Result of ``fn()``, shared with concurrent callers of the same key.
+
+        The call runs in its own task, so a caller that is cancelled (a
+        client disconnecting) does not cancel it for the others. Results
+        for which ``cacheable`` is true are reused for ``ttl`` seconds.
+        """
+        cached = self._results.get(key)
+        if cached:
+            if cached[0] > time.monotonic():
+                self.shared += 1
+                return cached[1]
+            del self._results[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+        else:
+            self.executed += 1
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done, ttl, cacheable))
+        return await asyncio.shield(future)
+
+    def _finished(self, key: Hashable, future: asyncio.Future, ttl: float, cacheable) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if ttl <= 0 or future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if not cacheable(result):
+            return
+        now = time.monotonic()
+        if len(self._results) >= MAX_CACHED_RESULTS:
+            for stale in [k for k, (expires, _) in self._results.items() if expires <= now]:
+                del self._results[stale]
+            if len(self._results) >= MAX_CACHED_RESULTS:
+                # Dict order is insertion order: drop the oldest
+                del self._results[next(iter(self._results))]
+        self._results[key] = (now + ttl, result)
+
+
+def coalesced_path(path: str, prefixes: list[str]) -> bool:
+    """Whether ``path`` is one of, or below one of, ``prefixes``."""
+    return any(path == prefix or path.startswith(prefix.rstrip("/") + "/") for prefix in prefixes)
+
+
+class RequestCoalescingMiddleware:
+    """ASGI middleware running identical concurrent GETs once.
+
+    Responses are buffered, so it must only see routes returning ordinary
+    bodies. Add it before the CORS middleware so per-origin CORS headers
+    are applied to each copy of a shared response.
+    """
+
+    def __init__(self, app, flight: Optional[SingleFlight] = None):
+        self.app = app
+        self.flight = flight or request_singleflight
+
+    async def __call__(self, scope, receive, send) -> None:
+        settings = get_settings()
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not coalesced_path(scope["path"], settings.coalesce_path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        key = (scope["path"], scope["query_string"], *(headers.get(name) for name in KEY_HEADERS))
+        status, response_headers, body = await self.flight.do(
+            key,
+            lambda: self._capture(scope, receive),
+            ttl=settings.coalesce_ttl_seconds,
+            cacheable=lambda response: response[0] == 200,
+        )
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _capture(self, scope, receive) -> tuple[int, list, bytes]:
+        start: dict = {}
+        chunks: list[bytes] = []
+
+        async def capture(message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        return start["status"], list(start.get("headers", [])), b"".join(chunks)
+
+
+# Global single-flight instance for coalesced requests
+request_singleflight = SingleFlight()
@@ -0,0 +1,257 @@
+"""In-memory status counters.
+
+Keeps task counts per project and status, and agent and RunPlan counts per
+status, so dashboards never COUNT over whole tables. Status changes are
+picked up from every flush through SQLAlchemy session events, held on the
+session until it commits and only then applied, so rolled-back work never
+moves a counter. Changes made with bulk UPDATE statements, which bypass the
+unit of work, are recorded explicitly with ``record_transition``.
+
+Counters are rebuilt from the database on first use and periodically
+afterwards to correct any drift, and every change is pushed to clients as a
+compact COUNTS_UPDATE message.
+"""
+import asyncio
+import json
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes
+from src.config import get_settings
+from src.database import async_session_maker
+from src.models.agent import Agent
+from src.models.runplan import RunPlan
+from src.models.task import Task
+from src.websocket.manager import connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Key in Session.info holding deltas waiting for commit
+_PENDING_KEY = "status_count_deltas"
+
+# Wait this long after a change before publishing, coalescing bursts
+PUBLISH_DELAY_SECONDS = 0.25
+
+
+def _status_value(status) -> Optional[str]:
+    return status.value if hasattr(status, "value") else status
+
+
+class StatusCounters:
+    """Task, agent and RunPlan counts by status, maintained incrementally."""
+
+    def __init__(self, session_factory=async_session_maker):
+        self._session_factory = session_factory
+        self._tasks: dict[str, Counter] = {}
+        self._agents: Counter = Counter()
+        self._runplans: Counter = Counter()
+        self._loaded = False
+        self.reconciled_at: Optional[datetime] = None
+        # What changed since the last COUNTS_UPDATE
+        self._dirty_projects: set[str] = set()
+        self._dirty_agents = False
+        self._dirty_runplans = False
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def clear(self) -> None:
+        """Drop all counts and mark the counters as unloaded."""
+        self._tasks.clear()
+        self._agents.clear()
+        self._runplans.clear()
+        self._loaded = False
+        self.reconciled_at = None
+        self._dirty_projects.clear()
+        self._dirty_agents = self._dirty_runplans = False
+
+    async def reconcile(self, db: AsyncSession) -> None:
+        """Recount everything from the database."""
+        result = await db.execute(
+            select(Task.project_id, Task.status, func.count()).group_by(Task.project_id, Task.status)
+        )
+        tasks: dict[str, Counter] = {}
+        for project_id, status, count in result:
+            tasks.setdefault(project_id, Counter())[_status_value(status)] = count
+
+        result = await db.execute(select(Agent.status, func.count()).group_by(Agent.status))
+        agents = Counter({_status_value(status): count for status, count in result})
+        result = await db.execute(select(RunPlan.status, func.count()).group_by(RunPlan.status))
+        runplans = Counter({_status_value(status): count for status, count in result})
+
+        self._dirty_projects |= set(tasks) | set(self._tasks)
+        self._dirty_agents = self._dirty_runplans = True
+        self._tasks, self._agents, self._runplans = tasks, agents, runplans
+        self._loaded = True
+        self.reconciled_at = datetime.utcnow()
+        self._changed.set()
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Count from the database on first use."""
+        if not self._loaded:
+            await self.reconcile(db)
+
+    def task_counts(self, project_id: Optional[str] = None) -> dict[str, dict[str, int]]:
+        """project_id -> status -> task count, omitting zero counts."""
+        project_ids = [project_id] if project_id else list(self._tasks)
+        return {pid: self._dense(self._tasks.get(pid, Counter())) for pid in project_ids}
+
+    def agent_counts(self) -> dict[str, int]:
+        """Agent status -> count."""
+        return self._dense(self._agents)
+
+    def runplan_counts(self) -> dict[str, int]:
+        """RunPlan status -> count."""
+        return self._dense(self._runplans)
+
+    @staticmethod
+    def _dense(counter: Counter) -> dict[str, int]:
+        return {status: count for status, count in counter.items() if count}
+
+    def record_transition(self, db: AsyncSession, kind: str, project_id: Optional[str], old, new) -> None:
+        """Record a status change made outside the unit of work.
+
+        ``kind`` is "task", "agent" or "runplan"; it is applied when ``db``
+        commits.
+        """
+        self._pending(db.sync_session).append((kind, project_id, _status_value(old), _status_value(new)))
+
+    def record_task_transition(self, db: AsyncSession, project_id: str, old, new) -> None:
+        """Record a task status change made outside the unit of work."""
+        self.record_transition(db, "task", project_id, old, new)
+
+    @staticmethod
+    def _pending(session: Session) -> list:
+        return session.info.setdefault(_PENDING_KEY, [])
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        pending = self._pending(session)
+        for obj in session.new:
+            kind = self._kind(obj)
+            if kind:
+                pending.append((kind, getattr(obj, "project_id", None), None, _status_value(obj.status)))
+        for obj in session.dirty:
+            kind = self._kind(obj)
+            if not kind:
+                continue
+            history = attributes.get_history(obj, "status")
+            if history.added and history.deleted:
+                pending.append((
+                    kind, getattr(obj, "project_id", None),
+                    _status_value(history.deleted[0]), _status_value(history.added[0]),
+                ))
+        for obj in session.deleted:
+            kind = self._kind(obj)
+            if kind:
+                pending.append((kind, getattr(obj, "project_id", None), _status_value(obj.status), None))
+
+    @staticmethod
+    def _kind(obj) -> Optional[str]:
+        if isinstance(obj, Task):
+            return "task"
+        if isinstance(obj, Agent):
+            return "agent"
+        if isinstance(obj, RunPlan):
+            return "runplan"
+        return None
+
+    def _after_commit(self, session: Session) -> None:
+        deltas = session.info.pop(_PENDING_KEY, None)
+        if deltas and self._loaded:
+            for kind, project_id, old, new in deltas:
+                self._apply(kind, project_id, old, new)
+            self._changed.set()
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    def _apply(self, kind: str, project_id: Optional[str], old: Optional[str], new: Optional[str]) -> None:
+        if kind == "task":
+            counter = self._tasks.setdefault(project_id, Counter())
+            self._dirty_projects.add(project_id)
+        elif kind == "agent":
+            counter = self._agents
+            self._dirty_agents = True
+        else:
+            counter = self._runplans
+            self._dirty_runplans = True
+        if old is not None:
+            counter[old] -= 1
+        if new is not None:
+            counter[new] += 1
+
+    def changes(self) -> Optional[dict]:
+        """Counts that changed since the last call, or None.
+
+        Each project's map replaces the client's previous map for that
+        project; agent and RunPlan maps replace theirs wholesale.
+        """
+        if not (self._dirty_projects or self._dirty_agents or self._dirty_runplans):
+            return None
+        payload = {}
+        if self._dirty_projects:
+            payload["tasks"] = {pid: self._dense(self._tasks.get(pid, Counter())) for pid in self._dirty_projects}
+        if self._dirty_agents:
+            payload["agents"] = self.agent_counts()
+        if self._dirty_runplans:
+            payload["runplans"] = self.runplan_counts()
+        self._dirty_projects = set()
+        self._dirty_agents = self._dirty_runplans = False
+        return payload
+
+    async def publish(self) -> None:
+        """Broadcast pending changes as COUNTS_UPDATE."""
+        payload = self.changes()
+        if payload is None:
+            return
+        message = {
+            "type": "COUNTS_UPDATE",
+            "payload": payload,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        await connection_manager.broadcast(json.dumps(message))
+
+    async def start(self) -> None:
+        """Load the counters and start the publish/reconcile loop."""
+        async with self._session_factory() as db:
+            await self.reconcile(db)
+        self._changed.clear()
+        self.changes()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the publish/reconcile loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        interval = get_settings().status_counts_reconcile_seconds
+        loop = asyncio.get_running_loop()
+        next_reconcile = loop.time() + interval
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), max(next_reconcile - loop.time(), 0))
+                await asyncio.sleep(PUBLISH_DELAY_SECONDS)
+            except asyncio.TimeoutError:
+                try:
+                    async with self._session_factory() as db:
+                        await self.reconcile(db)
+                except Exception:
+                    logger.exception("Status counter reconcile failed")
+                next_reconcile = loop.time() + interval
+            self._changed.clear()
+            try:
+                await self.publish()
+            except Exception:
+                logger.exception("COUNTS_UPDATE broadcast failed")
+
+
+# Global status counters instance
+status_counters = StatusCounters()
@@ -0,0 +1,94 @@
+"""Version counters for conditional GETs.
+
+Polled list endpoints mostly return the same body as last time. Every
+committed write bumps a version for its table and, for rows belonging to a
+project (``project_id``, or the project row itself), for that table and
+project. ETags are built from these counters, so ``If-None-Match`` is
+answered with 304 from memory, without touching the database.
+
+Writes are picked up from every flush, and from ORM-enabled INSERT, UPDATE
+and DELETE statements, and applied when the session commits. Bulk
+statements are not attributed to a project and bump every project of their
+table. State changed outside the database, such as the live agent
+registry, is bumped explicitly with ``bump``.
+
+Counters live in the process; ETags carry a per-process epoch so they never
+match across restarts.
+"""
+import uuid
+from collections import Counter
+from typing import Iterable, Optional
+from sqlalchemy.orm import Session
+from src.models.project import Project
+
+# Key in Session.info holding bumps waiting for commit
+_PENDING_KEY = "version_bumps"
+
+
+def _project_of(obj) -> Optional[str]:
+    if isinstance(obj, Project):
+        return obj.id
+    return getattr(obj, "project_id", None)
+
+
+class VersionCounters:
+    """Write counters per table and per (table, project)."""
+
+    def __init__(self):
+        self._epoch = uuid.uuid4().hex[:8]
+        self._tables: Counter = Counter()
+        # Bumps not attributed to a project invalidate every project's version
+        self._table_wide: Counter = Counter()
+        self._projects: Counter = Counter()
+
+    def clear(self) -> None:
+        """Reset all counters under a new epoch."""
+        self._epoch = uuid.uuid4().hex[:8]
+        self._tables.clear()
+        self._table_wide.clear()
+        self._projects.clear()
+
+    def bump(self, table: str, project_id: Optional[str] = None) -> None:
+        """Record a change to ``table``, limited to one project if given."""
+        self._tables[table] += 1
+        if project_id:
+            self._projects[(table, project_id)] += 1
+        else:
+            self._table_wide[table] += 1
+
+    def etag(self, tables: Iterable[str], project_id: Optional[str] = None) -> str:
+        """Weak ETag for a response built from ``tables``, optionally for one project."""
+        if project_id:
+            parts = [f"{self._table_wide[t]}.{self._projects[(t, project_id)]}" for t in tables]
+        else:
+            parts = [str(self._tables[t]) for t in tables]
+        return f'W/"{self._epoch}-{"-".join(parts)}"'
+
+    @staticmethod
+    def _pending(session: Session) -> list:
+        return session.info.setdefault(_PENDING_KEY, [])
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        pending = self._pending(session)
+        for obj in session.new | session.deleted:
+            pending.append((obj.__table__.name, _project_of(obj)))
+        for obj in session.dirty:
+            if session.is_modified(obj):
+                pending.append((obj.__table__.name, _project_of(obj)))
+
+    def _do_orm_execute(self, orm_execute_state) -> None:
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = getattr(orm_execute_state.statement, "table", None)
+            if table is not None:
+                self._pending(orm_execute_state.session).append((table.name, None))
+
+    def _after_commit(self, session: Session) -> None:
+        for table, project_id in session.info.pop(_PENDING_KEY, ()):
+            self.bump(table, project_id)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+# Global version counters instance
+versions = VersionCounters()
@@ -1,6 +1,6 @@
 """WebSocket connection manager for real-time updates."""
 from fastapi import WebSocket
-from typing import List
+from typing import Dict, List, Set
 
 
 class ConnectionManager:
@@ -8,43 +8,76 @@ class ConnectionManager:
 
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        # Routing table for MCP agents: agent_id -> bound connections
+        self.agent_connections: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, websocket: WebSocket):
         """Accept a new WebSocket connection."""
         await websocket.accept()
         self.active_connections.append(websocket)
 
+    def bind_agent(self, agent_id: str, websocket: WebSocket):
+        """Bind a connection to an MCP agent so it can receive directed messages."""
+        self.agent_connections.setdefault(agent_id, set()).add(websocket)
+
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        for agent_id in [a for a, conns in self.agent_connections.items() if websocket in conns]:
+            self.agent_connections[agent_id].discard(websocket)
+            if not self.agent_connections[agent_id]:
+                del self.agent_connections[agent_id]
+
+    def is_agent_connected(self, agent_id: str) -> bool:
+        """Check whether an MCP agent has a bound connection."""
+        return agent_id in self.agent_connections
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """Send a message to a specific client."""
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        """Broadcast a message to all connected clients.
-
-        This is the core of "Radical Visibility" - every state change
-        is pushed to all connected frontends immediately.
-        """
+    async def _send_all(self, message: str, connections) -> int:
+        """Send to each connection, dropping the ones that fail."""
+        delivered = 0
         disconnected = []
-        for connection in self.active_connections:
+        for connection in connections:
             try:
                 await connection.send_text(message)
+                delivered += 1
             except Exception:
                 disconnected.append(connection)
 
         # Clean up disconnected clients
         for connection in disconnected:
             self.disconnect(connection)
+        return delivered
+
+    async def broadcast(self, message: str):
+        """Broadcast a message to all connected clients.
+
+        This is the core of "Radical Visibility" - every state change
+        is pushed to all connected frontends immediately.
+        """
+        await self._send_all(message, list(self.active_connections))
+
+    async def send_to_agent(self, agent_id: str, message: str) -> int:
+        """Send a message only to the connections bound to an agent.
+
+        Returns the number of connections the message reached.
+        """
+        return await self._send_all(message, list(self.agent_connections.get(agent_id, ())))
 
     @property
     def connection_count(self) -> int:
         """Return the number of active connections."""
         return len(self.active_connections)
 
+    @property
+    def agent_connection_count(self) -> int:
+        """Return the number of agents with a bound connection."""
+        return len(self.agent_connections)
+
 
 # Global connection manager instance
 connection_manager = ConnectionManager()
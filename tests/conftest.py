@@ -1,3 +1,4 @@
+import json
 import pytest
 import pytest_asyncio
 from typing import AsyncGenerator
@@ -5,13 +6,36 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from src.main import app
 from src.database import get_db, Base
+from src.services import (
+    agent_registry,
+    audit_pipeline,
+    dependency_graph,
+    live_agents,
+    recent_audit,
+    request_singleflight,
+    retry_scheduler,
+    status_counters,
+    versions,
+)
+from src.services.design_requests import design_requests
+from src.services.session_hooks import install_session_hooks
 # Import all models to ensure they are registered
 from src.models.agent import Agent
 from src.models.project import Project
+from src.models.requirement import ProjectRequirement
+from src.models.tech_decision import ProjectTechDecision
 from src.models.task import Task
+from src.models.task_dependency import TaskDependency
 from src.models.cost import CostRecord
 from src.models.audit import AuditLog
+from src.models.audit_rollup import AuditRollup
+from src.models.audit_blob import AuditBlob
 from src.models.runplan import RunPlan
+from src.models.runplan_step import RunPlanStep
+from src.models.mcp_message import MCPInboxMessage
+from src.models.search import SearchDocument
+
+install_session_hooks()
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -23,6 +47,31 @@ engine = create_async_engine(
 
 TestingSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
 
+# In-process state that must not leak from one test into the next
+SINGLETONS = (
+    live_agents,
+    status_counters,
+    versions,
+    recent_audit,
+    request_singleflight,
+    audit_pipeline,
+    design_requests,
+    agent_registry,
+    dependency_graph,
+    retry_scheduler,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_singletons():
+    """Start and end each test with every in-process singleton cleared."""
+    for singleton in SINGLETONS:
+        singleton.clear()
+    yield
+    for singleton in SINGLETONS:
+        singleton.clear()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     """Create a fresh database session for each test."""
@@ -45,3 +94,19 @@ async def async_client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient,
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a connected WebSocket client."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message: str):
+        self.sent.append(json.loads(message))
+
+
+@pytest.fixture
+def make_websocket():
+    """Factory for fake WebSocket clients recording the frames sent to them."""
+    return FakeWebSocket
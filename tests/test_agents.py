@@ -1,6 +1,11 @@
 import pytest
 from httpx import AsyncClient
-from src.models.agent import AgentRole
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.agent import Agent, AgentRole
+from src.services.live_agents import live_agents
+from src.services.status_counters import status_counters
+
 
 @pytest.mark.asyncio
 async def test_create_agent(async_client: AsyncClient):
@@ -36,3 +41,78 @@ async def test_list_agents(async_client: AsyncClient):
     # Check if our agent is there
     names = [a["name"] for a in data]
     assert "Listable Agent" in names
+
+@pytest.mark.asyncio
+async def test_batch_get_agents(async_client: AsyncClient):
+    """Test fetching several agents in one request."""
+    ids = []
+    for name in ("Batch A", "Batch B"):
+        response = await async_client.post("/agents", json={"name": name, "runner_id": "test-runner-1"})
+        ids.append(response.json()["id"])
+
+    response = await async_client.post("/agents/batch-get", json={"ids": ids + [ids[0]]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [a["name"] for a in data["agents"]] == ["Batch A", "Batch B"]
+    assert data["missing"] == []
+
+    assert (await async_client.post("/agents/batch-get", json={"ids": []})).status_code == 422
+
+
+async def stored_status(db_session: AsyncSession, agent_id: str) -> str:
+    result = await db_session.execute(select(Agent.status).where(Agent.id == agent_id))
+    return result.scalar_one().value
+
+
+@pytest.mark.asyncio
+async def test_status_is_served_from_memory_and_written_behind(
+    async_client: AsyncClient, db_session: AsyncSession
+):
+    """Test that status changes are visible at once and persisted on flush."""
+    agent = (await async_client.post("/agents", json={"name": "Live", "runner_id": "runner-1"})).json()
+    await db_session.commit()
+    await status_counters.ensure_loaded(db_session)
+
+    response = await async_client.patch(
+        f"/agents/{agent['id']}/status", json={"status": "EXECUTING", "current_action": "Coding"}
+    )
+    assert response.json()["status"] == "EXECUTING"
+    assert (await async_client.get(f"/agents/{agent['id']}")).json()["current_action"] == "Coding"
+    assert [a["id"] for a in (await async_client.get("/agents/active")).json()] == [agent["id"]]
+    assert await stored_status(db_session, agent["id"]) == "IDLE"
+    assert live_agents.pending == 1
+
+    assert await live_agents.flush(db_session) == 1
+    assert live_agents.pending == 0
+    assert await stored_status(db_session, agent["id"]) == "EXECUTING"
+    assert status_counters.agent_counts() == {"EXECUTING": 1}
+
+
+@pytest.mark.asyncio
+async def test_live_registry_recovers_from_database(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that a reload keeps flushed state and drops unflushed changes."""
+    agent = (await async_client.post("/agents", json={"name": "Durable", "runner_id": "runner-1"})).json()
+    await async_client.patch(f"/agents/{agent['id']}/status", json={"status": "OFFLINE"})
+    await async_client.post(f"/agents/{agent['id']}/heartbeat")
+    await live_agents.flush(db_session)
+    await async_client.patch(f"/agents/{agent['id']}", json={"name": "Renamed"})
+
+    # Simulate a restart
+    live_agents.clear()
+    data = (await async_client.get(f"/agents/{agent['id']}")).json()
+    assert data["status"] == "OFFLINE"
+    assert data["name"] == "Durable"
+    assert data["last_heartbeat"] is not None
+    assert (await async_client.get("/agents/active")).json() == []
+    assert (await async_client.post("/agents/missing/heartbeat")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_agent_from_rolled_back_create_is_dropped(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that the registry only keeps agents whose insert committed."""
+    kept = (await async_client.post("/agents", json={"name": "Kept", "runner_id": "runner-1"})).json()
+    await db_session.commit()
+    await async_client.post("/agents", json={"name": "Ghost", "runner_id": "runner-1"})
+    await db_session.rollback()
+
+    assert [a["id"] for a in (await async_client.get("/agents")).json()] == [kept["id"]]
@@ -0,0 +1,312 @@
+"""Tests for audit statistics."""
+import shutil
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import Settings, get_settings
+from src.models.audit import AuditLog, AuditAction
+from src.models.audit_blob import AuditBlob
+from src.models.audit_rollup import AuditRollup
+from src.services.audit_archive import audit_archiver
+from src.services.audit_pipeline import audit_pipeline
+from src.services.audit_recent import recent_audit
+from src.services import audit_stats
+from src.services.audit_service import log_audit_event
+from src.services.audit_stats import rebuild_audit_rollups
+from src.services.session_hooks import install_session_hooks
+
+BASE = datetime(2026, 3, 2, 10, 0)
+
+
+def audit(minute: int, action: AuditAction, agent_id: str, success: bool = True, **fields) -> AuditLog:
+    return AuditLog(
+        id=str(uuid.uuid4()), action=action, description=action.value, agent_id=agent_id,
+        success=success, created_at=BASE + timedelta(minutes=minute, seconds=30), **fields,
+    )
+
+
+@pytest_asyncio.fixture
+async def audit_rows(db_session: AsyncSession):
+    db_session.add_all([
+        audit(0, AuditAction.COMMAND_RUN, "a1", command="npm install", project_id="p1"),
+        audit(0, AuditAction.COMMAND_RUN, "a1", command="npm install", project_id="p1"),
+        audit(0, AuditAction.COMMAND_RUN, "a2", success=False, command="npm test", project_id="p1"),
+        audit(1, AuditAction.FILE_READ, "a2", project_id="p2"),
+        audit(65, AuditAction.FILE_READ, "a1", project_id="p1"),
+    ])
+    await db_session.flush()
+
+
+@pytest.mark.asyncio
+async def test_audit_stats_raw_and_rollup_agree(async_client: AsyncClient, audit_rows):
+    """Test that raw rows and the rollup give the same buckets, error rates and commands."""
+    params = {"since": BASE.isoformat(), "until": (BASE + timedelta(hours=2)).isoformat()}
+    raw = (await async_client.get("/audit/stats", params={**params, "source": "raw"})).json()
+    rollup = (await async_client.get("/audit/stats", params={**params, "source": "rollup"})).json()
+    assert raw["source"] == "raw" and rollup["source"] == "rollup"
+
+    assert [(a["bucket"], a["action"], a["count"]) for a in raw["actions"]] == [
+        ("2026-03-02T10:00:00", "COMMAND_RUN", 3),
+        ("2026-03-02T10:01:00", "FILE_READ", 1),
+        ("2026-03-02T11:05:00", "FILE_READ", 1),
+    ]
+    assert rollup["actions"] == raw["actions"]
+    assert rollup["agents"] == raw["agents"]
+    assert raw["agents"][0] == {"agent_id": "a2", "total": 2, "errors": 1, "error_rate": 0.5}
+    assert raw["commands"] == [{"command": "npm install", "count": 2}, {"command": "npm test", "count": 1}]
+
+    hourly = (await async_client.get("/audit/stats", params={
+        **params, "bucket": "hour", "project_id": "p1",
+    })).json()
+    assert [(a["bucket"], a["count"]) for a in hourly["actions"]] == [
+        ("2026-03-02T10:00:00", 3), ("2026-03-02T11:00:00", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_audit_stats_defaults_and_rollup_rebuild(async_client: AsyncClient, db_session: AsyncSession, audit_rows):
+    """Test the default range, range validation and rebuilding the rollup from raw rows."""
+    data = (await async_client.get("/audit/stats")).json()
+    assert data["source"] == "rollup"  # 24 hours is beyond the raw limit
+    assert data["actions"] == []
+
+    assert (await async_client.get("/audit/stats", params={
+        "since": BASE.isoformat(), "until": BASE.isoformat(),
+    })).status_code == 400
+
+    assert await rebuild_audit_rollups(db_session) == 0
+    await db_session.execute(delete(AuditRollup))
+    assert await rebuild_audit_rollups(db_session) == 4
+    data = (await async_client.get("/audit/stats", params={
+        "since": BASE.isoformat(), "until": (BASE + timedelta(days=1)).isoformat(), "agent_id": "a1",
+    })).json()
+    assert [a["count"] for a in data["actions"]] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_expired_months_are_archived_and_readable(
+    async_client: AsyncClient, db_session: AsyncSession, tmp_path, monkeypatch
+):
+    """Test that whole expired months move to segment files and stay queryable."""
+    monkeypatch.setattr(get_settings(), "audit_archive_dir", str(tmp_path))
+    # Retention ends in mid-February: January is archived, February stays hot
+    monkeypatch.setattr(get_settings(), "audit_retention_days", (datetime.utcnow() - datetime(2026, 2, 14)).days)
+
+    january = datetime(2026, 1, 10)
+    db_session.add_all([
+        AuditLog(id="old-1", action=AuditAction.COMMAND_RUN, description="Old build",
+                 agent_id="a1", command="make", created_at=january),
+        AuditLog(id="old-2", action=AuditAction.FILE_READ, description="Old read",
+                 agent_id="a2", created_at=january + timedelta(days=1)),
+        AuditLog(id="feb", action=AuditAction.FILE_READ, description="February read",
+                 agent_id="a1", created_at=datetime(2026, 2, 20)),
+        AuditLog(id="new", action=AuditAction.FILE_READ, description="Fresh read", agent_id="a1"),
+    ])
+    await db_session.flush()
+
+    segments = await audit_archiver.archive_expired(db_session)
+    assert [(s.month, s.rows) for s in segments] == [("2026-01", 2)]
+    assert await audit_archiver.archive_expired(db_session) == []
+
+    listed = (await async_client.get("/audit/archive/segments")).json()
+    assert [s["month"] for s in listed] == ["2026-01"]
+    archived = (await async_client.get("/audit/archive", params={
+        "since": "2026-01-01T00:00:00", "until": "2026-02-01T00:00:00",
+    })).json()
+    assert [e["id"] for e in archived] == ["old-1", "old-2"]
+    assert archived[0]["command"] == "make"
+    archived = (await async_client.get("/audit/archive", params={
+        "since": "2026-01-01T00:00:00", "until": "2026-03-01T00:00:00", "agent_id": "a2",
+    })).json()
+    assert [e["id"] for e in archived] == ["old-2"]
+    assert (await async_client.get("/search", params={"q": "build"})).json() == []
+
+    # A month archived twice is merged without duplicates, and reading stops at the limit
+    (segment,) = audit_archiver.segments()
+    shutil.copy(tmp_path / segment.name, tmp_path / segment.name.replace("-2026-01-", "-2026-01-9"))
+    month = {"since": "2026-01-01T00:00:00", "until": "2026-02-01T00:00:00"}
+    assert [e["id"] for e in (await async_client.get("/audit/archive", params=month)).json()] == ["old-1", "old-2"]
+    limited = (await async_client.get("/audit/archive", params={**month, "limit": 1})).json()
+    assert [e["id"] for e in limited] == ["old-1"]
+
+    # Everything not archived is hot, including the rest of the cutoff month
+    assert audit_archiver.hot_since() == datetime(2026, 2, 1)
+    assert [e["id"] for e in (await async_client.get("/audit")).json()] == ["new", "feb"]
+    assert [e["id"] for e in (await async_client.get("/audit/recent")).json()] == ["new", "feb"]
+    assert [e["id"] for e in (await async_client.get("/audit/agent/a1")).json()] == ["new", "feb"]
+
+
+@pytest.mark.asyncio
+async def test_audit_policies_sample_and_aggregate(
+    async_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Test that sampling and aggregation cut rows but keep failures, decisions and counts."""
+    monkeypatch.setattr(get_settings(), "audit_action_policies", {
+        "FILE_READ": {"mode": "aggregate"},
+        "COMMAND_RUN": {"mode": "sample", "every": 5},
+        "DECISION_MADE": {"mode": "sample", "every": 5},
+    })
+
+    for i in range(10):
+        await log_audit_event(db_session, AuditAction.FILE_READ, "Read", agent_id="a1",
+                              file_path="a.py" if i % 2 else "b.py")
+        await log_audit_event(db_session, AuditAction.COMMAND_RUN, "Ran", agent_id="a1", command="ls")
+    failed = await log_audit_event(db_session, AuditAction.FILE_READ, "Read", agent_id="a1",
+                                   file_path="c.py", success=False)
+    decisions = [await log_audit_event(db_session, AuditAction.DECISION_MADE, "Chose") for _ in range(2)]
+    assert failed is not None and all(decisions)
+
+    stats = (await async_client.get("/audit/pipeline")).json()
+    assert stats["offered"] == {"FILE_READ": 11, "COMMAND_RUN": 10, "DECISION_MADE": 2}
+    assert stats["written"] == {"FILE_READ": 1, "COMMAND_RUN": 2, "DECISION_MADE": 2}
+    assert stats["pending"] == 10
+
+    assert await audit_pipeline.flush_aggregates(db_session, closed_only=True) == 0
+    assert await audit_pipeline.flush_aggregates(db_session) == 2
+    entries = (await async_client.get("/audit", params={
+        "action": "FILE_READ", "fields": "file_path,event_count,success",
+    })).json()
+    assert sorted((e["file_path"], e["event_count"]) for e in entries) == [("a.py", 5), ("b.py", 5), ("c.py", 1)]
+
+    # Raw and rollup statistics both count events, not stored rows
+    now = datetime.utcnow()
+    for source in ("raw", "rollup"):
+        data = (await async_client.get("/audit/stats", params={
+            "since": (now - timedelta(hours=1)).isoformat(), "until": (now + timedelta(minutes=1)).isoformat(),
+            "source": source, "bucket": "day",
+        })).json()
+        counts = Counter()
+        for bucket in data["actions"]:
+            counts[bucket["action"]] += bucket["count"]
+        assert counts == {"FILE_READ": 11, "COMMAND_RUN": 10, "DECISION_MADE": 2}, source
+        assert data["commands"] == [{"command": "ls", "count": 10}]
+
+
+def test_invalid_audit_policies_are_rejected():
+    """Test that policy typos fail at startup instead of on every audit write."""
+    for policy in ({"mode": "sampel"}, {"mode": "sample", "evrey": 5}, {"mode": "sample", "every": 0}):
+        with pytest.raises(ValidationError):
+            Settings(audit_action_policies={"COMMAND_RUN": policy})
+    assert Settings(audit_action_policies={"COMMAND_RUN": {"mode": "sample", "every": 5}})
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_are_offloaded_and_deduplicated(
+    async_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Test that oversized payloads become stubs whose content is fetched by hash."""
+    monkeypatch.setattr(get_settings(), "audit_payload_offload_bytes", 1000)
+
+    output = "line of build output\n" * 500
+    for _ in range(2):
+        await log_audit_event(
+            db_session, AuditAction.COMMAND_RUN, "Built", agent_id="a1",
+            command="make " + "x" * 2000, extra_data={"output": output},
+        )
+    await log_audit_event(db_session, AuditAction.COMMAND_RUN, "Small", command="ls", extra_data={"ok": True})
+    assert await db_session.scalar(select(func.count()).select_from(AuditBlob)) == 2
+
+    entries = (await async_client.get("/audit", params={"agent_id": "a1"})).json()
+    assert len(entries) == 2
+    stubs = entries[0]["offloaded"]
+    assert entries[0]["command"] == ("make " + "x" * 2000)[:200]
+    assert stubs["command"]["size"] == 2005
+    assert entries[1]["offloaded"] == stubs
+
+    response = await async_client.get(f"/audit/blobs/{stubs['extra_data']['hash']}")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"output": output}
+    assert (await async_client.get(f"/audit/blobs/{stubs['command']['hash']}")).text == "make " + "x" * 2000
+    assert (await async_client.get("/audit/blobs/missing")).status_code == 404
+
+    small = (await async_client.get("/audit", params={"fields": "command,extra_data,offloaded"})).json()
+    small = [e for e in small if e["command"] == "ls"]
+    assert small[0]["extra_data"] == {"ok": True} and small[0]["offloaded"] is None
+
+
+@pytest.mark.asyncio
+async def test_sampled_entries_keep_their_count_when_offloaded(
+    async_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Test that offloading a sampled entry's payload keeps the events it stands for."""
+    monkeypatch.setattr(get_settings(), "audit_action_policies", {"COMMAND_RUN": {"mode": "sample", "every": 10}})
+    monkeypatch.setattr(get_settings(), "audit_payload_offload_bytes", 1000)
+
+    for _ in range(10):
+        await log_audit_event(db_session, AuditAction.COMMAND_RUN, "Built", agent_id="a1",
+                              command="make", extra_data={"output": "line of build output\n" * 500})
+    await db_session.commit()
+
+    (entry,) = (await async_client.get("/audit", params={"fields": "event_count,extra_data,offloaded"})).json()
+    assert entry["event_count"] == 10
+    assert "extra_data" in entry["offloaded"]
+
+    now = datetime.utcnow()
+    for source in ("raw", "rollup"):
+        data = (await async_client.get("/audit/stats", params={
+            "since": (now - timedelta(hours=1)).isoformat(), "until": (now + timedelta(minutes=1)).isoformat(),
+            "source": source, "bucket": "day",
+        })).json()
+        assert sum(bucket["count"] for bucket in data["actions"]) == 10, source
+
+
+@pytest.mark.asyncio
+async def test_recent_activity_is_served_from_memory(
+    async_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Test that recent entries come from the buffer and follow commits only."""
+    monkeypatch.setattr(get_settings(), "audit_recent_buffer_size", 3)
+    monkeypatch.setattr(get_settings(), "audit_agent_buffer_size", 2)
+    now = datetime.utcnow()
+
+    def entry(entry_id: str, agent_id: str, seconds_ago: int) -> AuditLog:
+        return AuditLog(id=entry_id, action=AuditAction.FILE_READ, description=entry_id,
+                        agent_id=agent_id, created_at=now - timedelta(seconds=seconds_ago))
+
+    db_session.add_all([entry("e1", "a1", 50), entry("e2", "a2", 40), entry("e3", "a1", 30), entry("e4", "a1", 20)])
+    await db_session.commit()
+    await recent_audit.load(db_session)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", listener)
+    try:
+        recent = (await async_client.get("/audit/recent", params={"limit": 3})).json()
+        agent = (await async_client.get("/audit/agent/a1", params={"limit": 2})).json()
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", listener)
+    assert [e["id"] for e in recent] == ["e4", "e3", "e2"]
+    assert [e["id"] for e in agent] == ["e4", "e3"]
+    assert statements == []
+
+    # Rolled back entries never show up; late commits land in created_at order
+    db_session.add(entry("ghost", "a2", 0))
+    await db_session.flush()
+    await db_session.rollback()
+    db_session.add_all([entry("e5", "a2", 10), entry("late", "a2", 35)])
+    await db_session.commit()
+    recent = (await async_client.get("/audit/recent", params={"limit": 3})).json()
+    assert [e["id"] for e in recent] == ["e5", "e4", "e3"]
+    agent = (await async_client.get("/audit/agent/a2", params={"limit": 2})).json()
+    assert [e["id"] for e in agent] == ["e5", "late"]
+    assert (await async_client.get("/audit/agent/nobody", params={"limit": 2})).json() == []
+
+    # Limits beyond the buffers are read from the database
+    recent = (await async_client.get("/audit/recent", params={"limit": 10})).json()
+    assert [e["id"] for e in recent] == ["e5", "e4", "e3", "late", "e2", "e1"]
+    agent = (await async_client.get("/audit/agent/a1", params={"limit": 10})).json()
+    assert [e["id"] for e in agent] == ["e4", "e3", "e1"]
+
+
+def test_rollup_hook_is_installed_explicitly():
+    """Test that the rollup hook is registered by install_session_hooks."""
+    install_session_hooks()
+    assert event.contains(Session, "after_flush", audit_stats._after_flush)
@@ -0,0 +1,194 @@
+"""Tests for build phase initialization and background build jobs."""
+import stat
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import get_settings
+from src.services.build_jobs import build_jobs
+
+
+@pytest.fixture(autouse=True)
+def reset_build_jobs(db_session):
+    """Run build jobs against the test database and forget them afterwards."""
+    session_factory = build_jobs._session_factory
+    build_jobs._session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    build_jobs.clear()
+    yield
+    build_jobs.clear()
+    build_jobs._session_factory = session_factory
+
+
+@pytest.fixture
+def gh_stub(tmp_path, monkeypatch):
+    """Point the gh binary at a local script; returns a function to write its body."""
+    script = tmp_path / "gh"
+
+    def write(body: str):
+        script.write_text(f"#!/bin/sh\n{body}\n")
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    write("echo https://github.com/factory/$3")
+    monkeypatch.setattr(get_settings(), "gh_binary", str(script))
+    return write
+
+
+async def create_project(async_client: AsyncClient) -> str:
+    response = await async_client.post("/projects", json={"name": "Build Project"})
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_build_init_runs_repo_creation_in_background(async_client: AsyncClient, db_session, gh_stub):
+    """Test that /build/init returns a job and the job records the repo."""
+    project_id = await create_project(async_client)
+
+    response = await async_client.post(
+        "/build/init",
+        json={"project_id": project_id, "create_github_repo": True, "github_repo_name": "My App"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["phase"] == "build"
+    assert data["job_status"] in ("queued", "running")
+    assert data["github_repo_url"] is None
+
+    await db_session.commit()
+    await build_jobs.wait(data["job_id"])
+    job = (await async_client.get(f"/build/jobs/{data['job_id']}")).json()
+    assert job["status"] == "completed"
+    assert job["github_repo_url"] == "https://github.com/factory/my-app"
+
+    status = (await async_client.get(f"/build/status/{project_id}")).json()
+    assert status["github_repo_url"] == "https://github.com/factory/my-app"
+
+
+@pytest.mark.asyncio
+async def test_build_job_failure_is_reported(async_client: AsyncClient, db_session, gh_stub):
+    """Test that a failing gh command marks the job failed with its error."""
+    gh_stub("echo 'not logged in' >&2; exit 1")
+    project_id = await create_project(async_client)
+
+    data = (await async_client.post(
+        "/build/init",
+        json={"project_id": project_id, "create_github_repo": True, "github_repo_name": "broken"}
+    )).json()
+    await db_session.commit()
+    await build_jobs.wait(data["job_id"])
+
+    job = (await async_client.get(f"/build/jobs/{data['job_id']}")).json()
+    assert job["status"] == "failed"
+    assert job["error"] == "not logged in"
+    assert [j["job_id"] for j in (await async_client.get(
+        "/build/jobs", params={"project_id": project_id}
+    )).json()] == [data["job_id"]]
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_build_init_never_runs_gh(async_client: AsyncClient, db_session, gh_stub, tmp_path):
+    """Test that repo creation waits for the commit and is skipped on rollback."""
+    ran = tmp_path / "ran"
+    gh_stub(f"touch {ran}")
+    project_id = await create_project(async_client)
+    await db_session.commit()
+
+    data = (await async_client.post(
+        "/build/init",
+        json={"project_id": project_id, "create_github_repo": True, "github_repo_name": "ghost"}
+    )).json()
+    assert data["job_status"] == "queued"
+    await db_session.rollback()
+    await build_jobs.wait(data["job_id"])
+
+    job = (await async_client.get(f"/build/jobs/{data['job_id']}")).json()
+    assert job["status"] == "failed"
+    assert job["error"] == "Build initialization was not committed"
+    assert not ran.exists()
+
+
+@pytest.mark.asyncio
+async def test_build_init_without_repo_has_no_job(async_client: AsyncClient):
+    """Test that skipping repo creation completes without a job."""
+    project_id = await create_project(async_client)
+
+    data = (await async_client.post("/build/init", json={"project_id": project_id})).json()
+    assert data["job_id"] is None
+    assert (await async_client.get("/build/jobs/missing")).status_code == 404
+
+
+def requirement(ref: str, title: str = "Login") -> dict:
+    return {
+        "id": ref, "type": "feature", "title": title, "description": "",
+        "priority": "must", "status": "draft",
+    }
+
+
+@pytest.mark.asyncio
+async def test_build_init_stores_design_artifacts_in_tables(async_client: AsyncClient):
+    """Test that requirements and tech decisions are stored outside the project config."""
+    project_id = await create_project(async_client)
+    await async_client.post("/build/init", json={
+        "project_id": project_id,
+        "requirements": [requirement("r1"), requirement("r2", "Search")],
+        "tech_stack": [{
+            "id": "t1", "category": "backend", "choice": "FastAPI",
+            "reasoning": "async", "status": "confirmed",
+        }],
+        "notes": "MVP",
+    })
+
+    project = (await async_client.get(f"/projects/{project_id}")).json()
+    assert project["config"] == {"design": {"notes": "MVP"}, "phase": "build"}
+
+    status = (await async_client.get(f"/build/status/{project_id}")).json()
+    assert status["phase"] == "build"
+    assert status["requirement_count"] == 2
+    assert status["tech_decision_count"] == 1
+    assert status["has_tech_stack"] is True
+
+    requirements = (await async_client.get(f"/build/{project_id}/requirements")).json()
+    assert [r["id"] for r in requirements] == ["r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_requirement_updates(async_client: AsyncClient):
+    """Test adding, editing and removing single requirements."""
+    project_id = await create_project(async_client)
+
+    response = await async_client.post(f"/build/{project_id}/requirements", json=requirement("r1"))
+    assert response.status_code == 200
+    duplicate = await async_client.post(f"/build/{project_id}/requirements", json=requirement("r1"))
+    assert duplicate.status_code == 409
+
+    updated = await async_client.patch(
+        f"/build/{project_id}/requirements/r1", json={"status": "confirmed"}
+    )
+    assert updated.json()["status"] == "confirmed"
+    assert updated.json()["title"] == "Login"
+
+    assert (await async_client.delete(f"/build/{project_id}/requirements/r1")).status_code == 200
+    assert (await async_client.patch(
+        f"/build/{project_id}/requirements/r1", json={"status": "draft"}
+    )).status_code == 404
+    status = (await async_client.get(f"/build/status/{project_id}")).json()
+    assert status["phase"] == "design"
+    assert status["has_requirements"] is False
+
+
+@pytest.mark.asyncio
+async def test_legacy_design_config_is_migrated(async_client: AsyncClient, db_session):
+    """Test that design blobs in project config are moved into the tables."""
+    from src.services.design_artifacts import migrate_design_config
+    response = await async_client.post("/projects", json={
+        "name": "Legacy",
+        "config": {"phase": "build", "design": {"requirements": [requirement("r1")], "notes": "old"}},
+    })
+    project_id = response.json()["id"]
+
+    assert await migrate_design_config(db_session) == 1
+    assert await migrate_design_config(db_session) == 0
+
+    project = (await async_client.get(f"/projects/{project_id}")).json()
+    assert project["config"]["design"] == {"notes": "old"}
+    status = (await async_client.get(f"/build/status/{project_id}")).json()
+    assert status["requirement_count"] == 1
@@ -0,0 +1,66 @@
+"""Tests for the dashboard aggregate endpoint."""
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from httpx import AsyncClient
+
+from src.services.dashboard import dashboard_service
+
+
+@pytest.fixture(autouse=True)
+def dashboard_on_test_session(db_session):
+    """Run dashboard queries on the test session, one at a time."""
+    lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def shared_session():
+        async with lock:
+            yield db_session
+
+    session_factory = dashboard_service._session_factory
+    dashboard_service._session_factory = shared_session
+    dashboard_service.invalidate()
+    yield
+    dashboard_service.invalidate()
+    dashboard_service._session_factory = session_factory
+
+
+@pytest.mark.asyncio
+async def test_dashboard_aggregates_panels(async_client: AsyncClient):
+    """Test that one request returns every dashboard panel."""
+    project = (await async_client.post(
+        "/projects", json={"name": "Dashboard Project", "daily_token_budget": 1000}
+    )).json()
+    await async_client.post("/agents", json={"name": "Dash Agent", "runner_id": "runner-1"})
+    task = (await async_client.post("/tasks", json={"title": "T", "project_id": project["id"]})).json()
+    await async_client.post("/tasks", json={"title": "U", "project_id": project["id"]})
+    runplan = (await async_client.post(
+        "/runplans", json={"task_id": task["id"], "skill_name": "implement", "inputs": {"big": "x"}}
+    )).json()
+    await async_client.post(f"/runplans/{runplan['id']}/start")
+
+    response = await async_client.get("/dashboard")
+    assert response.status_code == 200
+    data = response.json()
+    assert [a["name"] for a in data["active_agents"]] == ["Dash Agent"]
+    assert [r["id"] for r in data["running_runplans"]] == [runplan["id"]]
+    assert "inputs" not in data["running_runplans"][0]
+    assert data["task_counts"] == {project["id"]: {"PENDING": 2}}
+    [costs] = data["cost_summaries"]
+    assert costs["project_id"] == project["id"]
+    assert costs["budget_remaining_today"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_dashboard_is_cached(async_client: AsyncClient):
+    """Test that the payload is reused until the TTL expires."""
+    first = (await async_client.get("/dashboard")).json()
+    await async_client.post("/agents", json={"name": "Late Agent", "runner_id": "runner-1"})
+
+    cached = (await async_client.get("/dashboard")).json()
+    assert cached["generated_at"] == first["generated_at"]
+    assert cached["active_agents"] == []
+
+    dashboard_service.invalidate()
+    fresh = (await async_client.get("/dashboard")).json()
+    assert [a["name"] for a in fresh["active_agents"]] == ["Late Agent"]
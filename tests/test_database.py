@@ -0,0 +1,62 @@
+"""Tests for shared column types."""
+import uuid
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BinaryExpression
+
+from src.database import AUDIT_LOG_COLUMNS, GUID, Base, migrate_audit_log_columns
+from src.models.audit import AuditLog
+from src.services.search_index import SOURCE_TYPES, unindexed_rows
+
+
+def test_guid_binds_uuids_natively_on_postgres_only():
+    """Test that GUID normalizes ids on Postgres and leaves other databases alone."""
+    guid = GUID()
+    value = str(uuid.uuid4())
+    pg, lite = postgresql.dialect(), sqlite.dialect()
+
+    assert isinstance(guid.load_dialect_impl(pg), postgresql.UUID)
+    assert guid.process_bind_param(value.upper(), pg) == value
+    assert guid.process_bind_param("missing", pg) == str(uuid.UUID(int=0))
+    assert guid.process_bind_param("missing", lite) == "missing"
+    assert guid.process_result_value(uuid.UUID(value), pg) == value
+
+
+def test_search_backfill_compares_matching_types_on_postgres():
+    """Test that the backfill never compares a uuid column with a varchar one."""
+    pg = postgresql.dialect()
+    for model, source_type in SOURCE_TYPES.items():
+        statement = unindexed_rows(model, source_type)
+        assert "NOT IN" in str(statement.compile(dialect=pg))
+        for element in visitors.iterate(statement):
+            if isinstance(element, BinaryExpression):
+                left, right = element.left.type.dialect_impl(pg), element.right.type.dialect_impl(pg)
+                assert type(left) is type(right), f"{model.__name__}: {left!r} vs {right!r}"
+
+
+@pytest.mark.asyncio
+async def test_audit_log_columns_are_added_to_existing_tables():
+    """Test that an audit_logs table from before the new columns can be read after migrating."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for name in AUDIT_LOG_COLUMNS:
+                await conn.execute(text(f"ALTER TABLE audit_logs DROP COLUMN {name}"))
+            await conn.execute(text(
+                "INSERT INTO audit_logs (id, action, description, success, created_at) "
+                "VALUES ('old', 'FILE_READ', 'Old read', 1, '2026-01-10 00:00:00')"
+            ))
+
+            assert await migrate_audit_log_columns(conn) == list(AUDIT_LOG_COLUMNS)
+            assert await migrate_audit_log_columns(conn) == []
+
+        async with AsyncSession(engine) as db:
+            (entry,) = (await db.execute(select(AuditLog))).scalars()
+            assert entry.event_count == 1
+            assert entry.offloaded is None
+    finally:
+        await engine.dispose()
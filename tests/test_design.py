@@ -0,0 +1,178 @@
+"""Tests for design requests routed through MCP."""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+
+from src.services.design_requests import design_requests
+
+
+async def submit(async_client: AsyncClient, message: str = "Suggest a stack") -> str:
+    response = await async_client.post(
+        "/mcp/design", json={"message": message, "project_id": "project-1"}
+    )
+    assert response.status_code == 200
+    return response.json()["request_id"]
+
+
+@pytest.mark.asyncio
+async def test_design_request_round_trip(async_client: AsyncClient):
+    """Test submitting, listing and responding to a design request."""
+    request_id = await submit(async_client)
+
+    pending = (await async_client.get("/mcp/design")).json()
+    assert [r["request_id"] for r in pending["pending_requests"]] == [request_id]
+
+    response = await async_client.post(
+        "/mcp/design/respond",
+        json={"request_id": request_id, "agent_id": "agent-1", "response": "Use FastAPI"}
+    )
+    assert response.status_code == 200
+
+    status = (await async_client.get(f"/mcp/design/{request_id}")).json()
+    assert status["status"] == "completed"
+    assert status["response"] == "Use FastAPI"
+    assert (await async_client.get("/mcp/design")).json()["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pending_request_times_out(async_client: AsyncClient):
+    """Test that an unanswered request moves to timeout and rejects late answers."""
+    request_id = await submit(async_client)
+
+    design_requests.sweep(now=datetime.utcnow() + timedelta(hours=1, seconds=-1))
+
+    status = (await async_client.get(f"/mcp/design/{request_id}")).json()
+    assert status["status"] == "timeout"
+    response = await async_client.post(
+        "/mcp/design/respond",
+        json={"request_id": request_id, "agent_id": "agent-1", "response": "Too late"}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_finished_requests_are_evicted_after_ttl(async_client: AsyncClient):
+    """Test that completed requests are dropped once their TTL expires."""
+    request_id = await submit(async_client)
+    await async_client.post(
+        "/mcp/design/respond",
+        json={"request_id": request_id, "agent_id": "agent-1", "response": "Done"}
+    )
+
+    design_requests.sweep(now=datetime.utcnow() + timedelta(days=1))
+
+    assert len(design_requests) == 0
+    response = await async_client.get(f"/mcp/design/{request_id}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_when_agent_responds(async_client: AsyncClient):
+    """Test that ?wait= holds the request until the response arrives."""
+    request_id = await submit(async_client)
+
+    async def respond_later():
+        await asyncio.sleep(0.05)
+        await async_client.post(
+            "/mcp/design/respond",
+            json={"request_id": request_id, "agent_id": "agent-1", "response": "Ready"}
+        )
+
+    waited, _ = await asyncio.gather(
+        async_client.get(f"/mcp/design/{request_id}", params={"wait": 5}),
+        respond_later(),
+    )
+    assert waited.json()["status"] == "completed"
+    assert waited.json()["response"] == "Ready"
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_with_pending_status(async_client: AsyncClient):
+    """Test that an unanswered wait returns the still-pending request."""
+    request_id = await submit(async_client)
+
+    response = await async_client.get(f"/mcp/design/{request_id}", params={"wait": 0.05})
+    assert response.json()["status"] == "pending"
+
+
+@pytest.mark.asyncio
+async def test_stream_relays_partial_responses(async_client: AsyncClient):
+    """Test that the SSE stream relays chunks and ends on completion."""
+    request_id = await submit(async_client)
+
+    async def agent():
+        await asyncio.sleep(0.05)
+        await async_client.post(
+            f"/mcp/design/{request_id}/partial", json={"agent_id": "agent-1", "chunk": "Use "}
+        )
+        await async_client.post(
+            "/mcp/design/respond",
+            json={"request_id": request_id, "agent_id": "agent-1", "response": "Use FastAPI"}
+        )
+
+    stream, _ = await asyncio.gather(
+        async_client.get(f"/mcp/design/{request_id}/stream", params={"timeout": 5}),
+        agent(),
+    )
+    events = [line[len("event: "):] for line in stream.text.splitlines() if line.startswith("event: ")]
+    assert events == ["partial", "completed"]
+    assert '"chunk": "Use "' in stream.text
+
+
+@pytest.mark.asyncio
+async def test_claim_is_exclusive(async_client: AsyncClient):
+    """Test that only the claiming agent can answer a claimed request."""
+    request_id = await submit(async_client)
+
+    claim = await async_client.post(f"/mcp/design/{request_id}/claim", json={"agent_id": "agent-1"})
+    assert claim.status_code == 200
+    assert claim.json()["status"] == "processing"
+
+    rival = await async_client.post(f"/mcp/design/{request_id}/claim", json={"agent_id": "agent-2"})
+    assert rival.status_code == 409
+    response = await async_client.post(
+        "/mcp/design/respond",
+        json={"request_id": request_id, "agent_id": "agent-2", "response": "Me too"}
+    )
+    assert response.status_code == 409
+
+    assert (await async_client.get("/mcp/design")).json()["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_claim_returns_request_to_pending(async_client: AsyncClient):
+    """Test that a lapsed lease lets another agent pick the request up."""
+    request_id = await submit(async_client)
+    await async_client.post(f"/mcp/design/{request_id}/claim", json={"agent_id": "agent-1"})
+
+    design_requests.sweep(now=datetime.utcnow() + timedelta(seconds=121))
+
+    assert (await async_client.get("/mcp/design")).json()["count"] == 1
+    claim = await async_client.post(f"/mcp/design/{request_id}/claim", json={"agent_id": "agent-2"})
+    assert claim.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_deduplicated(async_client: AsyncClient):
+    """Test that identical submissions coalesce and then hit the response cache."""
+    first = await submit(async_client)
+
+    in_flight = (await async_client.post(
+        "/mcp/design", json={"message": "Suggest a stack", "project_id": "project-1"}
+    )).json()
+    assert in_flight["request_id"] == first
+    assert in_flight["deduplicated"] is True
+
+    await async_client.post(
+        "/mcp/design/respond",
+        json={"request_id": first, "agent_id": "agent-1", "response": "Use FastAPI"}
+    )
+    cached = (await async_client.post(
+        "/mcp/design", json={"message": "Suggest a stack", "project_id": "project-1"}
+    )).json()
+    assert cached["status"] == "completed"
+    assert cached["response"] == "Use FastAPI"
+
+    other = await submit(async_client, message="Something else")
+    assert other != first
@@ -0,0 +1,96 @@
+"""Tests for ETags from version counters."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def requirement(ref: str) -> dict:
+    return {
+        "id": ref, "type": "feature", "title": ref, "description": "", "priority": "must", "status": "draft",
+    }
+
+
+@pytest.mark.asyncio
+async def test_unchanged_list_is_not_modified(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that If-None-Match gets a 304 until a write commits."""
+    await async_client.post("/projects", json={"name": "Tagged"})
+    await db_session.commit()
+
+    first = await async_client.get("/projects")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", listener)
+    try:
+        response = await async_client.get("/projects", headers={"If-None-Match": etag})
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", listener)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert statements == []
+
+    # Rolled back writes keep the tag
+    await async_client.post("/projects", json={"name": "Ghost"})
+    await db_session.rollback()
+    assert (await async_client.get("/projects", headers={"If-None-Match": etag})).status_code == 304
+
+    await async_client.post("/projects", json={"name": "Second"})
+    await db_session.commit()
+    response = await async_client.get("/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_updates_change_the_tag(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that ORM bulk UPDATE statements bump their table."""
+    project = (await async_client.post("/projects", json={"name": "Runs"})).json()
+    task = (await async_client.post("/tasks", json={"title": "Run", "project_id": project["id"]})).json()
+    runplan = (await async_client.post(
+        "/runplans", json={"task_id": task["id"], "skill_name": "build", "inputs": {}},
+    )).json()
+    await async_client.post(f"/runplans/{runplan['id']}/start")
+    await db_session.commit()
+    etag = (await async_client.get("/runplans/active")).headers["etag"]
+
+    # Step events advance the RunPlan with a bulk UPDATE
+    await async_client.post(f"/runplans/{runplan['id']}/steps", json={"step_index": 1, "tokens_used": 5})
+    await db_session.commit()
+    response = await async_client.get("/runplans/active", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["tokens_used"] == 5
+
+
+@pytest.mark.asyncio
+async def test_live_agent_changes_change_the_tag(async_client: AsyncClient):
+    """Test that registry changes, which are not committed yet, bump agents."""
+    agent = (await async_client.post("/agents", json={"name": "Tagged Agent", "runner_id": "runner-1"})).json()
+    etag = (await async_client.get("/agents")).headers["etag"]
+    assert (await async_client.get("/agents", headers={"If-None-Match": etag})).status_code == 304
+
+    await async_client.post(f"/agents/{agent['id']}/heartbeat")
+    assert (await async_client.get("/agents", headers={"If-None-Match": etag})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_build_status_tag_is_per_project(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that writes to another project leave a project's tag alone."""
+    mine = (await async_client.post("/projects", json={"name": "Mine"})).json()
+    other = (await async_client.post("/projects", json={"name": "Other"})).json()
+    await db_session.commit()
+    etag = (await async_client.get(f"/build/status/{mine['id']}")).headers["etag"]
+
+    await async_client.post(f"/build/{other['id']}/requirements", json=requirement("r1"))
+    await db_session.commit()
+    assert (await async_client.get(f"/build/status/{mine['id']}", headers={"If-None-Match": etag})).status_code == 304
+
+    await async_client.post(f"/build/{mine['id']}/requirements", json=requirement("r1"))
+    await db_session.commit()
+    response = await async_client.get(f"/build/status/{mine['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["requirement_count"] == 1
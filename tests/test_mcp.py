@@ -2,16 +2,18 @@
 import pytest
 from httpx import AsyncClient
 
-# Import the in-memory store to reset between tests
-from src.routes.mcp import _registered_agents
+from src.schemas.mcp import MessagePriority
+from src.services.agent_registry import agent_registry
+from src.services.inbox import agent_inbox, InboxStore, MemoryInboxStore, DatabaseInboxStore
+from src.websocket.manager import connection_manager
 
 
 @pytest.fixture(autouse=True)
-def reset_registered_agents():
-    """Clear registered agents before each test."""
-    _registered_agents.clear()
+def reset_inboxes():
+    """Give each test empty in-memory inboxes."""
+    agent_inbox.store = MemoryInboxStore()
     yield
-    _registered_agents.clear()
+    agent_inbox.store = MemoryInboxStore()
 
 
 @pytest.mark.asyncio
@@ -183,3 +185,252 @@ async def test_broadcast_message_no_agents(async_client: AsyncClient):
         json={"message": "Hello nobody"}
     )
     assert response.status_code == 400
+
+
+@pytest.fixture
+def connections(make_websocket):
+    """Register a dashboard and two agent-bound fake connections."""
+    dashboard, agent_1, agent_2 = make_websocket(), make_websocket(), make_websocket()
+    for ws in (dashboard, agent_1, agent_2):
+        connection_manager.active_connections.append(ws)
+    connection_manager.bind_agent("agent-1", agent_1)
+    connection_manager.bind_agent("agent-2", agent_2)
+    yield dashboard, agent_1, agent_2
+    for ws in (dashboard, agent_1, agent_2):
+        connection_manager.disconnect(ws)
+
+
+@pytest.mark.asyncio
+async def test_directed_message_only_reaches_target(async_client: AsyncClient, connections):
+    """Test that a directed message is routed only to the target's connection."""
+    dashboard, agent_1, agent_2 = connections
+    await async_client.post("/mcp/register", json={"agent_id": "agent-1"})
+
+    await async_client.post(
+        "/mcp/message", json={"target_agent": "agent-1", "message": "Just for you"}
+    )
+
+    assert [m["payload"]["message"] for m in agent_1.sent] == ["Just for you"]
+    assert agent_2.sent == []
+    assert dashboard.sent == []
+
+
+@pytest.mark.asyncio
+async def test_broadcast_skips_dashboards(async_client: AsyncClient, connections):
+    """Test that agent broadcasts reach agent connections only."""
+    dashboard, agent_1, agent_2 = connections
+    await async_client.post("/mcp/register", json={"agent_id": "agent-1"})
+    await async_client.post("/mcp/register", json={"agent_id": "agent-2"})
+
+    await async_client.post("/mcp/broadcast", json={"message": "All agents"})
+
+    assert len(agent_1.sent) == 1
+    assert len(agent_2.sent) == 1
+    assert dashboard.sent == []
+
+
+@pytest.mark.asyncio
+async def test_message_to_offline_agent_is_kept_until_acked(async_client: AsyncClient):
+    """Test that messages wait in the inbox and disappear once acknowledged."""
+    await async_client.post("/mcp/register", json={"agent_id": "offline-agent"})
+    sent = (await async_client.post(
+        "/mcp/message", json={"target_agent": "offline-agent", "message": "Later"}
+    )).json()
+
+    response = await async_client.get("/mcp/inbox/offline-agent")
+    assert response.status_code == 200
+    messages = response.json()["messages"]
+    assert [m["message_id"] for m in messages] == [sent["message_id"]]
+
+    ack = await async_client.post(
+        "/mcp/inbox/offline-agent/ack", json={"message_ids": [sent["message_id"]]}
+    )
+    assert ack.json()["acked"] == 1
+    assert await agent_inbox.store.size("offline-agent") == 0
+
+
+@pytest.mark.asyncio
+async def test_inbox_delivers_urgent_first(async_client: AsyncClient):
+    """Test that fetches return higher priority messages first."""
+    await async_client.post("/mcp/register", json={"agent_id": "busy-agent"})
+    for message, priority in [("low", "low"), ("urgent", "urgent"), ("normal", "normal")]:
+        await async_client.post(
+            "/mcp/message",
+            json={"target_agent": "busy-agent", "message": message, "priority": priority}
+        )
+
+    messages = (await async_client.get("/mcp/inbox/busy-agent")).json()["messages"]
+    assert [m["message"] for m in messages] == ["urgent", "normal", "low"]
+
+
+@pytest.mark.asyncio
+async def test_full_inbox_evicts_lower_priority(async_client: AsyncClient, monkeypatch):
+    """Test that a full inbox drops low priority messages, then rejects."""
+    from src.config import get_settings
+    monkeypatch.setattr(get_settings(), "mcp_inbox_max_size", 1)
+    await async_client.post("/mcp/register", json={"agent_id": "small-agent"})
+
+    await async_client.post(
+        "/mcp/message", json={"target_agent": "small-agent", "message": "a", "priority": "low"}
+    )
+    response = await async_client.post(
+        "/mcp/message", json={"target_agent": "small-agent", "message": "b", "priority": "high"}
+    )
+    assert response.status_code == 200
+    response = await async_client.post(
+        "/mcp/message", json={"target_agent": "small-agent", "message": "c", "priority": "normal"}
+    )
+    assert response.status_code == 429
+
+    messages = (await async_client.get("/mcp/inbox/small-agent")).json()["messages"]
+    assert [m["message"] for m in messages] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_queued_messages_delivered_on_connect(async_client: AsyncClient, make_websocket):
+    """Test that an agent receives its backlog when it binds a connection."""
+    await async_client.post("/mcp/register", json={"agent_id": "late-agent"})
+    await async_client.post(
+        "/mcp/message", json={"target_agent": "late-agent", "message": "Missed you"}
+    )
+
+    ws = make_websocket()
+    connection_manager.bind_agent("late-agent", ws)
+    try:
+        assert await agent_inbox.deliver("late-agent") == 1
+    finally:
+        connection_manager.disconnect(ws)
+    assert [m["payload"]["message"] for m in ws.sent] == ["Missed you"]
+
+
+@pytest.mark.asyncio
+async def test_unacked_message_redelivered_after_lease():
+    """Test that a leased message becomes ready again after its lease expires."""
+    from datetime import datetime, timedelta
+    store = MemoryInboxStore()
+    message = agent_inbox.new_message("agent-x", "retry me", MessagePriority.NORMAL, "request")
+    await store.push(message, max_size=10)
+
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=30)
+    assert len(await store.lease("agent-x", 10, now, lease_until)) == 1
+    assert await store.lease("agent-x", 10, now, lease_until) == []
+
+    redelivered = await store.lease("agent-x", 10, lease_until, lease_until + timedelta(seconds=30))
+    assert [m.attempts for m in redelivered] == [2]
+
+
+def test_incomplete_inbox_store_cannot_be_created():
+    """Test that a store missing part of the interface fails on creation."""
+    class PushOnlyStore(InboxStore):
+        async def push(self, message, max_size):
+            return None
+
+    with pytest.raises(TypeError):
+        PushOnlyStore()
+
+
+@pytest.mark.asyncio
+async def test_database_inbox_store(db_session):
+    """Test the database-backed inbox store."""
+    from datetime import datetime, timedelta
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    store = DatabaseInboxStore(session_factory=async_sessionmaker(db_session.bind))
+    low = agent_inbox.new_message("db-agent", "low", MessagePriority.LOW, "notification")
+    urgent = agent_inbox.new_message("db-agent", "urgent", MessagePriority.URGENT, "notification")
+    await store.push(low, max_size=10)
+    await store.push(urgent, max_size=10)
+
+    now = datetime.utcnow()
+    leased = await store.lease("db-agent", 10, now, now + timedelta(seconds=30))
+    assert [m.message for m in leased] == ["urgent", "low"]
+
+    assert await store.ack("db-agent", [urgent.message_id]) == 1
+    assert await store.size("db-agent") == 1
+
+
+@pytest.mark.asyncio
+async def test_list_agents_by_capability(async_client: AsyncClient):
+    """Test filtering agents by capability and listing the capability index."""
+    await async_client.post("/mcp/register", json={"agent_id": "coder", "capabilities": ["code"]})
+    await async_client.post("/mcp/register", json={"agent_id": "designer", "capabilities": ["design", "code"]})
+
+    response = await async_client.get("/mcp/agents", params={"capability": "design"})
+    assert [a["agent_id"] for a in response.json()] == ["designer"]
+
+    # Re-registering replaces the agent's capabilities in the index
+    await async_client.post("/mcp/register", json={"agent_id": "designer", "capabilities": ["design"]})
+    capabilities = (await async_client.get("/mcp/capabilities")).json()
+    assert capabilities == {"code": ["coder"], "design": ["designer"]}
+
+
+@pytest.mark.asyncio
+async def test_route_message_to_least_loaded_agent(async_client: AsyncClient):
+    """Test that capability routing prefers the agent with the least in-flight work."""
+    await async_client.post("/mcp/register", json={"agent_id": "worker-1", "capabilities": ["build"]})
+    await async_client.post("/mcp/register", json={"agent_id": "worker-2", "capabilities": ["build"]})
+
+    targets = []
+    for i in range(4):
+        response = await async_client.post("/mcp/route", json={"capability": "build", "message": f"job {i}"})
+        assert response.status_code == 200
+        targets.append(response.json()["delivered_to"])
+    assert sorted(targets) == ["worker-1", "worker-1", "worker-2", "worker-2"]
+
+    # Acknowledging work frees the agent up for the next message
+    messages = (await async_client.get("/mcp/inbox/worker-2")).json()["messages"]
+    await async_client.post(
+        "/mcp/inbox/worker-2/ack", json={"message_ids": [m["message_id"] for m in messages]}
+    )
+    assert agent_registry.get("worker-2").in_flight == 0
+    response = await async_client.post("/mcp/route", json={"capability": "build", "message": "next"})
+    assert response.json()["delivered_to"] == "worker-2"
+
+
+@pytest.mark.asyncio
+async def test_route_message_round_robin(async_client: AsyncClient):
+    """Test round-robin capability routing and the no-capable-agent error."""
+    for agent_id in ("rr-a", "rr-b"):
+        await async_client.post("/mcp/register", json={"agent_id": agent_id, "capabilities": ["review"]})
+
+    targets = [
+        (await async_client.post(
+            "/mcp/route",
+            json={"capability": "review", "message": "pr", "strategy": "round_robin"}
+        )).json()["delivered_to"]
+        for _ in range(3)
+    ]
+    assert targets == ["rr-a", "rr-b", "rr-a"]
+
+    response = await async_client.post("/mcp/route", json={"capability": "deploy", "message": "x"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_design_request_sent_to_design_agents(async_client: AsyncClient, connections):
+    """Test that design requests go only to agents with the design capability."""
+    dashboard, agent_1, agent_2 = connections
+    await async_client.post("/mcp/register", json={"agent_id": "agent-1", "capabilities": ["design"]})
+    await async_client.post("/mcp/register", json={"agent_id": "agent-2", "capabilities": ["code"]})
+
+    await async_client.post("/mcp/design", json={"message": "Pick a database", "project_id": "p-1"})
+
+    assert [m["type"] for m in agent_1.sent] == ["DESIGN_REQUEST"]
+    assert agent_2.sent == []
+    assert dashboard.sent == []
+
+
+@pytest.mark.asyncio
+async def test_design_request_without_design_agent_stays_pending(async_client: AsyncClient, connections):
+    """Test that with no design agent connected the request is queued, not broadcast."""
+    dashboard, agent_1, agent_2 = connections
+    await async_client.post("/mcp/register", json={"agent_id": "agent-1", "capabilities": ["code"]})
+
+    submitted = (await async_client.post(
+        "/mcp/design", json={"message": "Pick a queue", "project_id": "p-1"}
+    )).json()
+
+    assert submitted["status"] == "pending"
+    assert dashboard.sent == agent_1.sent == agent_2.sent == []
+    pending = (await async_client.get("/mcp/design")).json()
+    assert [r["request_id"] for r in pending["pending_requests"]] == [submitted["request_id"]]
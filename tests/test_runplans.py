@@ -0,0 +1,145 @@
+"""Tests for RunPlan endpoints and the retry scheduler."""
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.retry_scheduler import retry_scheduler
+
+
+async def create_runplan(async_client: AsyncClient, skill_name: str = "implement") -> dict:
+    project = (await async_client.post("/projects", json={"name": "RunPlan Project"})).json()
+    task = (await async_client.post(
+        "/tasks", json={"title": "RunPlan Task", "project_id": project["id"]}
+    )).json()
+    response = await async_client.post(
+        "/runplans",
+        json={"task_id": task["id"], "skill_name": skill_name, "inputs": {}}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_failed_runplan_is_scheduled_for_retry(async_client: AsyncClient):
+    """Test that failing a RunPlan queues a retry."""
+    runplan = await create_runplan(async_client)
+
+    await async_client.patch(f"/runplans/{runplan['id']}", json={"status": "FAILED"})
+
+    response = await async_client.get("/runplans/retries")
+    assert response.status_code == 200
+    retries = response.json()
+    assert [r["runplan_id"] for r in retries] == [runplan["id"]]
+
+
+@pytest.mark.asyncio
+async def test_due_retry_moves_runplan_to_pending(
+    async_client: AsyncClient, db_session: AsyncSession
+):
+    """Test that a due retry bumps retry_count and resets status to PENDING."""
+    runplan = await create_runplan(async_client)
+    await async_client.patch(f"/runplans/{runplan['id']}", json={"status": "FAILED"})
+
+    retried = await retry_scheduler.retry_due(
+        db_session, now=datetime.utcnow() + timedelta(hours=1)
+    )
+    assert [r.id for r in retried] == [runplan["id"]]
+
+    data = (await async_client.get(f"/runplans/{runplan['id']}")).json()
+    assert data["status"] == "PENDING"
+    assert data["retry_count"] == 1
+    assert retry_scheduler.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_retry_cancelled_when_runplan_recovers(
+    async_client: AsyncClient, db_session: AsyncSession
+):
+    """Test that a RunPlan moved out of FAILED is not retried."""
+    runplan = await create_runplan(async_client)
+    await async_client.patch(f"/runplans/{runplan['id']}", json={"status": "FAILED"})
+    await async_client.patch(f"/runplans/{runplan['id']}", json={"status": "CANCELLED"})
+
+    retried = await retry_scheduler.retry_due(
+        db_session, now=datetime.utcnow() + timedelta(hours=1)
+    )
+    assert retried == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_skips_exhausted_runplans(
+    async_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Test that rebuilding from the DB honours per-skill max retries."""
+    from src.config import get_settings
+    monkeypatch.setitem(
+        get_settings().runplan_retry_policies, "deploy", {"max_retries": 0}
+    )
+    exhausted = await create_runplan(async_client, skill_name="deploy")
+    retryable = await create_runplan(async_client)
+    for runplan in (exhausted, retryable):
+        await async_client.patch(f"/runplans/{runplan['id']}", json={"status": "FAILED"})
+
+    await retry_scheduler.rebuild(db_session)
+
+    assert [runplan_id for runplan_id, _ in retry_scheduler.pending()] == [retryable["id"]]
+
+
+@pytest.mark.asyncio
+async def test_list_runplans_returns_summaries(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that lists skip inputs/outputs unless requested with ?fields=."""
+    from sqlalchemy import inspect
+    from src.models.runplan import RunPlan
+
+    runplan = await create_runplan(async_client)
+    await async_client.patch(f"/runplans/{runplan['id']}", json={"outputs": {"diff": "x" * 1000}})
+    db_session.expunge_all()
+
+    summaries = (await async_client.get("/runplans")).json()
+    assert summaries[0]["id"] == runplan["id"]
+    assert "outputs" not in summaries[0] and "inputs" not in summaries[0]
+    # The heavy columns were not read from the database either
+    loaded = inspect(await db_session.get(RunPlan, runplan["id"])).dict
+    assert "outputs" not in loaded
+
+    sparse = (await async_client.get("/runplans", params={"fields": "status,outputs"})).json()
+    assert sparse == [{"id": runplan["id"], "status": "DRAFT", "outputs": {"diff": "x" * 1000}}]
+
+    detail = (await async_client.get(f"/runplans/{runplan['id']}")).json()
+    assert detail["outputs"] == {"diff": "x" * 1000}
+
+    response = await async_client.get("/runplans", params={"fields": "status,bogus"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_append_runplan_steps_updates_progress(async_client: AsyncClient):
+    """Test that step events are logged and advance the RunPlan counters."""
+    runplan = await create_runplan(async_client)
+
+    for index, status, tokens in [(1, "COMPLETED", 100), (2, "RUNNING", 0), (2, "COMPLETED", 50)]:
+        response = await async_client.post(
+            f"/runplans/{runplan['id']}/steps",
+            json={"step_index": index, "status": status, "tokens_used": tokens,
+                  "duration_ms": 10, "output": {"step": index}, "total_steps": 5},
+        )
+        assert response.status_code == 200
+
+    detail = (await async_client.get(f"/runplans/{runplan['id']}")).json()
+    assert detail["current_step"] == 2
+    assert detail["total_steps"] == 5
+    assert detail["tokens_used"] == 150
+    assert detail["outputs"] is None
+
+    steps = (await async_client.get(f"/runplans/{runplan['id']}/steps")).json()
+    assert [(s["step_index"], s["status"]) for s in steps] == [
+        (1, "COMPLETED"), (2, "RUNNING"), (2, "COMPLETED")
+    ]
+    later = (await async_client.get(
+        f"/runplans/{runplan['id']}/steps", params={"after_index": 1}
+    )).json()
+    assert len(later) == 2
+
+    missing = await async_client.post("/runplans/missing/steps", json={"step_index": 1})
+    assert missing.status_code == 404
@@ -0,0 +1,88 @@
+"""Tests for full-text search over audit logs, tasks and projects."""
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.audit import AuditAction
+from src.services.audit_service import log_audit_event
+from src.models.search import SearchDocument
+from src.services import search_index
+from src.services.search_index import backfill_search_index
+
+
+@pytest.mark.asyncio
+async def test_search_finds_audit_commands_and_tasks(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that audit commands, file paths and task text are searchable and filterable."""
+    project = (await async_client.post(
+        "/projects", json={"name": "Storefront", "description": "Web shop"}
+    )).json()
+    other = (await async_client.post("/projects", json={"name": "Other"})).json()
+    await log_audit_event(
+        db_session, AuditAction.COMMAND_RUN, "Installed dependencies",
+        agent_id="agent-1", project_id=project["id"], command="npm install",
+    )
+    await log_audit_event(
+        db_session, AuditAction.COMMAND_RUN, "Installed dependencies",
+        agent_id="agent-2", project_id=other["id"], command="npm install",
+    )
+    await log_audit_event(
+        db_session, AuditAction.FILE_WRITE, "Wrote config",
+        agent_id="agent-1", project_id=project["id"], file_path="package.json",
+    )
+    await async_client.post("/tasks", json={
+        "title": "Set up npm workspace", "description": "Run npm install in CI", "project_id": project["id"],
+    })
+
+    results = (await async_client.get("/search", params={"q": "npm install"})).json()
+    assert sorted(r["type"] for r in results) == ["audit", "audit", "task"]
+
+    results = (await async_client.get("/search", params={
+        "q": "npm install", "project_id": project["id"], "agent_id": "agent-1",
+    })).json()
+    assert [(r["type"], r["agent_id"]) for r in results] == [("audit", "agent-1")]
+    assert "[npm]" in results[0]["snippet"]
+
+    results = (await async_client.get("/search", params={"q": "package.json"})).json()
+    assert [r["title"] for r in results] == ["Wrote config"]
+
+    results = (await async_client.get("/search", params={"q": "shop", "type": "project"})).json()
+    assert [r["id"] for r in results] == [project["id"]]
+
+    tomorrow = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    assert (await async_client.get("/search", params={"q": "npm", "since": tomorrow})).json() == []
+    assert (await async_client.get("/search", params={"q": ""})).status_code == 422
+    assert (await async_client.get("/search", params={"q": " \t "})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_edits(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that edited tasks are re-indexed and quotes in queries are harmless."""
+    project = (await async_client.post("/projects", json={"name": "Indexed"})).json()
+    task = (await async_client.post("/tasks", json={"title": "Fix login", "project_id": project["id"]})).json()
+
+    await async_client.patch(f"/tasks/{task['id']}", json={"title": "Fix signup"})
+    assert (await async_client.get("/search", params={"q": "login"})).json() == []
+    results = (await async_client.get("/search", params={"q": 'signup "'})).json()
+    assert [r["id"] for r in results] == [task["id"]]
+
+    assert await backfill_search_index(db_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_backfill_indexes_existing_rows_in_batches(
+    async_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Test that rows without documents are indexed batch by batch."""
+    monkeypatch.setattr(search_index, "BACKFILL_BATCH_SIZE", 2)
+    project = (await async_client.post("/projects", json={"name": "Backfilled"})).json()
+    for i in range(5):
+        await log_audit_event(db_session, AuditAction.COMMAND_RUN, f"Ran step {i}", command="make")
+    await db_session.execute(delete(SearchDocument))
+
+    assert await backfill_search_index(db_session) == 6
+    assert await backfill_search_index(db_session) == 0
+    assert len((await async_client.get("/search", params={"q": "make"})).json()) == 5
+    results = (await async_client.get("/search", params={"q": "backfilled"})).json()
+    assert [r["id"] for r in results] == [project["id"]]
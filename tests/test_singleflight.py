@@ -0,0 +1,96 @@
+"""Tests for coalescing identical concurrent reads."""
+import asyncio
+import pytest
+from httpx import AsyncClient
+
+from src.config import get_settings
+from src.services.singleflight import SingleFlight, request_singleflight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_share_one_response(async_client: AsyncClient):
+    """Test that a burst of identical GETs runs the route once."""
+    project = (await async_client.post("/projects", json={"name": "Herd"})).json()
+
+    responses = await asyncio.gather(*[
+        async_client.get(f"/costs/summary/{project['id']}") for _ in range(5)
+    ])
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert len({r.content for r in responses}) == 1
+    assert request_singleflight.executed == 1
+    assert request_singleflight.shared == 4
+
+
+@pytest.mark.asyncio
+async def test_different_queries_are_not_shared(async_client: AsyncClient):
+    """Test that the query string is part of the key."""
+    await asyncio.gather(
+        async_client.get("/audit/recent", params={"limit": 10}),
+        async_client.get("/audit/recent", params={"limit": 20}),
+    )
+
+    assert request_singleflight.executed == 2
+    assert request_singleflight.shared == 0
+
+
+@pytest.mark.asyncio
+async def test_ttl_reuses_completed_responses(async_client: AsyncClient, monkeypatch):
+    """Test that successful responses are reused within the micro-TTL."""
+    monkeypatch.setattr(get_settings(), "coalesce_ttl_seconds", 60.0)
+    await async_client.get("/agents")
+    await async_client.post("/agents", json={"name": "Late", "runner_id": "runner-1"})
+
+    assert (await async_client.get("/agents")).json() == []
+    assert request_singleflight.shared == 1
+
+    # Errors are never reused
+    assert (await async_client.get("/projects/missing")).status_code == 404
+    await async_client.get("/projects/missing")
+    assert request_singleflight.shared == 1
+
+
+@pytest.mark.asyncio
+async def test_other_paths_and_methods_are_not_coalesced(async_client: AsyncClient):
+    """Test that only GETs under the configured prefixes go through the flight."""
+    await async_client.get("/health")
+    await async_client.post("/projects", json={"name": "Written"})
+
+    assert request_singleflight.executed == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    """Test that followers still get the result when the first caller goes away."""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", compute))
+    second = asyncio.create_task(flight.do("key", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    assert flight.executed == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    """Test that a failing call raises for all waiting callers."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", fail), flight.do("key", fail), return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.executed == 1
@@ -0,0 +1,60 @@
+"""Tests for the incrementally maintained status counters."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.status_counters import status_counters
+from src.websocket.manager import connection_manager
+
+
+@pytest.mark.asyncio
+async def test_counts_follow_committed_transitions(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that counters track status changes once they are committed."""
+    project = (await async_client.post("/projects", json={"name": "Counted"})).json()
+    task = (await async_client.post("/tasks", json={"title": "A", "project_id": project["id"]})).json()
+    await db_session.commit()
+
+    counts = (await async_client.get("/stats/counts")).json()
+    assert counts["tasks"] == {project["id"]: {"PENDING": 1}}
+    assert counts["reconciled_at"] is not None
+
+    await async_client.post("/tasks", json={"title": "B", "project_id": project["id"]})
+    await async_client.patch(f"/tasks/{task['id']}", json={"status": "IN_PROGRESS"})
+    await async_client.post("/agents", json={"name": "Counter Agent", "runner_id": "runner-1"})
+    # Nothing moves until the transaction commits
+    counts = (await async_client.get("/stats/counts")).json()
+    assert counts["tasks"][project["id"]] == {"PENDING": 1}
+
+    await db_session.commit()
+    counts = (await async_client.get("/stats/counts", params={"project_id": project["id"]})).json()
+    assert counts["tasks"] == {project["id"]: {"PENDING": 1, "IN_PROGRESS": 1}}
+    assert counts["agents"] == {"IDLE": 1}
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_changes_are_not_counted(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that rolled back status changes leave the counters alone."""
+    await async_client.get("/stats/counts")
+    await async_client.post("/agents", json={"name": "Ghost", "runner_id": "runner-1"})
+    await db_session.rollback()
+
+    assert (await async_client.get("/stats/counts")).json()["agents"] == {}
+
+
+@pytest.mark.asyncio
+async def test_counts_update_is_broadcast(async_client: AsyncClient, db_session: AsyncSession, make_websocket):
+    """Test that only changed counts are pushed as COUNTS_UPDATE."""
+    await async_client.get("/stats/counts")
+    await status_counters.publish()
+    await async_client.post("/agents", json={"name": "Pushed", "runner_id": "runner-1"})
+    await db_session.commit()
+
+    ws = make_websocket()
+    connection_manager.active_connections.append(ws)
+    try:
+        await status_counters.publish()
+        await status_counters.publish()
+    finally:
+        connection_manager.disconnect(ws)
+    assert [m["type"] for m in ws.sent] == ["COUNTS_UPDATE"]
+    assert ws.sent[0]["payload"] == {"agents": {"IDLE": 1}}
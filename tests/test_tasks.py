@@ -0,0 +1,157 @@
+"""Tests for task endpoints and the task dependency graph."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.dependency_graph import dependency_graph
+
+
+async def create_tasks(async_client: AsyncClient, *titles: str) -> list[dict]:
+    project = (await async_client.post("/projects", json={"name": "Graph Project"})).json()
+    tasks = []
+    for title in titles:
+        response = await async_client.post(
+            "/tasks", json={"title": title, "project_id": project["id"]}
+        )
+        tasks.append(response.json())
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_create_task(async_client: AsyncClient):
+    """Test creating a new task."""
+    [task] = await create_tasks(async_client, "Write docs")
+    assert task["title"] == "Write docs"
+    assert task["status"] == "PENDING"
+
+
+@pytest.mark.asyncio
+async def test_add_dependency_blocks_task(async_client: AsyncClient):
+    """Test that depending on an incomplete task blocks the dependent."""
+    build, deploy = await create_tasks(async_client, "Build", "Deploy")
+
+    response = await async_client.post(
+        f"/tasks/{deploy['id']}/dependencies", json={"depends_on_id": build["id"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["depends_on_id"] == build["id"]
+
+    task = (await async_client.get(f"/tasks/{deploy['id']}")).json()
+    assert task["status"] == "BLOCKED"
+
+
+@pytest.mark.asyncio
+async def test_dependency_cycle_rejected(async_client: AsyncClient):
+    """Test that an edge closing a cycle is rejected."""
+    a, b, c = await create_tasks(async_client, "A", "B", "C")
+    await async_client.post(f"/tasks/{b['id']}/dependencies", json={"depends_on_id": a["id"]})
+    await async_client.post(f"/tasks/{c['id']}/dependencies", json={"depends_on_id": b["id"]})
+
+    response = await async_client.post(
+        f"/tasks/{a['id']}/dependencies", json={"depends_on_id": c["id"]}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_dependencies_guard_cycles_until_rolled_back(
+    async_client: AsyncClient, db_session: AsyncSession
+):
+    """Test that edges join the graph on commit but count for cycle checks at once."""
+    a, b = await create_tasks(async_client, "A", "B")
+    await db_session.commit()
+    await async_client.post(f"/tasks/{b['id']}/dependencies", json={"depends_on_id": a["id"]})
+
+    # Not committed yet: already part of cycle checks, not of the graph
+    response = await async_client.post(f"/tasks/{a['id']}/dependencies", json={"depends_on_id": b["id"]})
+    assert response.status_code == 400
+    assert dependency_graph.dependencies_of(b["id"]) == set()
+
+    await db_session.rollback()
+    response = await async_client.post(f"/tasks/{a['id']}/dependencies", json={"depends_on_id": b["id"]})
+    assert response.status_code == 200
+    await db_session.commit()
+    assert dependency_graph.dependencies_of(a["id"]) == {b["id"]}
+    assert dependency_graph.dependencies_of(b["id"]) == set()
+
+    await async_client.delete(f"/tasks/{a['id']}/dependencies/{b['id']}")
+    assert dependency_graph.dependencies_of(a["id"]) == {b["id"]}
+    await db_session.commit()
+    assert dependency_graph.dependencies_of(a["id"]) == set()
+
+
+@pytest.mark.asyncio
+async def test_completing_task_unblocks_ready_dependents(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that completion only releases dependents with no other blockers."""
+    build, lint, deploy, docs = await create_tasks(
+        async_client, "Build", "Lint", "Deploy", "Docs"
+    )
+    await async_client.post(f"/tasks/{deploy['id']}/dependencies", json={"depends_on_id": build["id"]})
+    await async_client.post(f"/tasks/{deploy['id']}/dependencies", json={"depends_on_id": lint["id"]})
+    await async_client.post(f"/tasks/{docs['id']}/dependencies", json={"depends_on_id": build["id"]})
+    await db_session.commit()
+
+    await async_client.patch(f"/tasks/{build['id']}", json={"status": "COMPLETED"})
+
+    assert (await async_client.get(f"/tasks/{docs['id']}")).json()["status"] == "PENDING"
+    assert (await async_client.get(f"/tasks/{deploy['id']}")).json()["status"] == "BLOCKED"
+
+    await async_client.patch(f"/tasks/{lint['id']}", json={"status": "COMPLETED"})
+
+    assert (await async_client.get(f"/tasks/{deploy['id']}")).json()["status"] == "PENDING"
+
+
+@pytest.mark.asyncio
+async def test_topological_order(async_client: AsyncClient, db_session: AsyncSession):
+    """Test that the project order view puts prerequisites first."""
+    deploy, test, build = await create_tasks(async_client, "Deploy", "Test", "Build")
+    await async_client.post(f"/tasks/{deploy['id']}/dependencies", json={"depends_on_id": test["id"]})
+    await async_client.post(f"/tasks/{test['id']}/dependencies", json={"depends_on_id": build["id"]})
+    await db_session.commit()
+
+    response = await async_client.get(f"/tasks/order/{deploy['project_id']}")
+    assert response.status_code == 200
+    assert [t["title"] for t in response.json()] == ["Build", "Test", "Deploy"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_and_batch_get_tasks(async_client: AsyncClient):
+    """Test creating tasks in bulk and fetching them with one request."""
+    project = (await async_client.post("/projects", json={"name": "Bulk Project"})).json()
+    response = await async_client.post("/tasks/bulk", json={"tasks": [
+        {"title": f"Task {i}", "project_id": project["id"]} for i in range(3)
+    ]})
+    assert response.status_code == 200
+    created = response.json()
+    assert [t["title"] for t in created] == ["Task 0", "Task 1", "Task 2"]
+
+    ids = [created[2]["id"], "missing", created[0]["id"]]
+    batch = (await async_client.post("/tasks/batch-get", json={"ids": ids})).json()
+    assert [t["id"] for t in batch["tasks"]] == [created[2]["id"], created[0]["id"]]
+    assert batch["missing"] == ["missing"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_tasks(async_client: AsyncClient, db_session: AsyncSession):
+    """Test re-prioritising tasks and completing prerequisites in one request."""
+    build, deploy = await create_tasks(async_client, "Build", "Deploy")
+    await async_client.post(f"/tasks/{deploy['id']}/dependencies", json={"depends_on_id": build["id"]})
+    await db_session.commit()
+
+    response = await async_client.patch("/tasks/bulk", json={"tasks": [
+        {"id": build["id"], "status": "COMPLETED"},
+        {"id": deploy["id"], "priority": "CRITICAL"},
+    ]})
+    assert response.status_code == 200
+    assert [t["priority"] for t in response.json()] == ["MEDIUM", "CRITICAL"]
+    assert response.json()[0]["completed_at"] is not None
+
+    deploy = (await async_client.get(f"/tasks/{deploy['id']}")).json()
+    assert deploy["status"] == "PENDING"
+
+    missing = await async_client.patch("/tasks/bulk", json={"tasks": [
+        {"id": build["id"], "priority": "LOW"}, {"id": "missing", "priority": "LOW"},
+    ]})
+    assert missing.status_code == 404
+    build = (await async_client.get(f"/tasks/{build['id']}")).json()
+    assert build["priority"] == "MEDIUM"